@@ -57,7 +57,8 @@ class Display(object):
     STOP_SCROLL = const(0x9E)
     START_SCROLL = const(0x9F)
 
-    def __init__(self, spi, cs, dc, rst, width=128, height=128):
+    def __init__(self, spi, cs, dc, rst, width=128, height=128,
+                 chunk_size=1024):
         """Initialize OLED.
 
         Args:
@@ -67,6 +68,8 @@ class Display(object):
             rst (Class Pin):  Reset pin
             width (Optional int): Screen width (default 128)
             height (Optional int): Screen height (default 128)
+            chunk_size (Optional int): draw_image read buffer size in bytes
+                (default 1024)
         """
         self.spi = spi
         self.cs = cs
@@ -74,6 +77,18 @@ class Display(object):
         self.rst = rst
         self.width = width
         self.height = height
+        # Preallocated command and argument buffers for block()
+        self._cmd_buf = bytearray(1)
+        self._arg_buf = bytearray(2)
+        # Window last programmed by block(), packed; -1 = unknown
+        self._window = -1
+        # SPI traffic counters (see reset_counters)
+        self.cmd_bytes = 0
+        self.pixel_bytes = 0
+        # Optional DMA sender for block_async (see attach_dma)
+        self.dma = None
+        # Reusable read buffer for draw_image
+        self._image_buf = bytearray(chunk_size)
         # Initialize GPIO pins and set implementation specific methods
         if implementation.name == 'circuitpython':
             self.cs.switch_to_output(value=True)
@@ -82,6 +97,8 @@ class Display(object):
             self.reset = self.reset_cpy
             self.write_cmd = self.write_cmd_cpy
             self.write_data = self.write_data_cpy
+            self.block = self.block_cpy
+            self.stream = self.stream_cpy
         else:
             self.cs.init(self.cs.OUT, value=1)
             self.dc.init(self.dc.OUT, value=0)
@@ -89,6 +106,8 @@ class Display(object):
             self.reset = self.reset_mpy
             self.write_cmd = self.write_cmd_mpy
             self.write_data = self.write_data_mpy
+            self.block = self.block_mpy
+            self.stream = self.stream_mpy
         self.reset()
         # Send initialization commands
         self.write_cmd(self.COMMAND_LOCK, 0x12)  # Unlock IC MCU interface
@@ -113,8 +132,191 @@ class Display(object):
         self.write_cmd(self.DISPLAY_ON)  # Display on
         self.clear()
 
-    def block(self, x0, y0, x1, y1, data):
-        """Write a block of data to display.
+    def block_mpy(self, x0, y0, x1, y1, data):
+        """Write a block of data to display (MicroPython).
+
+        The window commands and pixel data go out as one transaction: CS is
+        held low throughout and only DC toggles, using preallocated command
+        buffers, so nothing is allocated per call. SET_COLUMN and SET_ROW are
+        skipped when the window is unchanged since the last complete block.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        """
+        if self.dma is not None:
+            self.dma.wait()
+        window = self._begin_write_mpy(x0, y0, x1, y1)
+        self.spi.write(data)
+        self.cs(1)
+        self._end_block(window, x0, y0, x1, y1, len(data))
+
+    def _begin_write_mpy(self, x0, y0, x1, y1):
+        """Lower CS and start a RAM write to a window (MicroPython).
+
+        Sends SET_COLUMN and SET_ROW unless the window is cached, then
+        WRITE_RAM, and leaves DC high for the pixel data.
+
+        Returns:
+            int: The packed window, for _end_block.
+        """
+        cmd = self._cmd_buf
+        args = self._arg_buf
+        spi = self.spi
+        dc = self.dc
+        window = (x0 << 21) | (y0 << 14) | (x1 << 7) | y1
+        self.cs(0)
+        if window != self._window:
+            dc(0)
+            cmd[0] = self.SET_COLUMN
+            spi.write(cmd)
+            dc(1)
+            args[0] = x0
+            args[1] = x1
+            spi.write(args)
+            dc(0)
+            cmd[0] = self.SET_ROW
+            spi.write(cmd)
+            dc(1)
+            args[0] = y0
+            args[1] = y1
+            spi.write(args)
+            self.cmd_bytes += 6
+        dc(0)
+        cmd[0] = self.WRITE_RAM
+        spi.write(cmd)
+        dc(1)
+        return window
+
+    def block_cpy(self, x0, y0, x1, y1, data):
+        """Write a block of data to display (CircuitPython).
+
+        Same single transaction as block_mpy, with the SPI bus locked once.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            data (bytes): Data buffer to write.
+        """
+        window = self._begin_write_cpy(x0, y0, x1, y1)
+        self.spi.write(data)
+        self.spi.unlock()
+        self.cs.value = True
+        self._end_block(window, x0, y0, x1, y1, len(data))
+
+    def _begin_write_cpy(self, x0, y0, x1, y1):
+        """Lower CS, lock the bus and start a RAM write (CircuitPython).
+
+        Same as _begin_write_mpy; the caller unlocks the bus when done.
+
+        Returns:
+            int: The packed window, for _end_block.
+        """
+        cmd = self._cmd_buf
+        args = self._arg_buf
+        spi = self.spi
+        dc = self.dc
+        window = (x0 << 21) | (y0 << 14) | (x1 << 7) | y1
+        self.cs.value = False
+        # Confirm SPI locked before writing
+        while not spi.try_lock():
+            pass
+        if window != self._window:
+            dc.value = False
+            cmd[0] = self.SET_COLUMN
+            spi.write(cmd)
+            dc.value = True
+            args[0] = x0
+            args[1] = x1
+            spi.write(args)
+            dc.value = False
+            cmd[0] = self.SET_ROW
+            spi.write(cmd)
+            dc.value = True
+            args[0] = y0
+            args[1] = y1
+            spi.write(args)
+            self.cmd_bytes += 6
+        dc.value = False
+        cmd[0] = self.WRITE_RAM
+        spi.write(cmd)
+        dc.value = True
+        return window
+
+    def stream_mpy(self, x0, y0, x1, y1, f, buf):
+        """Write a block of data read from a file to display (MicroPython).
+
+        The window is set once and CS is held while the file is read into buf
+        with readinto() and sent, one chunk at a time.
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            f (file): Open file positioned at the block's pixel data.
+            buf (bytearray): Chunk buffer.
+        """
+        if self.dma is not None:
+            self.dma.wait()
+        window = self._begin_write_mpy(x0, y0, x1, y1)
+        sent = self._stream_chunks(f, buf, (x1 - x0 + 1) * (y1 - y0 + 1) * 2)
+        self.cs(1)
+        self._end_block(window, x0, y0, x1, y1, sent)
+
+    def stream_cpy(self, x0, y0, x1, y1, f, buf):
+        """Write a block of data read from a file to display (CircuitPython).
+
+        Args:
+            x0 (int):  Starting X position.
+            y0 (int):  Starting Y position.
+            x1 (int):  Ending X position.
+            y1 (int):  Ending Y position.
+            f (file): Open file positioned at the block's pixel data.
+            buf (bytearray): Chunk buffer.
+        """
+        window = self._begin_write_cpy(x0, y0, x1, y1)
+        sent = self._stream_chunks(f, buf, (x1 - x0 + 1) * (y1 - y0 + 1) * 2)
+        self.spi.unlock()
+        self.cs.value = True
+        self._end_block(window, x0, y0, x1, y1, sent)
+
+    def _stream_chunks(self, f, buf, nbytes):
+        """Send up to nbytes from f through buf; returns the bytes sent."""
+        spi = self.spi
+        size = len(buf)
+        mv = memoryview(buf)
+        sent = 0
+        while sent < nbytes:
+            if nbytes - sent >= size:
+                n = f.readinto(buf)
+            else:
+                n = f.readinto(mv[:nbytes - sent])
+            if not n:
+                break   # Short file: leave the rest of the window as it was
+            spi.write(buf if n == size else mv[:n])
+            sent += n
+        return sent
+
+    def attach_dma(self, dma):
+        """Use a DMA sender (spi_dma.SpiDma) for block_async (MicroPython only).
+
+        Every other write first waits for an in-flight DMA transfer.
+        """
+        self.dma = dma
+
+    def block_async(self, x0, y0, x1, y1, data, callback=None):
+        """Write a block of data to display without waiting for the pixels.
+
+        The window is set up synchronously, then data is streamed by DMA and
+        CS is raised when it completes. data must not be modified until
+        callback(data) has run or wait() has returned. Without a DMA sender
+        this is block() followed by the callback.
 
         Args:
             x0 (int):  Starting X position.
@@ -122,14 +324,53 @@ class Display(object):
             x1 (int):  Ending X position.
             y1 (int):  Ending Y position.
             data (bytes): Data buffer to write.
+            callback (Optional function): Called with data once sent.
+        """
+        dma = self.dma
+        if dma is None:
+            self.block(x0, y0, x1, y1, data)
+            if callback is not None:
+                callback(data)
+            return
+
+        dma.wait()
+        window = self._begin_write_mpy(x0, y0, x1, y1)
+        self._end_block(window, x0, y0, x1, y1, len(data))
+        dma.start(data, self.cs, callback)
+
+    def wait(self):
+        """Wait for an in-flight block_async transfer to finish."""
+        if self.dma is not None:
+            self.dma.wait()
+
+    def _end_block(self, window, x0, y0, x1, y1, nbytes):
+        """Update the window cache and counters after a block write.
+
+        The RAM address pointer wraps back to the window start only when the
+        whole window was written, so only then can the next block to the same
+        window skip SET_COLUMN and SET_ROW.
         """
-        self.write_cmd(self.SET_COLUMN, x0, x1)
-        self.write_cmd(self.SET_ROW, y0, y1)
-        self.write_cmd(self.WRITE_RAM)
-        self.write_data(data)
+        if nbytes == (x1 - x0 + 1) * (y1 - y0 + 1) * 2:
+            self._window = window
+        else:
+            self._window = -1
+        self.cmd_bytes += 1
+        self.pixel_bytes += nbytes
+
+    def invalidate_window(self):
+        """Forget the cached window so the next block() resends it."""
+        self._window = -1
+
+    def reset_counters(self):
+        """Zero the cmd_bytes and pixel_bytes counters."""
+        self.cmd_bytes = 0
+        self.pixel_bytes = 0
 
     def cleanup(self):
         """Clean up resources."""
+        if self.dma is not None:
+            self.dma.close()
+            self.dma = None
         self.clear()
         self.display_off()
         self.spi.deinit()
@@ -150,6 +391,7 @@ class Display(object):
             line = bytearray(2048)
         for x in range(0, w, 8):
             self.block(x, 0, x + 7, h - 1, line)
+        self.invalidate_window()
 
     def contrast(self, level):
         """Set display contrast to specified level.
@@ -165,10 +407,12 @@ class Display(object):
     def display_off(self):
         """Turn display off."""
         self.write_cmd(self.DISPLAY_OFF)
+        self.invalidate_window()
 
     def display_on(self):
         """Turn display on."""
         self.write_cmd(self.DISPLAY_ON)
+        self.invalidate_window()
 
     def draw_circle(self, x0, y0, r, color):
         """Draw a circle.
@@ -278,37 +522,30 @@ class Display(object):
         line = color.to_bytes(2, 'big') * w
         self.block(x, y, x + w - 1, y, line)
 
-    def draw_image(self, path, x=0, y=0, w=128, h=128):
+    def draw_image(self, path, x=0, y=0, w=128, h=128, chunk_size=None):
         """Draw image from flash.
 
+        The image is streamed as one block: the window is set once and the
+        file is read chunk by chunk into a reusable buffer while CS is held.
+
         Args:
             path (string): Image file path.
             x (int): X coordinate of image left.  Default is 0.
             y (int): Y coordinate of image top.  Default is 0.
             w (int): Width of image.  Default is 128.
             h (int): Height of image.  Default is 128.
+            chunk_size (Optional int): Read buffer size in bytes.  Default is
+                the size given to the constructor; a different size replaces
+                the buffer.
         """
         x2 = x + w - 1
         y2 = y + h - 1
         if self.is_off_grid(x, y, x2, y2):
             return
+        if chunk_size is not None and chunk_size != len(self._image_buf):
+            self._image_buf = bytearray(chunk_size)
         with open(path, "rb") as f:
-            chunk_height = 1024 // w
-            chunk_count, remainder = divmod(h, chunk_height)
-            chunk_size = chunk_height * w * 2
-            chunk_y = y
-            if chunk_count:
-                for c in range(0, chunk_count):
-                    buf = f.read(chunk_size)
-                    self.block(x, chunk_y,
-                               x2, chunk_y + chunk_height - 1,
-                               buf)
-                    chunk_y += chunk_height
-            if remainder:
-                buf = f.read(remainder * w * 2)
-                self.block(x, chunk_y,
-                           x2, chunk_y + remainder - 1,
-                           buf)
+            self.stream(x, y, x2, y2, f, self._image_buf)
 
     def draw_letter(self, x, y, letter, font, color, background=0,
                     landscape=False, flip=False):
@@ -892,6 +1129,7 @@ class Display(object):
         """Perform reset: Low=initialization, High=normal operation.
         Notes: CircuitPython implemntation
         """
+        self.invalidate_window()
         self.rst.value = False
         sleep(.05)
         self.rst.value = True
@@ -901,6 +1139,7 @@ class Display(object):
         """Perform reset: Low=initialization, High=normal operation.
         Notes: MicroPython implemntation
         """
+        self.invalidate_window()
         self.rst(0)
         sleep(.05)
         self.rst(1)
@@ -958,6 +1197,11 @@ class Display(object):
             command (byte): SSD1351 command code.
             *args (optional bytes): Data to transmit.
         """
+        if self.dma is not None:
+            self.dma.wait()
+        # Any command may move the RAM pointer or change addressing
+        self.invalidate_window()
+        self.cmd_bytes += 1 + len(args)
         self.dc(0)
         self.cs(0)
         self.spi.write(bytearray([command]))
@@ -973,6 +1217,9 @@ class Display(object):
             command (byte): SSD1351 command code.
             *args (optional bytes): Data to transmit.
         """
+        # Any command may move the RAM pointer or change addressing
+        self.invalidate_window()
+        self.cmd_bytes += 1 + len(args)
         self.dc.value = False
         self.cs.value = False
         # Confirm SPI locked before writing
@@ -991,6 +1238,8 @@ class Display(object):
         Args:
             data (bytes): Data to transmit.
         """
+        if self.dma is not None:
+            self.dma.wait()
         self.dc(1)
         self.cs(0)
         self.spi.write(data)
@@ -0,0 +1,187 @@
+# async_runtime.py
+# asyncio runtime: the game loop split into cooperative tasks
+#
+# Alternative to Game.run (config.RUNTIME = "async"). Each concern is its own
+# task and sleeps until its own deadline:
+#   input      - woken by the button ISRs through a ThreadSafeFlag
+#   tick       - the GAME_TICK_MS game tick and phase transitions
+#   sprite     - sprite/egg animation frames
+#   background - animated background frames
+#   screen     - screen sleep after SCREEN_TIMEOUT_MS
+#   render     - composites and pushes whatever the others changed
+# The other tasks only request a render, so several changes close together
+# are pushed once, and a press arriving during a push is handled right after
+# it instead of after a whole fixed loop period.
+#
+# Runs on MicroPython asyncio and, for host runs with a stubbed machine
+# module, on CPython asyncio (which has no ThreadSafeFlag).
+
+import time
+import config
+
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+
+try:
+    ThreadSafeFlag = asyncio.ThreadSafeFlag
+except AttributeError:
+    class ThreadSafeFlag:
+        """CPython stand-in for asyncio.ThreadSafeFlag.
+
+        Only safe to set() from the event loop's thread, which is where the
+        stubbed pin handlers run on the host.
+        """
+
+        def __init__(self):
+            self._event = asyncio.Event()
+
+        def set(self):
+            self._event.set()
+
+        def clear(self):
+            self._event.clear()
+
+        async def wait(self):
+            await self._event.wait()
+            self._event.clear()
+
+
+async def sleep_until(deadline):
+    """Sleep until a ticks_ms deadline (returns at once if it has passed)."""
+    delay = time.ticks_diff(deadline, time.ticks_ms())
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    else:
+        await asyncio.sleep(0)
+
+
+class AsyncRuntime:
+    """Runs an initialized Game as a set of asyncio tasks."""
+
+    def __init__(self, game):
+        self.game = game
+        self.input_flag = ThreadSafeFlag()  # Set by the button ISRs
+        self._render_request = None         # asyncio.Event, created in run()
+        self._screen_on = None              # asyncio.Event, set while the screen is on
+        self.renders = 0
+
+    def run(self):
+        """Run until game.stop() is called."""
+        asyncio.run(self._main())
+
+    def request_render(self):
+        """Ask the render task to push the current state."""
+        self._render_request.set()
+
+    async def _main(self):
+        game = self.game
+        game.running = True
+        game._next_bg_time = time.ticks_ms()
+
+        # Events are created inside the loop (CPython binds them to it)
+        self._render_request = asyncio.Event()
+        self._screen_on = asyncio.Event()
+        if game.input.screen_on:
+            self._screen_on.set()
+
+        tasks = [
+            asyncio.create_task(self._input_task()),
+            asyncio.create_task(self._tick_task()),
+            asyncio.create_task(self._sprite_task()),
+            asyncio.create_task(self._screen_task()),
+            asyncio.create_task(self._render_task()),
+        ]
+        if game.graphics.background is not None:
+            tasks.append(asyncio.create_task(self._background_task()))
+
+        while game.running:
+            await asyncio.sleep(1)
+            if game.latency is not None:
+                game.latency.poll_serial()
+        for task in tasks:
+            task.cancel()
+
+    async def _input_task(self):
+        game = self.game
+        while True:
+            deadline = game.input.next_deadline()
+            if deadline is None:
+                await self.input_flag.wait()
+            else:
+                # A held button repeats / long-presses without new edges
+                try:
+                    delay = max(0, time.ticks_diff(deadline, time.ticks_ms()))
+                    await asyncio.wait_for(self.input_flag.wait(), delay / 1000)
+                except asyncio.TimeoutError:
+                    pass
+            if game.latency is not None:
+                game.latency.wake()
+            screen_on, just_woke, pressed = game.input.update()
+            if not screen_on:
+                self._screen_on.clear()
+                continue
+            if just_woke:
+                # The press only woke the screen (no button action)
+                self._screen_on.set()
+            else:
+                game._handle_input(pressed[0], pressed[1], pressed[2])
+                if game.latency is not None:
+                    game.latency.handled(game.input.pending_edge())
+                game.input.handled()
+            self.request_render()
+
+    async def _tick_task(self):
+        game = self.game
+        while True:
+            await sleep_until(game.state.next_tick_time())
+            phase = game.state.phase
+            # Game ticks run even with the screen off
+            if game._tick() and game.state.phase != phase:
+                self.request_render()
+
+    async def _sprite_task(self):
+        game = self.game
+        while True:
+            await self._screen_on.wait()
+            if game.state.phase in (config.PHASE_EGG, config.PHASE_ALIVE):
+                await sleep_until(game.state.next_sprite_time())
+                if game.input.screen_on:
+                    game._animate()
+                    self.request_render()
+            else:
+                # Nothing animates until the next game tick can start one
+                await sleep_until(game.state.next_tick_time())
+
+    async def _background_task(self):
+        game = self.game
+        while True:
+            await self._screen_on.wait()
+            await sleep_until(game._next_bg_time)
+            # Game._render advances the frame when it is due
+            self.request_render()
+            await asyncio.sleep(0)
+
+    async def _screen_task(self):
+        game = self.game
+        while True:
+            await self._screen_on.wait()
+            deadline = game.input.timeout_deadline()
+            if deadline is not None:
+                await sleep_until(deadline)
+            if not game.input.check_timeout():
+                self._screen_on.clear()
+
+    async def _render_task(self):
+        game = self.game
+        while True:
+            await self._render_request.wait()
+            self._render_request.clear()
+            if config.TRACK_RENDER_ALLOCS:
+                game._render_tracked()
+            else:
+                game._render()
+            if game.latency is not None:
+                game.latency.pushed()
+            self.renders += 1
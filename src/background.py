@@ -0,0 +1,177 @@
+# background.py
+# Animated backgrounds: full-screen RGB565 frames streamed from flash
+#
+# The frames (e.g. assets/water_gif, 20 x 32 KB) do not fit in RAM together:
+#   AnimatedBackground - plain .raw frames. Two frame buffers are
+#                        preallocated; the front one is on screen and is what
+#                        the compositor redraws partial updates from, the next
+#                        frame is read into the back one with readinto() and
+#                        the two are swapped when the animation advances.
+#   DeltaBackground    - one .dlt file (utils/raw2delta.py). A single frame
+#                        buffer is patched with each frame's changed rects,
+#                        and only those rects are marked dirty.
+# File handles stay open, so streaming never allocates.
+
+import time
+import config
+import kernels
+from delta_anim import DeltaAnimation
+
+
+class BackgroundStream:
+    """Common interface and streaming stats of the animated backgrounds."""
+
+    def __init__(self):
+        self.frames = 0
+        self.read_us = 0
+        self.push_us = 0
+        self.push_bytes = 0
+
+    def load(self):
+        """Prepare the first frame.
+
+        Returns:
+            bytearray: The frame buffer to use as the base layer
+        """
+        raise NotImplementedError
+
+    def advance(self, layer):
+        """Show the next frame on the base layer."""
+        raise NotImplementedError
+
+    def prefetch(self):
+        """Read ahead after a push (no-op unless the subclass buffers ahead)."""
+        pass
+
+    def record_push(self, us, nbytes):
+        """Add the time and pixel bytes spent compositing and pushing one frame."""
+        self.push_us += us
+        self.push_bytes += nbytes
+
+    def stats(self):
+        """Summarize streaming performance since the last reset_stats().
+
+        Returns:
+            tuple: (frames, avg read ms, avg push ms, avg KB pushed,
+                sustainable FPS, SPI-bound FPS) where sustainable FPS is what
+                flash reads plus pushes allow and SPI-bound FPS is the limit
+                of SPI_BAUDRATE alone for the bytes actually pushed
+        """
+        frames = max(1, self.frames)
+        read_ms = self.read_us / frames / 1000
+        push_ms = self.push_us / frames / 1000
+        push_kb = self.push_bytes / frames / 1024
+        busy_ms = read_ms + push_ms
+        fps = 1000 / busy_ms if busy_ms > 0 else 0
+        spi_fps = config.SPI_BAUDRATE / (push_kb * 1024 * 8) if push_kb > 0 else 0
+        return self.frames, read_ms, push_ms, push_kb, fps, spi_fps
+
+    def reset_stats(self):
+        """Zero the streaming counters."""
+        self.frames = 0
+        self.read_us = 0
+        self.push_us = 0
+        self.push_bytes = 0
+
+    def close(self):
+        """Close the frame files."""
+        pass
+
+
+class AnimatedBackground(BackgroundStream):
+    """Double-buffered player for a sequence of full-screen .raw frames."""
+
+    def __init__(self, path_pattern, count):
+        """
+        Args:
+            path_pattern: Frame path with one %d field (e.g. "water_%02d.raw")
+            count: Number of frames, played in order and looped
+        """
+        super().__init__()
+        self._buffers = (bytearray(config.BUF_SIZE), bytearray(config.BUF_SIZE))
+        self._files = [open(path_pattern % i, "rb") for i in range(count)]
+        self.count = count
+
+        self.front = 0          # Buffer index on screen
+        self.index = 0          # Frame number in the front buffer
+        self._back_index = -1   # Frame number in the back buffer (-1 = stale)
+
+    def load(self):
+        """Read the first frame into the front buffer and prefetch the second."""
+        self.index = 0
+        self._read(0, self._buffers[self.front])
+        self._back_index = -1
+        self.prefetch()
+        return self._buffers[self.front]
+
+    def advance(self, layer):
+        layer.set_frame(self.swap())
+
+    def prefetch(self):
+        """Read the next frame into the back buffer if it is not there yet."""
+        nxt = (self.index + 1) % self.count
+        if self._back_index != nxt:
+            start = time.ticks_us()
+            self._read(nxt, self._buffers[self.front ^ 1])
+            self.read_us += time.ticks_diff(time.ticks_us(), start)
+            self._back_index = nxt
+
+    def swap(self):
+        """Advance one frame, making the back buffer the front.
+
+        Returns:
+            bytearray: The new front buffer
+        """
+        self.prefetch()
+        self.front ^= 1
+        self.index = self._back_index
+        self._back_index = -1
+        self.frames += 1
+        return self._buffers[self.front]
+
+    def close(self):
+        for f in self._files:
+            f.close()
+        self._files = []
+
+    def _read(self, index, buf):
+        """Read frame index into buf."""
+        f = self._files[index]
+        f.seek(0)
+        n = f.readinto(buf)
+        if n != config.BUF_SIZE:
+            raise ValueError(f"Short background frame {index}: {n} bytes")
+
+
+class DeltaBackground(BackgroundStream):
+    """Player for a delta-encoded animation patched into one frame buffer."""
+
+    def __init__(self, path):
+        super().__init__()
+        self.anim = DeltaAnimation(path)
+        if self.anim.width != config.WIDTH or self.anim.height != config.HEIGHT:
+            raise ValueError(f"{path} is not {config.WIDTH}x{config.HEIGHT}")
+        self._frame = bytearray(config.BUF_SIZE)
+        self._layer = None
+        self._sink = self._paste    # Bound once; creating it per call allocates
+
+    def load(self):
+        self._layer = None
+        self.anim.seek(0, self._sink)
+        return self._frame
+
+    def advance(self, layer):
+        self._layer = layer
+        start = time.ticks_us()
+        self.anim.next(self._sink)
+        self.read_us += time.ticks_diff(time.ticks_us(), start)
+        self.frames += 1
+
+    def close(self):
+        self.anim.close()
+
+    def _paste(self, x0, y0, x1, y1, data):
+        """Write one decoded rect into the frame and mark it dirty."""
+        kernels.paste_rect(self._frame, config.WIDTH, x0, y0, x1 - x0 + 1, y1 - y0 + 1, data)
+        if self._layer is not None:
+            self._layer.invalidate(x0, y0, x1, y1)
@@ -0,0 +1,62 @@
+# clock.py
+# Millisecond tick source for game logic
+#
+# GameState reads time through a clock object instead of calling
+# time.ticks_ms directly, so the same code runs on the device (system clock)
+# and in headless host simulations (VirtualClock), where time only moves when
+# the simulation says so. Both follow MicroPython's wrapping ticks arithmetic.
+
+import time
+
+TICKS_PERIOD = 1 << 30      # MicroPython's ticks_ms wraps at this value
+_TICKS_MAX = TICKS_PERIOD - 1
+_TICKS_HALF = TICKS_PERIOD // 2
+
+
+def _ticks_diff(a, b):
+    return ((a - b + _TICKS_HALF) & _TICKS_MAX) - _TICKS_HALF
+
+
+def _ticks_add(a, delta):
+    return (a + delta) & _TICKS_MAX
+
+
+class SystemClock:
+    """Real time: time.ticks_ms on MicroPython, time.monotonic on CPython."""
+
+    if hasattr(time, "ticks_ms"):
+        ticks_ms = staticmethod(time.ticks_ms)
+        ticks_diff = staticmethod(time.ticks_diff)
+        ticks_add = staticmethod(time.ticks_add)
+    else:
+        @staticmethod
+        def ticks_ms():
+            return int(time.monotonic() * 1000) & _TICKS_MAX
+
+        ticks_diff = staticmethod(_ticks_diff)
+        ticks_add = staticmethod(_ticks_add)
+
+
+class VirtualClock:
+    """Simulated time that only moves with advance() or set()."""
+
+    ticks_diff = staticmethod(_ticks_diff)
+    ticks_add = staticmethod(_ticks_add)
+
+    def __init__(self, start=0):
+        self.now = start & _TICKS_MAX
+
+    def ticks_ms(self):
+        return self.now
+
+    def advance(self, ms):
+        """Move time forward by ms."""
+        self.now = (self.now + ms) & _TICKS_MAX
+
+    def set(self, ticks):
+        """Jump to a ticks_ms value (e.g. a deadline from GameState)."""
+        self.now = ticks & _TICKS_MAX
+
+
+# Shared default for code that is not given a clock
+system = SystemClock()
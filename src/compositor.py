@@ -0,0 +1,318 @@
+# compositor.py
+# Layered compositor with dirty rectangle merging
+#
+# The screen is a stack of layers drawn bottom to top (base frame, sprite,
+# menu highlight). Layers report the screen rects they changed; once per frame
+# flush() merges overlapping or adjacent dirty rects, composites every layer
+# into each merged rect and pushes it to the display exactly once.
+#
+# With async_push the pushes go through Display.block_async: each band is sent
+# by DMA from one pool bank while the next band is composited into the other.
+
+from array import array
+import config
+import kernels
+
+
+class BufferPool:
+    """Shared scratch memory handed out as per-shape views.
+
+    Only one rect is composited at a time, so every shape is a memoryview onto
+    the same backing buffer. Views are cached by shape, so once the shapes used
+    at runtime have been seen (or reserved at startup) the render loop does not
+    touch the heap.
+
+    With banks=2 there are two backing buffers and flip() switches between
+    them, so one can be composited into while the other is still being sent
+    by DMA.
+    """
+
+    def __init__(self, capacity, banks=1):
+        self._banks = [memoryview(bytearray(capacity)) for _ in range(banks)]
+        self._bank = 0
+        self._views = {}            # (bank << 16) | (w << 8) | h -> memoryview
+        self.capacity = capacity
+        self.allocations = banks    # Backing buffers + every view created since
+
+    def reserve(self, w, h):
+        """Create the views for a w x h region ahead of time (every bank)."""
+        for bank in range(len(self._banks)):
+            self._view(bank, w, h)
+
+    def get(self, w, h):
+        """Return the shared buffer for a w x h region (contents undefined)."""
+        return self._view(self._bank, w, h)
+
+    def flip(self):
+        """Switch to the next bank (no-op with one bank)."""
+        self._bank += 1
+        if self._bank == len(self._banks):
+            self._bank = 0
+
+    def _view(self, bank, w, h):
+        key = (bank << 16) | (w << 8) | h
+        view = self._views.get(key)
+        if view is None:
+            nbytes = w * h * config.BPP
+            if nbytes > self.capacity:
+                raise ValueError(f"Region {w}x{h} exceeds pool capacity")
+            view = self._banks[bank][:nbytes]
+            self._views[key] = view
+            self.allocations += 1
+        return view
+
+    def max_rows(self, w):
+        """Number of w pixel wide rows that fit in the pool at once."""
+        return self.capacity // (w * config.BPP)
+
+
+class Layer:
+    """Base class for compositor layers.
+
+    Subclasses draw their pixels over a packed rect buffer in draw() and call
+    invalidate() whenever their content on screen changes.
+    """
+
+    def __init__(self):
+        self.compositor = None      # Set by Compositor.add_layer
+
+    def invalidate(self, x0, y0, x1, y1):
+        """Mark an inclusive screen rect of this layer as changed."""
+        if self.compositor is not None:
+            self.compositor.invalidate(x0, y0, x1, y1)
+
+    def collect(self):
+        """Called at the start of every flush to report pending changes."""
+        pass
+
+    def draw(self, buf, x0, y0, w, h):
+        """Draw this layer over buf, a packed w x h rect at screen (x0, y0)."""
+        raise NotImplementedError
+
+
+class BaseLayer(Layer):
+    """Opaque full-screen image at the bottom of the stack."""
+
+    def __init__(self, frame):
+        super().__init__()
+        self.frame = memoryview(frame)
+
+    def set_frame(self, frame):
+        """Replace the image (e.g. the next background frame); redraws everything."""
+        self.frame = memoryview(frame)
+        if self.compositor is not None:
+            self.compositor.invalidate_all()
+
+    def draw(self, buf, x0, y0, w, h):
+        kernels.copy_rect(buf, self.frame, config.WIDTH, x0, y0, w, h)
+
+
+class OverlayLayer(Layer):
+    """Static full-screen image drawn through its opaque spans.
+
+    Used for the menu when it cannot be pre-composited into the base frame
+    (animated background).
+    """
+
+    def __init__(self, image, spans):
+        """
+        Args:
+            image: Full-screen RGB565 buffer
+            spans: array('H') of flat (start, end) byte offsets of the opaque
+                runs in image, in row order
+        """
+        super().__init__()
+        self.image = memoryview(image)
+        self.spans = spans
+
+    def draw(self, buf, x0, y0, w, h):
+        kernels.blit_spans(buf, w, 0, 0, self.image, config.WIDTH, self.spans, x0, y0, w, h)
+
+
+class MenuHighlightLayer(Layer):
+    """Inverts the pixels under the selected menu rect."""
+
+    def __init__(self, rects):
+        super().__init__()
+        self.rects = rects
+        self.selected = None
+
+    def select(self, index):
+        """Move the highlight to rects[index] (None = no highlight)."""
+        if index == self.selected:
+            return
+        if self.selected is not None:
+            x0, y0, x1, y1 = self.rects[self.selected]
+            self.invalidate(x0, y0, x1, y1)
+        if index is not None:
+            x0, y0, x1, y1 = self.rects[index]
+            self.invalidate(x0, y0, x1, y1)
+        self.selected = index
+
+    def draw(self, buf, x0, y0, w, h):
+        if self.selected is None:
+            return
+        mx0, my0, mx1, my1 = self.rects[self.selected]
+        ix0 = max(mx0, x0)
+        iy0 = max(my0, y0)
+        ix1 = min(mx1, x0 + w - 1)
+        iy1 = min(my1, y0 + h - 1)
+        if ix0 <= ix1 and iy0 <= iy1:
+            kernels.invert_rect(buf, w, ix0 - x0, iy0 - y0, ix1 - ix0 + 1, iy1 - iy0 + 1)
+
+
+class Compositor:
+    """Collects dirty rects from the layers and pushes each one once per frame."""
+
+    def __init__(self, display, pool, max_rects=config.MAX_DIRTY_RECTS, async_push=False):
+        """
+        Args:
+            display: Display with block() (and block_async() for async_push)
+            pool: BufferPool to composite in; needs 2 banks for async_push
+            max_rects: Dirty rect capacity per frame
+            async_push: Overlap compositing with DMA pushes
+        """
+        self.display = display
+        self.pool = pool
+        self.layers = []
+        self.async_push = async_push
+
+        # Dirty rects as flat inclusive (x0, y0, x1, y1), fixed capacity
+        self._rects = array('h', [0] * (max_rects * 4))
+        self._max_rects = max_rects
+        self._count = 0
+
+        # Stats for the last flush
+        self.pushes = 0
+        self.pushed_bytes = 0
+
+    def add_layer(self, layer):
+        """Put a layer on top of the stack."""
+        layer.compositor = self
+        self.layers.append(layer)
+        return layer
+
+    def invalidate(self, x0, y0, x1, y1):
+        """Mark an inclusive screen rect as needing a push."""
+        x0 = max(0, x0)
+        y0 = max(0, y0)
+        x1 = min(config.WIDTH - 1, x1)
+        y1 = min(config.HEIGHT - 1, y1)
+        if x0 > x1 or y0 > y1:
+            return
+
+        rects = self._rects
+        if self._count == self._max_rects:
+            # Out of slots: grow the last rect to cover the new one
+            i = (self._count - 1) * 4
+            rects[i] = min(rects[i], x0)
+            rects[i + 1] = min(rects[i + 1], y0)
+            rects[i + 2] = max(rects[i + 2], x1)
+            rects[i + 3] = max(rects[i + 3], y1)
+            return
+
+        i = self._count * 4
+        rects[i] = x0
+        rects[i + 1] = y0
+        rects[i + 2] = x1
+        rects[i + 3] = y1
+        self._count += 1
+
+    def invalidate_all(self):
+        """Mark the whole screen as needing a push."""
+        self.invalidate(0, 0, config.WIDTH - 1, config.HEIGHT - 1)
+
+    def flush(self):
+        """Merge the dirty rects, then composite and push each one.
+
+        Returns:
+            int: Number of display pushes made
+        """
+        for layer in self.layers:
+            layer.collect()
+
+        self.pushes = 0
+        self.pushed_bytes = 0
+        if self._count == 0:
+            return 0
+
+        self._merge()
+        rects = self._rects
+        for i in range(0, self._count * 4, 4):
+            self._composite(rects[i], rects[i + 1], rects[i + 2], rects[i + 3])
+        self._count = 0
+        return self.pushes
+
+    def _should_merge(self, i, j):
+        """Decide whether dirty rects i and j (flat offsets) become one push.
+
+        Overlapping or touching rects are merged while the bounding box costs
+        no more than pushing both (overlap counted twice) plus the per-push
+        overhead RECT_PUSH_COST_BYTES. Overlaps that are not merged are just
+        pushed twice; merging them anyway could snowball into one huge rect.
+        """
+        r = self._rects
+        ax0, ay0, ax1, ay1 = r[i], r[i + 1], r[i + 2], r[i + 3]
+        bx0, by0, bx1, by1 = r[j], r[j + 1], r[j + 2], r[j + 3]
+
+        if ax0 > bx1 + 1 or bx0 > ax1 + 1 or ay0 > by1 + 1 or by0 > ay1 + 1:
+            return False
+
+        merged = (max(ax1, bx1) - min(ax0, bx0) + 1) * (max(ay1, by1) - min(ay0, by0) + 1)
+        separate = (ax1 - ax0 + 1) * (ay1 - ay0 + 1) + (bx1 - bx0 + 1) * (by1 - by0 + 1)
+        return (merged - separate) * config.BPP <= config.RECT_PUSH_COST_BYTES
+
+    def _merge(self):
+        """Merge dirty rects pairwise until no pair qualifies."""
+        r = self._rects
+        i = 0
+        while i < self._count:
+            merged = False
+            j = i + 1
+            while j < self._count:
+                a = i * 4
+                b = j * 4
+                if self._should_merge(a, b):
+                    r[a] = min(r[a], r[b])
+                    r[a + 1] = min(r[a + 1], r[b + 1])
+                    r[a + 2] = max(r[a + 2], r[b + 2])
+                    r[a + 3] = max(r[a + 3], r[b + 3])
+
+                    # Fill the hole with the last rect
+                    self._count -= 1
+                    last = self._count * 4
+                    r[b] = r[last]
+                    r[b + 1] = r[last + 1]
+                    r[b + 2] = r[last + 2]
+                    r[b + 3] = r[last + 3]
+                    merged = True
+                else:
+                    j += 1
+
+            # A grown rect may now touch ones it was checked against; recheck
+            # it, but not the earlier rects (a missed merge only costs a push)
+            if not merged:
+                i += 1
+
+    def _composite(self, x0, y0, x1, y1):
+        """Draw every layer into one rect and push it.
+
+        Rects taller than the pool are composited in bands of full rows.
+        """
+        w = x1 - x0 + 1
+        band = self.pool.max_rows(w)
+        y = y0
+        while y <= y1:
+            h = min(band, y1 - y + 1)
+            buf = self.pool.get(w, h)
+            for layer in self.layers:
+                layer.draw(buf, x0, y, w, h)
+            if self.async_push:
+                # The DMA owns buf until the next push waits for it
+                self.display.block_async(x0, y, x1, y + h - 1, buf)
+                self.pool.flip()
+            else:
+                self.display.block(x0, y, x1, y + h - 1, buf)
+            self.pushes += 1
+            self.pushed_bytes += len(buf)
+            y += h
@@ -36,11 +36,51 @@ PIN_BTN_C = 12  # GP12 -> Back/Cancel
 # =============================================================================
 SCREEN_TIMEOUT_MS = 20_000       # Screen sleep after 20s inactivity
 GAME_TICK_MS = 600               # Game logic tick (600ms, OSRS-inspired)
+TICK_CATCHUP_MAX = 10            # Owed ticks run one by one; longer gaps use TICK_GAP_POLICY
+TICK_GAP_POLICY = "fast_forward" # "fast_forward" (apply every owed tick in bulk) or "drop"
+                                 # (run TICK_CATCHUP_MAX ticks, skip the rest of the gap)
 BG_FRAME_DELAY_MS = 80           # Background animation speed (~12.5 FPS)
 SPRITE_FPS = 3                   # Sprite animation speed
 SPRITE_FRAME_DELAY_MS = int(1000 / SPRITE_FPS)
-INPUT_POLL_MS = 5                # Button polling interval (fast for responsiveness)
-DEBOUNCE_MS = 100                # Button debounce time (filters press/release bounce)
+DEBOUNCE_MODE = "edge"           # "edge" (pin IRQs; needed for SCREEN_OFF_LIGHTSLEEP button wake),
+                                 # "timer" (sample pins on a machine.Timer: DEBOUNCE_SAMPLE_MS
+                                 # wakeups even when idle, DEBOUNCE_SAMPLES periods added per
+                                 # edge) or "pio" (PIO state machine; PIN_BTN_A..C consecutive)
+DEBOUNCE_SAMPLE_MS = 5           # "timer"/"pio": pin sampling period ("pio": 1-16 ms at 150 MHz,
+                                 # bounded by the slowest state machine clock, clk_sys / 65536)
+DEBOUNCE_SAMPLES = 6             # "timer"/"pio": equal readings in a row to accept a press/release (2-16)
+PIO_BUTTONS_SM = 0               # "pio": state machine ID
+DEBOUNCE_MS = 100                # "edge": min time between accepted edges (press/release)
+INPUT_QUEUE_SIZE = 16            # Button edge events buffered between updates
+CHORD_WINDOW_MS = 150            # Buttons pressed within this window form a chord (A+C = start)
+LONG_PRESS_MS = 800              # Hold time reported as a long press
+REPEAT_DELAY_MS = 500            # Hold time before a button starts auto-repeating
+REPEAT_INTERVAL_MS = 150         # Auto-repeat period while held
+REPEAT_BUTTONS = (0,)            # Buttons that auto-repeat (0 = A / Next)
+RUNTIME = "loop"                 # "loop" (deadline scheduler) or "async" (asyncio tasks)
+SCREEN_OFF_LIGHTSLEEP = False    # "loop" runtime: machine.lightsleep while the screen is off
+                                 # (USB serial drops out while asleep)
+LIGHTSLEEP_MAX_MS = 60_000       # Longest single lightsleep
+SCHED_STATS_MS = 0               # Print main loop wakeups and CPU load every N ms (0 = off)
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+USE_NATIVE_KERNELS = True        # Viper pixel kernels on MicroPython (pure Python fallback)
+TRACK_RENDER_ALLOCS = False      # Count heap bytes allocated per rendered frame (debug)
+LATENCY_TRACE = False            # Input-to-photon latency histograms (latency.py): type 'l' on
+                                 # the serial console for p50/p95/max per stage, 'r' to reset
+TRACK_SPI_BYTES = False          # Print command vs pixel bytes sent per rendered frame (debug)
+RENDER_ON_CORE1 = False          # Composite and push on core 1 (_thread), game logic on core 0
+RENDER_QUEUE_SIZE = 32           # Render commands queued for core 1 before core 0 waits
+USE_SPI_DMA = False              # Send pixels by DMA, compositing the next rect meanwhile (RP2 only)
+
+# Compositor: layers report dirty rects, which are merged and pushed once per
+# frame. Touching rects are merged while the extra unchanged pixels cost less
+# than RECT_PUSH_COST_BYTES, an estimate of the fixed per-push overhead
+# (window commands + Python call) in bytes.
+MAX_DIRTY_RECTS = 128            # Dirty rects tracked per frame before they are unioned
+RECT_PUSH_COST_BYTES = 256
 
 # =============================================================================
 # GAME PHASES (lifecycle state machine)
@@ -53,6 +93,7 @@ PHASE_DEAD = 3       # Death state (transitions immediately back to WAITING)
 # Lifecycle timing (in game ticks, 1 tick = 600ms)
 EGG_HATCH_TICKS = 100    # Ticks before egg hatches (~60 seconds)
 DEATH_TICKS = 100        # Ticks after hatching before death (~60 seconds)
+SICK_CHANCE = 0.0        # Per-tick chance of falling sick while hunger or happiness < 20
 
 # =============================================================================
 # SPRITE SHEET (yoshisprite.raw: 320x96, 32x32 frames)
@@ -90,6 +131,19 @@ SPRITE_DISPLAY_H = SPRITE_H * SPRITE_SCALE
 SPRITE_X = (WIDTH - SPRITE_DISPLAY_W) // 2
 SPRITE_Y = (HEIGHT - SPRITE_DISPLAY_H) // 2
 
+# Pre-scaled frame cache (trades RAM for speed)
+# Each cached frame holds a SPRITE_DISPLAY_W x SPRITE_DISPLAY_H buffer (8 KB at
+# 2x scale) plus its opaque-span mask, so an animation step becomes a few slice
+# copies instead of a per-pixel scaling loop.
+SPRITE_CACHE_FRAMES = 10      # Max cached frames (0 = disabled, re-scale on every change)
+SPRITE_CACHE_PRELOAD = True   # Pre-scale CURRENT_ANIM frames in load_assets
+
+# Frame-to-frame diff rendering
+# Consecutive animation frames mostly overlap, so only the changed
+# sub-rectangles are pushed over SPI. Rows are merged into one rectangle while
+# the extra unchanged pixels cost less than RECT_PUSH_COST_BYTES.
+SPRITE_DIFF_RENDER = True
+
 # =============================================================================
 # EGG SPRITE SHEET (yoshieggs.raw: 128x160, 32x32 frames)
 # =============================================================================
@@ -162,6 +216,28 @@ MENU_RECTS = [
 # ASSET PATHS
 # =============================================================================
 ASSET_BG = "tree-bg.raw"
+
+# Animated background (assets/water_gif), streamed from flash instead of ASSET_BG.
+# The menu is then overlaid on every frame.
+#   "raw"   - full frames, two 32 KB buffers, whole screen pushed every frame
+#   "delta" - ASSET_BG_DELTA (utils/raw2delta.py), one 32 KB buffer, only the
+#             changed rects are pushed
+BG_ANIMATED = False
+BG_ANIM_FORMAT = "delta"
+ASSET_BG_FRAMES = "water_%02d.raw"  # %d = frame number (see water_gif/mv_gif.sh)
+BG_FRAME_COUNT = 20
+ASSET_BG_DELTA = "water.dlt"
+BG_STATS_FRAMES = 0           # Print streaming stats every N frames (0 = off)
 ASSET_MENU = "menutest.raw"  # Menu overlay with transparency
 ASSET_SPRITE = "yoshisprite.raw"
 ASSET_EGGS = "yoshieggs.raw"
+
+# Sprite sheet storage format
+#   "raw" - plain RGB565, every pixel tested against TRANSPARENT_KEY
+#   "rle" - opaque spans only (utils/raw2rle.py), smaller and faster to blit
+#   "idx" - 4-bit palette indices (utils/raw2idx.py), smallest in RAM
+SPRITE_FORMAT = "rle"
+ASSET_SPRITE_RLE = "yoshisprite.rle"
+ASSET_EGGS_RLE = "yoshieggs.rle"
+ASSET_SPRITE_IDX = "yoshisprite.idx"
+ASSET_EGGS_IDX = "yoshieggs.idx"
@@ -0,0 +1,102 @@
+# debounce.py
+# Button debounce engines
+#
+# Both turn raw button readings (1 = down) into clean press/release events,
+# handed to push(button, edge, ticks_us), which queues the event and returns
+# False if it could not (Input's event ring when full). Neither touches pins
+# or timers, so utils/bounce_sim.py runs this same code on bounce traces.
+#
+#   EdgeDebouncer  - called from a pin IRQ on every edge: a level change is
+#                    accepted DEBOUNCE_MS after the last accepted one. Work
+#                    grows with the bounce, and a level that settles inside
+#                    the lockout is only picked up by a later call.
+#   ShiftDebouncer - called for every button from one periodic timer: each
+#                    reading is shifted into a per-button history and the
+#                    level flips once the last N readings agree. Constant
+#                    work per sample however noisy the contacts are.
+
+from array import array
+
+try:
+    from time import ticks_diff, ticks_add
+except ImportError:
+    # CPython (host tools): same wrapping arithmetic
+    from clock import SystemClock
+    ticks_diff = SystemClock.ticks_diff
+    ticks_add = SystemClock.ticks_add
+
+
+class EdgeDebouncer:
+    """Lockout debounce for edge interrupts."""
+
+    def __init__(self, buttons, lockout_ms, push, now_ms=0):
+        """
+        Args:
+            buttons: Number of buttons
+            lockout_ms: Minimum time between accepted edges of a button
+            push: Event sink, push(button, edge, ticks_us) -> bool
+            now_ms: ticks_ms to start the lockout from
+        """
+        self.level = bytearray(buttons)     # Debounced level, 1 = down
+        self.last_edge = array('i', [now_ms] * buttons)  # ticks_ms
+        self.lockout_ms = lockout_ms
+        self.push = push
+
+    def edge(self, idx, level, now_ms, t):
+        """Feed the level read after an edge (ISR-safe, allocation-free).
+
+        Also used outside the ISR (IRQs disabled) to pick up a level that
+        settled inside the lockout.
+
+        Returns:
+            bool: True if a press was accepted
+        """
+        if level == self.level[idx]:
+            return False
+        if (ticks_diff(now_ms, self.last_edge[idx]) > self.lockout_ms
+                and self.push(idx, level, t)):
+            self.level[idx] = level
+            self.last_edge[idx] = now_ms
+            return level == 1
+        return False
+
+
+class ShiftDebouncer:
+    """Shift-register debounce for periodic sampling."""
+
+    def __init__(self, buttons, samples, period_us, push):
+        """
+        Args:
+            buttons: Number of buttons
+            samples: Equal readings in a row that set the level (1-16)
+            period_us: Sampling period, to date events back to the first
+                of the agreeing readings
+            push: Event sink, push(button, edge, ticks_us) -> bool
+        """
+        self.level = bytearray(buttons)     # Debounced level, 1 = down
+        self.history = array('H', [0] * buttons)
+        self.mask = (1 << samples) - 1
+        self.lag_us = (samples - 1) * period_us
+        self.push = push
+
+    def sample(self, idx, level, t):
+        """Feed one reading taken at ticks_us t (ISR-safe, allocation-free).
+
+        A reading the sink refuses is retried on the next sample, since the
+        history stays saturated.
+
+        Returns:
+            bool: True if a press was accepted
+        """
+        history = ((self.history[idx] << 1) | level) & self.mask
+        self.history[idx] = history
+        if history == self.mask:
+            level = 1
+        elif history == 0:
+            level = 0
+        else:
+            return False
+        if level != self.level[idx] and self.push(idx, level, ticks_add(t, -self.lag_us)):
+            self.level[idx] = level
+            return level == 1
+        return False
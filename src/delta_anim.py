@@ -0,0 +1,95 @@
+# delta_anim.py
+# Decoder for delta-encoded full-screen animations (.dlt, see utils/raw2delta.py)
+#
+# Records are read one rect at a time into a small reusable buffer and handed
+# to a sink with the Display.block signature, sink(x0, y0, x1, y1, data):
+# pass display.block to push only the deltas straight to the screen, or a
+# function that pastes them into a frame buffer (background.DeltaBackground).
+
+from array import array
+from struct import unpack_from
+from compositor import BufferPool
+
+_KEYFRAME = 0x80000000
+
+
+class DeltaAnimation:
+    """Seekable reader for a .dlt animation."""
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+        header = self._f.read(16)
+        if header[:4] != b'DLT1':
+            raise ValueError("Not a delta animation")
+        self.width, self.height, self.count, _ = unpack_from('>4H', header, 4)
+        max_rect_bytes = unpack_from('>I', header, 12)[0]
+
+        # Record offsets and keyframe flags; record count is the loop delta.
+        # Split apart so no lookup creates a large (heap) int.
+        index = unpack_from('>%dI' % (self.count + 1), self._f.read((self.count + 1) * 4))
+        self._offsets = array('I', [entry & ~_KEYFRAME for entry in index])
+        self._keyframes = bytearray([1 if entry & _KEYFRAME else 0 for entry in index])
+
+        # Rect pixels are read into views of one buffer, like the compositor's
+        self.pool = BufferPool(max_rect_bytes)
+        self._count_buf = bytearray(2)
+        self._rect_buf = bytearray(4)
+
+        self.frame = -1         # Last decoded frame (-1 = none yet)
+
+    def next(self, sink):
+        """Decode the frame after the current one (looping) into sink.
+
+        Returns:
+            int: The new frame number
+        """
+        if self.frame < 0:
+            return self.seek(0, sink)
+        nxt = self.frame + 1
+        if nxt == self.count:
+            self._decode(self.count, sink)
+            nxt = 0
+        else:
+            self._decode(nxt, sink)
+        self.frame = nxt
+        return nxt
+
+    def seek(self, index, sink):
+        """Decode frame index into sink, starting from the keyframe before it.
+
+        The sink must start from a clean slate (every rect since the keyframe
+        is replayed in order).
+
+        Returns:
+            int: index
+        """
+        key = index
+        while not self._keyframes[key]:
+            key -= 1
+        for record in range(key, index + 1):
+            self._decode(record, sink)
+        self.frame = index
+        return index
+
+    def close(self):
+        """Close the animation file."""
+        self._f.close()
+
+    def _decode(self, record, sink):
+        """Read one record and pass each of its rects to sink."""
+        f = self._f
+        f.seek(self._offsets[record])
+        count = self._count_buf
+        f.readinto(count)
+        rect = self._rect_buf
+
+        for _ in range((count[0] << 8) | count[1]):
+            f.readinto(rect)
+            x0 = rect[0]
+            y0 = rect[1]
+            x1 = rect[2]
+            y1 = rect[3]
+            data = self.pool.get(x1 - x0 + 1, y1 - y0 + 1)
+            if f.readinto(data) != len(data):
+                raise ValueError(f"Truncated delta record {record}")
+            sink(x0, y0, x1, y1, data)
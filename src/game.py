@@ -1,6 +1,7 @@
 # game.py
 # Main game loop: ties together all modules
 
+import gc
 import time
 import random
 import config
@@ -8,6 +9,7 @@ from hardware import Hardware
 from graphics import Graphics
 from input import Input
 from game_state import GameState
+from scheduler import Scheduler, earliest
 
 
 class Game:
@@ -18,10 +20,21 @@ class Game:
         self.graphics = None
         self.input = None
         self.state = None
+        self.scheduler = Scheduler()
+        self.runtime = None     # AsyncRuntime when config.RUNTIME == "async"
+        self.render_worker = None   # RenderWorker when config.RENDER_ON_CORE1
+        self.latency = None     # LatencyTracker when config.LATENCY_TRACE
         self.running = False
         
+        # Next animated background frame (ticks_ms)
+        self._next_bg_time = 0
+        
         # Track phase transitions for rendering
         self._last_phase = None
+        
+        # Render allocation tracking (config.TRACK_RENDER_ALLOCS)
+        self.render_frames = 0
+        self.render_alloc_bytes = 0
     
     def init(self):
         """Initialize all game systems."""
@@ -37,51 +50,125 @@ class Game:
         self.graphics = Graphics(self.hardware.display)
         self.graphics.load_assets()
         
+        # Do initial full-screen render (no sprite in PHASE_WAITING)
+        self.graphics.render_initial(show_sprite=False)
+        
+        # From here on, with RENDER_ON_CORE1 only the worker touches Graphics
+        # and the display; the game and Input talk to it through a client
+        display = self.hardware.display
+        if config.RENDER_ON_CORE1:
+            from render_worker import RenderWorker, RenderClient
+            self.render_worker = RenderWorker(self.graphics, display, config.RENDER_QUEUE_SIZE)
+            self.render_worker.start()
+            self.graphics = RenderClient(self.render_worker)
+            display = self.graphics
+        
+        # Button presses wake whichever runtime drives the game
+        if config.RUNTIME == "async":
+            from async_runtime import AsyncRuntime
+            self.runtime = AsyncRuntime(self)
+            on_press = self.runtime.input_flag.set
+        else:
+            on_press = self.scheduler.wake
+        
         self.input = Input(
-            self.hardware.display,
-            self.hardware.get_buttons()
+            display,
+            self.hardware.get_buttons(),
+            on_press=on_press
         )
         
         self.state = GameState()
         self._last_phase = self.state.phase
         
-        # Do initial full-screen render (no sprite in PHASE_WAITING)
-        self.graphics.render_initial(show_sprite=False)
+        if (config.SCREEN_OFF_LIGHTSLEEP and self.runtime is None
+                and (config.DEBOUNCE_MODE != "edge" or self.render_worker is not None)):
+            print("SCREEN_OFF_LIGHTSLEEP ignored: needs DEBOUNCE_MODE \"edge\" "
+                  "and RENDER_ON_CORE1 off")
+        
+        if config.LATENCY_TRACE:
+            import latency
+            self.latency = latency.LatencyTracker()
+            latency.tracker = self.latency
         
         print("DigiTama ready! Press BTN A + BTN C to start.")
     
     def run(self):
-        """Main game loop."""
+        """Run the game with the configured runtime (config.RUNTIME)."""
+        if self.runtime is not None:
+            self.runtime.run()
+        else:
+            self._run_loop()
+    
+    def _run_loop(self):
+        """Main game loop.
+        
+        Each pass updates and renders, then sleeps until the next deadline
+        (game tick, sprite or background frame, screen timeout) or until a
+        button ISR wakes the scheduler.
+        """
         self.running = True
-        last_update_time = time.ticks_ms()
+        self._next_bg_time = time.ticks_ms()
+        self.scheduler.reset_stats()
         
         while self.running:
-            # Check if it's time to update/render
-            now = time.ticks_ms()
-            elapsed = time.ticks_diff(now, last_update_time)
-            
-            if elapsed >= config.BG_FRAME_DELAY_MS:
-                last_update_time = now
-                self._update()
+            self._update()
+            if config.TRACK_RENDER_ALLOCS:
+                self._render_tracked()
+            else:
                 self._render()
+            
+            if self.latency is not None:
+                self.latency.pushed()
+                self.latency.poll_serial()
+            
+            if config.SCHED_STATS_MS:
+                self._report_scheduler_stats()
+            
+            # (Not with the render worker: core 1 has to be idle to lightsleep,
+            # and only pin IRQs, not the debounce timer, wake it on a press)
+            if (config.SCREEN_OFF_LIGHTSLEEP and not self.input.screen_on
+                    and self.render_worker is None and config.DEBOUNCE_MODE == "edge"):
+                self._sleep_screen_off()
             else:
-                # Sleep between updates - interrupts will still fire and set flags
-                time.sleep_ms(config.INPUT_POLL_MS)
+                self.scheduler.sleep_until(self._next_deadline())
+    
+    def _sleep_screen_off(self):
+        """Light-sleep until the next phase change or a button press.
+        
+        Nothing is drawn with the screen off, so the ticks in between are
+        not worth waking for: they are applied in one batch on wake.
+        """
+        deadline = self.state.next_transition_time()
+        if deadline is None:
+            # Waiting for a new game: only a button press matters
+            deadline = time.ticks_add(time.ticks_ms(), config.LIGHTSLEEP_MAX_MS)
+        self.scheduler.sleep_until(deadline, light=True)
+        self._tick(catch_up=True)
+    
+    def _next_deadline(self):
+        """Return the ticks_ms time anything next needs doing."""
+        # Game ticks run even with the screen off, and held buttons need
+        # their long press / auto-repeat decoded
+        deadline = earliest(self.state.next_tick_time(), self.input.next_deadline())
+        
+        if self.input.screen_on:
+            deadline = earliest(deadline, self.input.timeout_deadline())
+            if self.state.phase in (config.PHASE_EGG, config.PHASE_ALIVE):
+                deadline = earliest(deadline, self.state.next_sprite_time())
+            if self.graphics.background is not None:
+                deadline = earliest(deadline, self._next_bg_time)
+        
+        return deadline
     
     def _update(self):
         """Update game logic."""
         # Process input and screen sleep
+        if self.latency is not None:
+            self.latency.wake()
         screen_on, just_woke, pressed = self.input.update()
         
-        # Store previous phase to detect transitions
-        prev_phase = self.state.phase
-        
         # Update game tick (600ms timer for stats/lifecycle) - even when screen is off
-        tick_occurred = self.state.update()
-        
-        # Check for phase transitions
-        if self.state.phase != prev_phase:
-            self._handle_phase_transition(prev_phase, self.state.phase)
+        self._tick()
         
         if not screen_on:
             # Screen is off - skip input handling and animation
@@ -96,8 +183,35 @@ class Game:
         
         # Phase-specific input handling
         self._handle_input(btn_a, btn_b, btn_c)
+        if self.latency is not None:
+            self.latency.handled(self.input.pending_edge())
+        self.input.handled()
+        
+        self._animate()
+    
+    def _tick(self, catch_up=False):
+        """Run the game ticks that are due and handle any phase transition.
+        
+        Args:
+            catch_up: Fast-forward however many ticks are owed (see
+                GameState.update)
+        
+        Returns:
+            bool: True if a game tick occurred
+        """
+        # Store previous phase to detect transitions
+        prev_phase = self.state.phase
         
-        # Update sprite/egg animation timing
+        tick_occurred = self.state.update(catch_up)
+        
+        # Check for phase transitions
+        if self.state.phase != prev_phase:
+            self._handle_phase_transition(prev_phase, self.state.phase)
+        
+        return tick_occurred
+    
+    def _animate(self):
+        """Advance the sprite/egg animation frame if due."""
         if self.state.should_advance_sprite():
             if self.state.phase == config.PHASE_EGG:
                 self.graphics.advance_egg_frame()
@@ -105,12 +219,17 @@ class Game:
                 self.graphics.advance_sprite_frame()
     
     def _handle_input(self, btn_a, btn_b, btn_c):
-        """Handle button input based on current game phase."""
+        """Handle button input based on current game phase.
+        
+        Args:
+            btn_a, btn_b, btn_c: Press counts from Input.update()
+        """
         phase = self.state.phase
         
         if phase == config.PHASE_WAITING:
-            # Check for simultaneous BTN A + BTN C to start game
-            if btn_a and btn_c:
+            # BTN A + BTN C pressed together (within CHORD_WINDOW_MS, in
+            # either order and across loop passes) starts the game
+            if self.input.chord & Input.CHORD_START == Input.CHORD_START:
                 egg_color, egg_size = self.state.start_game()
                 self.graphics.set_egg(egg_color, egg_size)
                 print(f"Egg spawned! Color={egg_color}, Size={egg_size}")
@@ -122,12 +241,13 @@ class Game:
         
         elif phase == config.PHASE_ALIVE:
             # Normal gameplay - menu navigation enabled
-            if btn_a:  # Next
+            if btn_a:  # Next (one step per press or auto-repeat)
                 old_selection = self.state.menu.selected
-                self.state.menu.select_next()
+                for _ in range(btn_a):
+                    self.state.menu.select_next()
                 self.graphics.update_menu_selection(old_selection, self.state.menu.selected)
             
-            if btn_b:  # Confirm
+            for _ in range(btn_b):  # Confirm
                 action = self.state.menu.confirm()
                 if action is not None:
                     self.state.handle_menu_action(action)
@@ -157,8 +277,7 @@ class Game:
         elif new_phase == config.PHASE_ALIVE:
             # Egg hatched! Switch to pet sprite
             # Clear egg and draw initial pet sprite
-            self.graphics.sprite_frame_idx = 0
-            self.graphics.current_sprite_frame = -1  # Force redraw
+            self.graphics.reset_pet_sprite()
             print("Egg hatched! DigiTama born!")
         
         elif new_phase == config.PHASE_DEAD:
@@ -166,11 +285,22 @@ class Game:
             print("DigiTama died!")
     
     def _render(self):
-        """Render only changed regions (dirty rectangles)."""
+        """Render only changed regions (dirty rectangles), pushed once per frame."""
         # Don't render if screen is off
         if not self.input.screen_on:
             return
         
+        # Next animated background frame when due (runs at BG_FRAME_DELAY_MS;
+        # renders woken by input in between leave it alone)
+        if self.graphics.background is not None:
+            now = time.ticks_ms()
+            if time.ticks_diff(now, self._next_bg_time) >= 0:
+                self.graphics.advance_background()
+                self._next_bg_time = time.ticks_add(self._next_bg_time, config.BG_FRAME_DELAY_MS)
+                if time.ticks_diff(self._next_bg_time, now) <= 0:
+                    # Fell behind (e.g. screen was off): don't play catch-up
+                    self._next_bg_time = time.ticks_add(now, config.BG_FRAME_DELAY_MS)
+        
         phase = self.state.phase
         
         if phase == config.PHASE_WAITING:
@@ -188,6 +318,70 @@ class Game:
         elif phase == config.PHASE_DEAD:
             # No rendering during death transition
             pass
+        
+        # Push every region that changed this frame (sprite, menu, cleared areas)
+        self.graphics.present()
+        
+        if config.BG_STATS_FRAMES and self.graphics.background is not None:
+            self._report_background_stats()
+        
+        if config.TRACK_SPI_BYTES:
+            self._report_spi_bytes()
+    
+    def _report_scheduler_stats(self):
+        """Print main loop wakeups, CPU load and input latency every SCHED_STATS_MS."""
+        seconds, per_second, isr_wakeups, load, asleep = self.scheduler.stats()
+        if seconds * 1000 < config.SCHED_STATS_MS:
+            return
+        print(f"Scheduler: {self.scheduler.wakeups} wakeups in {seconds:.1f} s "
+              f"({per_second:.1f}/s, {isr_wakeups} from buttons), CPU load {load:.1f}%, "
+              f"lightsleep {asleep:.1f}% ({self.scheduler.light_sleeps} sleeps)")
+        presses, mean_us, max_us = self.input.latency_stats()
+        if presses:
+            print(f"Input: {presses} presses, edge to handled {mean_us} us mean, "
+                  f"{max_us} us max ({self.input.dropped} events dropped)")
+        self.scheduler.reset_stats()
+        self.input.reset_latency()
+    
+    def _report_spi_bytes(self):
+        """Print the command and pixel bytes sent this frame, if any."""
+        if self.render_worker is not None:
+            # Core 1 owns the display and its counters: report from there,
+            # after the frame just queued
+            self.graphics.report_spi_bytes()
+            return
+        display = self.hardware.display
+        if display.cmd_bytes or display.pixel_bytes:
+            print(f"SPI frame: {display.cmd_bytes} cmd bytes, {display.pixel_bytes} pixel bytes")
+            display.reset_counters()
+    
+    def _report_background_stats(self):
+        """Print background streaming performance every BG_STATS_FRAMES frames."""
+        background = self.graphics.background
+        if background.frames < config.BG_STATS_FRAMES:
+            return
+        frames, read_ms, push_ms, push_kb, fps, spi_fps = background.stats()
+        print(f"Background: {frames} frames, read {read_ms:.1f} ms, push {push_ms:.1f} ms "
+              f"({push_kb:.1f} KB), sustainable {fps:.1f} FPS (SPI limit {spi_fps:.1f} FPS, "
+              f"target {1000 / config.BG_FRAME_DELAY_MS:.1f} FPS)")
+        background.reset_stats()
+    
+    def _render_tracked(self):
+        """Render one frame and count the heap bytes it allocated.
+        
+        The steady-state render loop should allocate nothing; any frame that
+        does is reported so the offending path can be found.
+        """
+        before = gc.mem_alloc()
+        self._render()
+        allocated = gc.mem_alloc() - before
+        self.render_frames += 1
+        
+        # A negative delta means a collection ran mid-frame; ignore it
+        if allocated > 0:
+            self.render_alloc_bytes += allocated
+            print(f"Render frame {self.render_frames} allocated {allocated} bytes "
+                  f"(pool allocations {self.graphics.pool.allocations})")
     
     def stop(self):
         """Stop the game loop."""
@@ -195,6 +389,12 @@ class Game:
     
     def cleanup(self):
         """Clean up resources."""
+        if self.latency is not None and self.latency.events:
+            self.latency.report()
+        if self.render_worker:
+            self.render_worker.stop()  # Finish queued rendering first
+        if self.graphics and self.graphics.background:
+            self.graphics.background.close()
         if self.input:
             self.input.cleanup()  # Disable button IRQs
         if self.hardware:
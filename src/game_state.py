@@ -1,15 +1,22 @@
 # game_state.py
 # Game state management: pet stats, tick system, menu state, lifecycle phases
 
-import time
 import random
+from math import log
 import config
+import clock as _clock
 
 
 class PetStats:
     """Pet statistics that change over time."""
     
-    def __init__(self):
+    def __init__(self, rng=random):
+        """
+        Args:
+            rng: Random source with random() (the random module, or a seeded
+                random.Random for simulations)
+        """
+        self.rng = rng
         self.reset()
     
     def reset(self):
@@ -26,6 +33,7 @@ class PetStats:
         self.is_sleeping = False
         self.is_sick = False
         self.is_alive = True
+        self.sick_ticks = 0    # Ticks spent sick
         
         # Evolution tracking (for future)
         self.evolution_stage = 1  # 1=baby (just hatched)
@@ -33,30 +41,50 @@ class PetStats:
     
     def tick(self):
         """Called every game tick (600ms) to update stats."""
-        if not self.is_alive:
+        self.advance(1)
+    
+    def advance(self, n):
+        """Apply n game ticks at once; same result as calling tick() n times
+        (random events with the same odds).
+        
+        Used to catch up after a long gap without looping per tick.
+        """
+        if not self.is_alive or n <= 0:
             return
         
         # Age always increases
-        self.age_ticks += 1
+        self.age_ticks += n
         
         # Stat decay (adjust rates as needed)
         # Currently disabled until menu functions are implemented
         # if not self.is_sleeping:
-        #     self.hunger = max(0, self.hunger - 0.1)
-        #     self.happiness = max(0, self.happiness - 0.05)
-        #     self.energy = max(0, self.energy - 0.02)
+        #     self.hunger = max(0, self.hunger - 0.1 * n)
+        #     self.happiness = max(0, self.happiness - 0.05 * n)
+        #     self.energy = max(0, self.energy - 0.02 * n)
         # else:
         #     # Sleeping restores energy slowly
-        #     self.energy = min(100, self.energy + 0.2)
+        #     self.energy = min(100, self.energy + 0.2 * n)
+        # (With decay enabled, care mistakes below must count only the
+        # ticks after a stat reached 0.)
         
-        # Check for critical conditions
+        # Check for critical conditions (stats are constant between ticks)
         if self.hunger <= 0 or self.happiness <= 0:
-            self.care_mistakes += 1
+            self.care_mistakes += n
         
-        # Sickness chance when stats are low
-        if self.hunger < 20 or self.happiness < 20:
-            # Could add random sickness chance here
-            pass
+        # Sickness chance (SICK_CHANCE per tick) when stats are low
+        if not self.is_sick and config.SICK_CHANCE > 0 and (self.hunger < 20 or self.happiness < 20):
+            # Tick (1-based) of the first sickness roll to succeed, drawn in
+            # one go: geometric, so the same odds as rolling every tick
+            chance = config.SICK_CHANCE
+            if chance >= 1:
+                first = 1
+            else:
+                first = int(log(1.0 - self.rng.random()) / log(1.0 - chance)) + 1
+            if first <= n:
+                self.is_sick = True
+                self.sick_ticks += n - first + 1
+        elif self.is_sick:
+            self.sick_ticks += n
     
     def feed(self):
         """Feed the pet."""
@@ -138,8 +166,17 @@ class MenuState:
 class GameState:
     """Main game state container with lifecycle phase management."""
     
-    def __init__(self):
-        self.pet = PetStats()
+    def __init__(self, clock=None, rng=random):
+        """
+        Args:
+            clock: Tick source (clock.system by default; a clock.VirtualClock
+                for host simulations)
+            rng: Random source for eggs and pet events (the random module,
+                or a seeded random.Random)
+        """
+        self.clock = clock if clock is not None else _clock.system
+        self.rng = rng
+        self.pet = PetStats(rng)
         self.menu = MenuState()
         
         # Lifecycle phase (see config.PHASE_* constants)
@@ -151,35 +188,91 @@ class GameState:
         self.egg_size = None   # config.EGG_SMALL or EGG_BIG
         
         # Tick timing
-        self.last_tick_time = time.ticks_ms()
+        self.last_tick_time = self.clock.ticks_ms()
         self.tick_count = 0
         
         # Sprite animation timing (separate from game tick)
-        self.last_sprite_time = time.ticks_ms()
+        self.last_sprite_time = self.clock.ticks_ms()
     
-    def update(self):
+    def update(self, catch_up=False):
         """Update game state. Call every frame.
         
+        Every GAME_TICK_MS that has elapsed is owed a tick, so a late call
+        (slow render, GC pause) never loses time: the leftover part of a tick
+        carries over. Up to TICK_CATCHUP_MAX owed ticks run one by one;
+        larger gaps follow TICK_GAP_POLICY.
+        
+        Args:
+            catch_up: Always fast-forward large gaps, whatever the policy
+                (time deliberately spent asleep with the screen off)
+        
         Returns:
             bool: True if a game tick occurred this frame
         """
-        now = time.ticks_ms()
-        tick_occurred = False
-        
-        # Check for game tick (600ms)
-        if time.ticks_diff(now, self.last_tick_time) >= config.GAME_TICK_MS:
-            self.last_tick_time = now
-            self.tick_count += 1
-            tick_occurred = True
-            
-            # Phase-specific tick logic
-            self._tick_phase()
+        now = self.clock.ticks_ms()
+        owed = self.clock.ticks_diff(now, self.last_tick_time) // config.GAME_TICK_MS
+        if owed <= 0:
+            return False
+        
+        # Consume whole ticks only; the remainder stays in the accumulator
+        self.last_tick_time = self.clock.ticks_add(self.last_tick_time, owed * config.GAME_TICK_MS)
         
-        return tick_occurred
+        if owed <= config.TICK_CATCHUP_MAX:
+            for _ in range(owed):
+                self._tick_phase()
+        elif config.TICK_GAP_POLICY == "drop" and not catch_up:
+            # Run the cap and let the rest of the gap go by unplayed
+            for _ in range(config.TICK_CATCHUP_MAX):
+                self._tick_phase()
+            owed = config.TICK_CATCHUP_MAX
+        else:
+            self.advance_ticks(owed)
+        
+        self.tick_count += owed
+        return True
     
-    def _tick_phase(self):
-        """Handle game tick based on current phase."""
-        self.phase_ticks += 1
+    def advance_ticks(self, n):
+        """Run n game ticks in bulk; same result as n ticks one at a time.
+        
+        Each phase is advanced in one step up to its next transition, so the
+        cost depends on the number of phase changes, not on n.
+        """
+        while n > 0:
+            step = self._ticks_to_transition()
+            if step is None or step > n:
+                step = n
+            self._tick_phase(step)
+            n -= step
+    
+    def next_transition_time(self):
+        """Return the ticks_ms time of the next tick that changes phase.
+        
+        Returns:
+            int or None: None in PHASE_WAITING, which only ends on input
+        """
+        ticks = self._ticks_to_transition()
+        if ticks is None:
+            return None
+        return self.clock.ticks_add(self.last_tick_time, ticks * config.GAME_TICK_MS)
+    
+    def _ticks_to_transition(self):
+        """Number of ticks until the current phase ends (None = never by ticks)."""
+        phase = self.phase
+        if phase == config.PHASE_WAITING:
+            return None
+        if phase == config.PHASE_EGG:
+            return max(1, config.EGG_HATCH_TICKS - self.phase_ticks)
+        if phase == config.PHASE_ALIVE:
+            return max(1, config.DEATH_TICKS - self.pet.age_ticks)
+        return 1
+    
+    def _tick_phase(self, n=1):
+        """Handle n game ticks in the current phase.
+        
+        n must not run past the phase's next transition (see advance_ticks);
+        the transition check is made once, after the n ticks.
+        """
+        self.phase_ticks += n
         
         if self.phase == config.PHASE_WAITING:
             # No tick logic in waiting state
@@ -192,7 +285,7 @@ class GameState:
         
         elif self.phase == config.PHASE_ALIVE:
             # Update pet stats
-            self.pet.tick()
+            self.pet.advance(n)
             
             # Check for death (temporary: after DEATH_TICKS)
             if self.pet.age_ticks >= config.DEATH_TICKS:
@@ -211,8 +304,8 @@ class GameState:
             tuple: (egg_color, egg_size) for the spawned egg
         """
         # Choose random egg variant
-        self.egg_color = random.randint(0, 4)  # 0-4: GREEN, RED, BLUE, YELLOW, PINK
-        self.egg_size = random.randint(0, 1)   # 0-1: SMALL, BIG
+        self.egg_color = self.rng.randint(0, 4)  # 0-4: GREEN, RED, BLUE, YELLOW, PINK
+        self.egg_size = self.rng.randint(0, 1)   # 0-1: SMALL, BIG
         
         # Transition to egg phase
         self.phase = config.PHASE_EGG
@@ -247,7 +340,7 @@ class GameState:
         self.menu.clear_selection()
         
         # Reset pet for next game
-        self.pet = PetStats()
+        self.pet = PetStats(self.rng)
     
     def is_menu_enabled(self):
         """Check if menu navigation should be enabled.
@@ -263,12 +356,20 @@ class GameState:
         Returns:
             bool: True if sprite frame should advance
         """
-        now = time.ticks_ms()
-        if time.ticks_diff(now, self.last_sprite_time) >= config.SPRITE_FRAME_DELAY_MS:
+        now = self.clock.ticks_ms()
+        if self.clock.ticks_diff(now, self.last_sprite_time) >= config.SPRITE_FRAME_DELAY_MS:
             self.last_sprite_time = now
             return True
         return False
     
+    def next_tick_time(self):
+        """Return the ticks_ms time of the next game tick."""
+        return self.clock.ticks_add(self.last_tick_time, config.GAME_TICK_MS)
+    
+    def next_sprite_time(self):
+        """Return the ticks_ms time the sprite animation next advances."""
+        return self.clock.ticks_add(self.last_sprite_time, config.SPRITE_FRAME_DELAY_MS)
+    
     def handle_menu_action(self, menu_index):
         """Handle a confirmed menu action.
         
@@ -1,8 +1,91 @@
 # graphics.py
 # Graphics rendering with dirty rectangle optimization
-# Only updates changed regions (sprite area, menu highlights) instead of full screen
+# Only updates changed regions (sprite area, menu highlights) instead of full screen.
+# Changes are collected by the compositor (compositor.py) and pushed by present().
 
+import gc
+import time
+from array import array
 import config
+import kernels
+import sprites
+from background import AnimatedBackground, DeltaBackground
+from compositor import BufferPool, Compositor, Layer, BaseLayer, OverlayLayer, MenuHighlightLayer
+
+
+class SpriteLayer(Layer):
+    """The pet or egg sprite, drawn from pre-scaled frames.
+    
+    Remembers which frame was last reported to the compositor, so a step to
+    the next animation frame only dirties the precomputed frame diff rects.
+    """
+    
+    def __init__(self, graphics):
+        super().__init__()
+        self.graphics = graphics
+        self.frame = None       # (frame memoryview, opaque spans or None); None = hidden
+        self.ident = -1         # (sheet << 8) | (row << 4) | col of frame; -1 = hidden
+        self.shown = -1         # ident as of the last flush
+    
+    def show(self, sheet, row, col):
+        """Display frame (col, row) of sheet 0 (pet) or 1 (egg)."""
+        self.frame = self.graphics._scaled_frame(sheet, row, col)
+        self.ident = (sheet << 8) | (row << 4) | col
+    
+    def hide(self):
+        """Remove the sprite, uncovering the layers below."""
+        self.frame = None
+        self.ident = -1
+    
+    def collect(self):
+        if self.ident == self.shown:
+            return
+        
+        x0 = config.SPRITE_X
+        y0 = config.SPRITE_Y
+        
+        # Same sheet and row on both sides: only the changed parts are dirty
+        rects = None
+        if (config.SPRITE_DIFF_RENDER and self.shown >= 0 and self.ident >= 0 and
+                self.shown >> 4 == self.ident >> 4):
+            rects = self.graphics._diffs.get(self.graphics._diff_key(
+                self.ident >> 8, (self.ident >> 4) & 0xF, self.shown & 0xF, self.ident & 0xF
+            ))
+        
+        if rects is None:
+            self.invalidate(x0, y0, x0 + config.SPRITE_DISPLAY_W - 1, y0 + config.SPRITE_DISPLAY_H - 1)
+        else:
+            for i in range(0, len(rects), 4):
+                self.invalidate(x0 + rects[i], y0 + rects[i + 1], x0 + rects[i + 2], y0 + rects[i + 3])
+        self.shown = self.ident
+    
+    def draw(self, buf, x0, y0, w, h):
+        if self.frame is None:
+            return
+        
+        # Clip to the sprite region
+        sx0 = config.SPRITE_X
+        sy0 = config.SPRITE_Y
+        ix0 = max(sx0, x0)
+        iy0 = max(sy0, y0)
+        ix1 = min(sx0 + config.SPRITE_DISPLAY_W, x0 + w) - 1
+        iy1 = min(sy0 + config.SPRITE_DISPLAY_H, y0 + h) - 1
+        if ix0 > ix1 or iy0 > iy1:
+            return
+        
+        frame_mv, spans = self.frame
+        if spans is None:
+            kernels.blit_keyed(
+                buf, w, ix0 - x0, iy0 - y0,
+                frame_mv, config.SPRITE_DISPLAY_W, ix0 - sx0, iy0 - sy0,
+                ix1 - ix0 + 1, iy1 - iy0 + 1, config.TRANSPARENT_KEY
+            )
+        else:
+            kernels.blit_spans(
+                buf, w, ix0 - x0, iy0 - y0,
+                frame_mv, config.SPRITE_DISPLAY_W, spans, ix0 - sx0, iy0 - sy0,
+                ix1 - ix0 + 1, iy1 - iy0 + 1
+            )
 
 
 class Graphics:
@@ -11,10 +94,26 @@ class Graphics:
     def __init__(self, display):
         self.display = display
         
+        # Shared compositing scratch, sized for the whole sprite region. With a
+        # DMA sender attached, pushes are asynchronous and need a second bank
+        # to composite into while the first one is still being sent.
+        self.async_push = getattr(display, "dma", None) is not None
+        self.pool = BufferPool(config.SPRITE_DISPLAY_W * config.SPRITE_DISPLAY_H * config.BPP,
+                               banks=2 if self.async_push else 1)
+        
+        # Compositor and its layers, bottom to top (created in load_assets)
+        self.compositor = None
+        self.base_layer = None      # base_frame, or the current background frame
+        self.menu_overlay = None    # Menu over an animated background (else None)
+        self.sprite_layer = None    # Pet or egg
+        self.menu_layer = None      # Inverted menu selection
+        
         # Cached assets
         self.base_frame = None      # Pre-composited background + menu (clean copy)
-        self.sprite_buf = None      # Main sprite sheet (yoshisprite.raw)
-        self.egg_buf = None         # Egg sprite sheet (yoshieggs.raw)
+        self.background = None      # Animated/DeltaBackground when config.BG_ANIMATED
+        self.sprite_sheet = None    # Main sprite sheet (yoshisprite.raw/.rle/.idx)
+        self.egg_sheet = None       # Egg sprite sheet (yoshieggs.raw/.rle/.idx)
+        self._sheets = None         # (sprite_sheet, egg_sheet), indexed by sheet number
         
         # Current display state (what's actually on screen)
         self.current_menu_selection = None
@@ -35,6 +134,16 @@ class Graphics:
         # None = nothing, 'egg' = egg sprite, 'pet' = main sprite
         self.displayed_sprite_type = None
         
+        # Pre-scaled frame cache: key -> (frame memoryview, opaque spans)
+        # Keys are (sheet << 8) | (row << 4) | col; insertion order kept for eviction
+        self._frame_cache = {}
+        self._cache_order = []
+        self._scratch_entry = None  # (frame memoryview, None) when the cache is disabled
+        
+        # Frame diff tables: key -> array('B') of flat (x0, y0, x1, y1) region rects
+        # Keys are (sheet << 12) | (row << 8) | (from_col << 4) | to_col
+        self._diffs = {}
+        
         # Track if initial full render has been done
         self.initialized = False
     
@@ -42,6 +151,67 @@ class Graphics:
         """Load and pre-composite all static assets."""
         print("Loading assets...")
         
+        if config.BG_ANIMATED:
+            self._load_animated_background()
+        else:
+            self._load_static_background()
+        
+        # Load main sprite sheet (heap use measured for the format comparison)
+        mem_before = self._mem_free()
+        self.sprite_sheet = sprites.load_sheet(
+            config.ASSET_SPRITE, config.ASSET_SPRITE_RLE, config.ASSET_SPRITE_IDX,
+            config.SPRITE_SHEET_W, config.SPRITE_SHEET_H,
+            config.SPRITE_W, config.SPRITE_H
+        )
+        
+        # Load egg sprite sheet
+        self.egg_sheet = sprites.load_sheet(
+            config.ASSET_EGGS, config.ASSET_EGGS_RLE, config.ASSET_EGGS_IDX,
+            config.EGG_SHEET_W, config.EGG_SHEET_H,
+            config.EGG_SPRITE_W, config.EGG_SPRITE_H
+        )
+        self._sheets = (self.sprite_sheet, self.egg_sheet)
+        
+        mem_after = self._mem_free()
+        if mem_before is not None:
+            print(f"Sprite sheets ({config.SPRITE_FORMAT}): {mem_before - mem_after} bytes, "
+                  f"{mem_after} free")
+        
+        # Stack the layers
+        self.compositor = Compositor(self.display, self.pool, async_push=self.async_push)
+        if self.background is not None:
+            self.base_layer = self.compositor.add_layer(BaseLayer(self.background.load()))
+            if self.menu_overlay is not None:
+                self.compositor.add_layer(self.menu_overlay)
+        else:
+            self.base_layer = self.compositor.add_layer(BaseLayer(self.base_frame))
+        self.sprite_layer = self.compositor.add_layer(SpriteLayer(self))
+        self.menu_layer = self.compositor.add_layer(MenuHighlightLayer(config.MENU_RECTS))
+        
+        # Reserve pool views for every shape the render loop pushes
+        self.pool.reserve(config.SPRITE_DISPLAY_W, config.SPRITE_DISPLAY_H)
+        self.pool.reserve(config.WIDTH, self.pool.max_rows(config.WIDTH))
+        for x0, y0, x1, y1 in config.MENU_RECTS:
+            self.pool.reserve(x1 - x0 + 1, y1 - y0 + 1)
+        
+        # Precompute which parts of the sprite change between frames
+        if config.SPRITE_DIFF_RENDER:
+            print("Building frame diffs...")
+            self._build_diffs()
+        
+        if config.SPRITE_CACHE_FRAMES <= 0:
+            # One frame buffer, re-scaled on every change
+            self._scratch_entry = (memoryview(self._new_transparent_frame()), None)
+        elif config.SPRITE_CACHE_PRELOAD:
+            # Pre-scale the active animation so the first loop never stalls
+            print("Pre-scaling sprite frames...")
+            for frame in range(config.ANIM_FRAME_COUNTS[config.CURRENT_ANIM]):
+                self._scaled_frame(0, config.CURRENT_ANIM, frame)
+        
+        print("Assets loaded")
+    
+    def _load_static_background(self):
+        """Load ASSET_BG and pre-composite the menu onto it as base_frame."""
         # Load background
         bg_buf = self._load_raw(
             config.ASSET_BG,
@@ -59,22 +229,29 @@ class Graphics:
             self._overlay_colorkey(bg_buf, menu_buf)
         
         self.base_frame = bg_buf
+    
+    def _load_animated_background(self):
+        """Open the streamed background frames; the menu becomes its own layer."""
+        print("Opening background frames...")
+        if config.BG_ANIM_FORMAT == "delta":
+            self.background = DeltaBackground(config.ASSET_BG_DELTA)
+        else:
+            self.background = AnimatedBackground(config.ASSET_BG_FRAMES, config.BG_FRAME_COUNT)
         
-        # Load main sprite sheet
-        sprite_size = config.SPRITE_SHEET_W * config.SPRITE_SHEET_H * config.BPP
-        self.sprite_buf = self._load_raw(
-            config.ASSET_SPRITE,
-            sprite_size
-        )
-        
-        # Load egg sprite sheet
-        egg_size = config.EGG_SHEET_W * config.EGG_SHEET_H * config.BPP
-        self.egg_buf = self._load_raw(
-            config.ASSET_EGGS,
-            egg_size
-        )
-        
-        print("Assets loaded")
+        if config.ASSET_MENU:
+            menu_buf = self._load_raw(
+                config.ASSET_MENU,
+                config.BUF_SIZE
+            )
+            spans = self._opaque_spans(menu_buf, config.WIDTH, config.HEIGHT)
+            self.menu_overlay = OverlayLayer(menu_buf, spans)
+    
+    def _mem_free(self):
+        """Free heap bytes after a collection, or None off-device."""
+        if not hasattr(gc, "mem_free"):
+            return None
+        gc.collect()
+        return gc.mem_free()
     
     def _load_raw(self, path, expected_size):
         """Load a raw RGB565 file."""
@@ -90,31 +267,54 @@ class Graphics:
         Args:
             show_sprite: If True, draw initial pet sprite. If False, only show background.
         """
-        # Push full base frame to display
-        self.display.block(0, 0, config.WIDTH - 1, config.HEIGHT - 1, self.base_frame)
+        self.compositor.invalidate_all()
         
         if show_sprite:
             # Draw initial sprite
-            self._update_sprite_region(self.sprite_row, self.sprite_frame_idx)
+            self.sprite_layer.show(0, self.sprite_row, self.sprite_frame_idx)
             self.current_sprite_row = self.sprite_row
             self.current_sprite_frame = self.sprite_frame_idx
             self.displayed_sprite_type = 'pet'
         else:
             # No sprite displayed initially
+            self.sprite_layer.hide()
             self.displayed_sprite_type = None
         
+        self.present()
         self.initialized = True
     
-    def update_menu_selection(self, old_selection, new_selection):
-        """Update only the menu rectangles that changed."""
-        # Restore old selection (un-invert)
-        if old_selection is not None:
-            self._restore_and_push_rect(config.MENU_RECTS[old_selection])
+    def present(self):
+        """Push everything that changed since the last call to the display.
         
-        # Apply new selection (invert)
-        if new_selection is not None:
-            self._invert_and_push_rect(config.MENU_RECTS[new_selection])
+        Call once per rendered frame; the update_* methods only mark regions
+        dirty. With an animated background, the next frame is read from flash
+        afterwards.
         
+        Returns:
+            int: Number of display pushes made
+        """
+        if self.background is None:
+            return self.compositor.flush()
+        
+        start = time.ticks_us()
+        pushes = self.compositor.flush()
+        self.background.record_push(time.ticks_diff(time.ticks_us(), start),
+                                    self.compositor.pushed_bytes)
+        self.background.prefetch()
+        return pushes
+    
+    def advance_background(self):
+        """Show the next animated background frame (no-op for a static one)."""
+        if self.background is not None:
+            self.background.advance(self.base_layer)
+    
+    def update_menu_selection(self, old_selection, new_selection):
+        """Move the menu highlight; only the rectangles that changed are redrawn.
+        
+        old_selection is accepted for the callers' convenience; the menu layer
+        already knows what is highlighted.
+        """
+        self.menu_layer.select(new_selection)
         self.current_menu_selection = new_selection
     
     def update_sprite(self):
@@ -122,128 +322,16 @@ class Graphics:
         if (self.sprite_frame_idx != self.current_sprite_frame or
             self.sprite_row != self.current_sprite_row):
             
-            # Redraw sprite region with new frame
-            self._update_sprite_region(self.sprite_row, self.sprite_frame_idx)
+            self.sprite_layer.show(0, self.sprite_row, self.sprite_frame_idx)
             
             self.current_sprite_frame = self.sprite_frame_idx
             self.current_sprite_row = self.sprite_row
+            self.displayed_sprite_type = 'pet'
     
-    def _update_sprite_region(self, anim_row, frame_index):
-        """Redraw the sprite region (scaled to display size)."""
-        x0 = config.SPRITE_X
-        y0 = config.SPRITE_Y
-        x1 = x0 + config.SPRITE_DISPLAY_W - 1
-        y1 = y0 + config.SPRITE_DISPLAY_H - 1
-        
-        # Create buffer for the scaled sprite region
-        region_w = config.SPRITE_DISPLAY_W
-        region_h = config.SPRITE_DISPLAY_H
-        region_size = region_w * region_h * config.BPP
-        region_buf = bytearray(region_size)
-        
-        # Copy base frame pixels for this region
-        for dy in range(region_h):
-            src_y = y0 + dy
-            src_row_start = (src_y * config.WIDTH + x0) * config.BPP
-            dst_row_start = dy * region_w * config.BPP
-            
-            for dx in range(region_w):
-                si = src_row_start + dx * config.BPP
-                di = dst_row_start + dx * config.BPP
-                region_buf[di] = self.base_frame[si]
-                region_buf[di + 1] = self.base_frame[si + 1]
-        
-        # Blit scaled sprite onto region buffer
-        self._blit_sprite_to_region_scaled(region_buf, region_w, anim_row, frame_index)
-        
-        # Push just this region to display
-        self.display.block(x0, y0, x1, y1, region_buf)
-    
-    def _blit_sprite_to_region_scaled(self, region_buf, region_w, anim_row, frame_index):
-        """Blit sprite frame onto region buffer with scaling.
-        
-        Each source pixel is rendered as a SPRITE_SCALE x SPRITE_SCALE block.
-        """
-        sx0 = config.SPRITE_W * frame_index
-        sy0 = config.SPRITE_H * anim_row
-        scale = config.SPRITE_SCALE
-        
-        for sy in range(config.SPRITE_H):
-            sheet_row_start = ((sy0 + sy) * config.SPRITE_SHEET_W + sx0) * config.BPP
-            
-            for sx in range(config.SPRITE_W):
-                si = sheet_row_start + sx * config.BPP
-                hi = self.sprite_buf[si]
-                lo = self.sprite_buf[si + 1]
-                color = (hi << 8) | lo
-                if color == config.TRANSPARENT_KEY:
-                    continue
-                
-                # Write scale x scale block of pixels
-                dst_x = sx * scale
-                dst_y = sy * scale
-                for by in range(scale):
-                    row_start = (dst_y + by) * region_w * config.BPP
-                    for bx in range(scale):
-                        di = row_start + (dst_x + bx) * config.BPP
-                        region_buf[di] = hi
-                        region_buf[di + 1] = lo
-    
-    def _restore_and_push_rect(self, rect):
-        """Restore a rectangle from base_frame and push to display."""
-        x0, y0, x1, y1 = rect
-        x0 = max(0, x0)
-        y0 = max(0, y0)
-        x1 = min(config.WIDTH - 1, x1)
-        y1 = min(config.HEIGHT - 1, y1)
-        
-        w = x1 - x0 + 1
-        h = y1 - y0 + 1
-        region_buf = bytearray(w * h * config.BPP)
-        
-        # Copy from base_frame
-        for dy in range(h):
-            src_y = y0 + dy
-            src_row_start = (src_y * config.WIDTH + x0) * config.BPP
-            dst_row_start = dy * w * config.BPP
-            
-            for dx in range(w):
-                si = src_row_start + dx * config.BPP
-                di = dst_row_start + dx * config.BPP
-                region_buf[di] = self.base_frame[si]
-                region_buf[di + 1] = self.base_frame[si + 1]
-        
-        self.display.block(x0, y0, x1, y1, region_buf)
-    
-    def _invert_and_push_rect(self, rect):
-        """Invert a rectangle and push to display."""
-        x0, y0, x1, y1 = rect
-        x0 = max(0, x0)
-        y0 = max(0, y0)
-        x1 = min(config.WIDTH - 1, x1)
-        y1 = min(config.HEIGHT - 1, y1)
-        
-        w = x1 - x0 + 1
-        h = y1 - y0 + 1
-        region_buf = bytearray(w * h * config.BPP)
-        
-        # Copy from base_frame and invert
-        for dy in range(h):
-            src_y = y0 + dy
-            src_row_start = (src_y * config.WIDTH + x0) * config.BPP
-            dst_row_start = dy * w * config.BPP
-            
-            for dx in range(w):
-                si = src_row_start + dx * config.BPP
-                di = dst_row_start + dx * config.BPP
-                hi = self.base_frame[si]
-                lo = self.base_frame[si + 1]
-                c = (hi << 8) | lo
-                c ^= 0xFFFF
-                region_buf[di] = (c >> 8) & 0xFF
-                region_buf[di + 1] = c & 0xFF
-        
-        self.display.block(x0, y0, x1, y1, region_buf)
+    def reset_pet_sprite(self):
+        """Restart the pet animation and force a redraw (egg just hatched)."""
+        self.sprite_frame_idx = 0
+        self.current_sprite_frame = -1
     
     def advance_sprite_frame(self):
         """Advance to next sprite animation frame."""
@@ -285,103 +373,192 @@ class Graphics:
             return
         
         if self.egg_frame_idx != self.current_egg_frame:
-            self._update_egg_region(self.egg_color, self.egg_size, self.egg_frame_idx)
+            sx0, sy0 = config.egg_frame_coords(self.egg_color, self.egg_size, self.egg_frame_idx)
+            self.sprite_layer.show(1, sy0 // config.EGG_SPRITE_H, sx0 // config.EGG_SPRITE_W)
             self.current_egg_frame = self.egg_frame_idx
             self.displayed_sprite_type = 'egg'
     
-    def _update_egg_region(self, color, size, frame):
-        """Redraw the egg sprite region (scaled to display size)."""
-        x0 = config.SPRITE_X
-        y0 = config.SPRITE_Y
-        x1 = x0 + config.SPRITE_DISPLAY_W - 1
-        y1 = y0 + config.SPRITE_DISPLAY_H - 1
-        
-        # Create buffer for the scaled sprite region
-        region_w = config.SPRITE_DISPLAY_W
-        region_h = config.SPRITE_DISPLAY_H
-        region_size = region_w * region_h * config.BPP
-        region_buf = bytearray(region_size)
-        
-        # Copy base frame pixels for this region
-        for dy in range(region_h):
-            src_y = y0 + dy
-            src_row_start = (src_y * config.WIDTH + x0) * config.BPP
-            dst_row_start = dy * region_w * config.BPP
-            
-            for dx in range(region_w):
-                si = src_row_start + dx * config.BPP
-                di = dst_row_start + dx * config.BPP
-                region_buf[di] = self.base_frame[si]
-                region_buf[di + 1] = self.base_frame[si + 1]
+    # =========================================================================
+    # Pre-scaled Frame Cache
+    # =========================================================================
+    
+    def _scaled_frame(self, sheet, row, col):
+        """Get frame (col, row) of sheet 0 (pet) or 1 (egg) scaled to display size.
         
-        # Blit scaled egg sprite onto region buffer
-        self._blit_egg_to_region_scaled(region_buf, region_w, color, size, frame)
+        Frames are scaled on first use and cached. With the cache disabled,
+        the one scratch frame is re-scaled on every call.
         
-        # Push just this region to display
-        self.display.block(x0, y0, x1, y1, region_buf)
+        Returns:
+            tuple: (frame memoryview, opaque spans or None)
+        """
+        if config.SPRITE_CACHE_FRAMES <= 0:
+            frame_mv = self._scratch_entry[0]
+            kernels.fill(frame_mv, len(frame_mv), config.TRANSPARENT_KEY)
+            self._sheets[sheet].blit(frame_mv, config.SPRITE_DISPLAY_W, col, row, config.SPRITE_SCALE)
+            return self._scratch_entry
+        
+        key = (sheet << 8) | (row << 4) | col
+        entry = self._frame_cache.get(key)
+        if entry is None:
+            frame_buf = self._new_transparent_frame()
+            self._sheets[sheet].blit(frame_buf, config.SPRITE_DISPLAY_W, col, row, config.SPRITE_SCALE)
+            entry = self._store_cached_frame(key, frame_buf)
+        return entry
+    
+    def _new_transparent_frame(self, w=config.SPRITE_DISPLAY_W, h=config.SPRITE_DISPLAY_H):
+        """Allocate a w x h pixel buffer filled with TRANSPARENT_KEY."""
+        key_bytes = bytes(((config.TRANSPARENT_KEY >> 8) & 0xFF, config.TRANSPARENT_KEY & 0xFF))
+        return bytearray(key_bytes * (w * h))
     
-    def _blit_egg_to_region_scaled(self, region_buf, region_w, color, size, frame):
-        """Blit egg sprite frame onto region buffer with scaling.
+    def _store_cached_frame(self, key, frame_buf):
+        """Compute the opaque-span mask for a scaled frame and cache it.
         
-        Each source pixel is rendered as a SPRITE_SCALE x SPRITE_SCALE block.
+        Evicts the oldest entry once SPRITE_CACHE_FRAMES is reached.
+        
+        Returns:
+            tuple: (frame memoryview, opaque spans)
         """
-        # Get source coordinates from egg sprite sheet
-        sx0, sy0 = config.egg_frame_coords(color, size, frame)
-        scale = config.SPRITE_SCALE
+        entry = (memoryview(frame_buf), self._opaque_spans(frame_buf))
+        if len(self._cache_order) >= config.SPRITE_CACHE_FRAMES:
+            del self._frame_cache[self._cache_order.pop(0)]
+        self._frame_cache[key] = entry
+        self._cache_order.append(key)
+        return entry
+    
+    def _opaque_spans(self, frame_buf, w=config.SPRITE_DISPLAY_W, h=config.SPRITE_DISPLAY_H):
+        """Find the runs of non-transparent pixels in a w x h image.
         
-        for sy in range(config.EGG_SPRITE_H):
-            sheet_row_start = ((sy0 + sy) * config.EGG_SHEET_W + sx0) * config.BPP
+        Returns:
+            array: Flat (start, end) byte offsets, one pair per opaque run
+        """
+        key_hi = (config.TRANSPARENT_KEY >> 8) & 0xFF
+        key_lo = config.TRANSPARENT_KEY & 0xFF
+        row_bytes = w * config.BPP
+        spans = array('H')
+        
+        for y in range(h):
+            row_start = y * row_bytes
+            run_start = -1
+            for i in range(row_start, row_start + row_bytes, config.BPP):
+                opaque = frame_buf[i] != key_hi or frame_buf[i + 1] != key_lo
+                if opaque and run_start < 0:
+                    run_start = i
+                elif not opaque and run_start >= 0:
+                    spans.append(run_start)
+                    spans.append(i)
+                    run_start = -1
+            if run_start >= 0:
+                spans.append(run_start)
+                spans.append(row_start + row_bytes)
+        return spans
+    
+    # =========================================================================
+    # Frame Diff Rendering
+    # =========================================================================
+    
+    def _diff_key(self, sheet, row, from_col, to_col):
+        """Pack a frame transition into a diff table key (sheet 0=pet, 1=egg)."""
+        return (sheet << 12) | (row << 8) | (from_col << 4) | to_col
+    
+    def _build_diffs(self):
+        """Precompute changed rects for every consecutive pet and egg frame pair."""
+        for row, count in config.ANIM_FRAME_COUNTS.items():
+            for frame in range(count):
+                nxt = (frame + 1) % count
+                self._diffs[self._diff_key(0, row, frame, nxt)] = self._frame_diff(
+                    self.sprite_sheet, frame, row, nxt, row
+                )
+        
+        # Egg animations flip between two frames, so one diff serves both ways
+        w = config.EGG_SPRITE_W
+        h = config.EGG_SPRITE_H
+        for color in range(config.EGG_SHEET_H // h):
+            for size in (config.EGG_SMALL, config.EGG_BIG):
+                a_col = config.egg_frame_coords(color, size, 0)[0] // w
+                b_col = config.egg_frame_coords(color, size, 1)[0] // w
+                rects = self._frame_diff(self.egg_sheet, a_col, color, b_col, color)
+                self._diffs[self._diff_key(1, color, a_col, b_col)] = rects
+                self._diffs[self._diff_key(1, color, b_col, a_col)] = rects
+        
+        # Every diff rect shape is pushed at runtime
+        for rects in self._diffs.values():
+            for i in range(0, len(rects), 4):
+                self.pool.reserve(rects[i + 2] - rects[i] + 1, rects[i + 3] - rects[i + 1] + 1)
+    
+    def _frame_diff(self, sheet, a_col, a_row, b_col, b_row):
+        """Find the rects that differ between two frames of a sheet.
+        
+        Both frames are decoded unscaled onto a transparent background, then
+        changed pixels are collected per source row. Consecutive rows are
+        merged into one rect while the extra unchanged pixels cost less than
+        a separate push (RECT_PUSH_COST_BYTES).
+        
+        Returns:
+            array: Flat (x0, y0, x1, y1) inclusive rects in scaled region pixels
+        """
+        w = sheet.frame_w
+        h = sheet.frame_h
+        frame_a = self._new_transparent_frame(w, h)
+        frame_b = self._new_transparent_frame(w, h)
+        sheet.blit(frame_a, w, a_col, a_row, 1)
+        sheet.blit(frame_b, w, b_col, b_row, 1)
+        
+        scale = config.SPRITE_SCALE
+        px_bytes = scale * scale * config.BPP
+        rects = array('B')
+        cx0 = cy0 = cx1 = cy1 = -1
+        
+        for sy in range(h):
+            row_start = sy * w * config.BPP
+            lo_x = -1
+            hi_x = -1
+            for sx in range(w):
+                i = row_start + sx * config.BPP
+                if frame_a[i] != frame_b[i] or frame_a[i + 1] != frame_b[i + 1]:
+                    if lo_x < 0:
+                        lo_x = sx
+                    hi_x = sx
+            if lo_x < 0:
+                continue
             
-            for sx in range(config.EGG_SPRITE_W):
-                si = sheet_row_start + sx * config.BPP
-                hi = self.egg_buf[si]
-                lo = self.egg_buf[si + 1]
-                color_val = (hi << 8) | lo
-                if color_val == config.TRANSPARENT_KEY:
+            if cy0 >= 0:
+                ux0 = min(cx0, lo_x)
+                ux1 = max(cx1, hi_x)
+                merged = (ux1 - ux0 + 1) * (sy - cy0 + 1) * px_bytes
+                separate = ((cx1 - cx0 + 1) * (cy1 - cy0 + 1) + (hi_x - lo_x + 1)) * px_bytes
+                if merged <= separate + config.RECT_PUSH_COST_BYTES:
+                    cx0 = ux0
+                    cx1 = ux1
+                    cy1 = sy
                     continue
-                
-                # Write scale x scale block of pixels
-                dst_x = sx * scale
-                dst_y = sy * scale
-                for by in range(scale):
-                    row_start = (dst_y + by) * region_w * config.BPP
-                    for bx in range(scale):
-                        di = row_start + (dst_x + bx) * config.BPP
-                        region_buf[di] = hi
-                        region_buf[di + 1] = lo
+                self._append_scaled_rect(rects, cx0, cy0, cx1, cy1)
+            cx0 = lo_x
+            cy0 = sy
+            cx1 = hi_x
+            cy1 = sy
+        
+        if cy0 >= 0:
+            self._append_scaled_rect(rects, cx0, cy0, cx1, cy1)
+        return rects
+    
+    def _append_scaled_rect(self, rects, x0, y0, x1, y1):
+        """Append a source-pixel rect to rects in scaled region pixels."""
+        scale = config.SPRITE_SCALE
+        rects.append(x0 * scale)
+        rects.append(y0 * scale)
+        rects.append((x1 + 1) * scale - 1)
+        rects.append((y1 + 1) * scale - 1)
     
     # =========================================================================
     # Sprite Region Management
     # =========================================================================
     
     def clear_sprite_region(self):
-        """Clear the sprite region by restoring from base_frame.
+        """Clear the sprite region, uncovering base_frame.
         
         Used when transitioning to a state with no sprite (e.g., PHASE_WAITING).
         """
-        x0 = config.SPRITE_X
-        y0 = config.SPRITE_Y
-        x1 = x0 + config.SPRITE_DISPLAY_W - 1
-        y1 = y0 + config.SPRITE_DISPLAY_H - 1
-        
-        region_w = config.SPRITE_DISPLAY_W
-        region_h = config.SPRITE_DISPLAY_H
-        region_size = region_w * region_h * config.BPP
-        region_buf = bytearray(region_size)
-        
-        # Copy from base_frame
-        for dy in range(region_h):
-            src_y = y0 + dy
-            src_row_start = (src_y * config.WIDTH + x0) * config.BPP
-            dst_row_start = dy * region_w * config.BPP
-            
-            for dx in range(region_w):
-                si = src_row_start + dx * config.BPP
-                di = dst_row_start + dx * config.BPP
-                region_buf[di] = self.base_frame[si]
-                region_buf[di + 1] = self.base_frame[si + 1]
-        
-        self.display.block(x0, y0, x1, y1, region_buf)
+        self.sprite_layer.hide()
         
         # Reset sprite state
         self.displayed_sprite_type = None
@@ -391,12 +568,4 @@ class Graphics:
     
     def _overlay_colorkey(self, dst_buf, src_buf):
         """Apply source buffer onto destination with colorkey transparency."""
-        i = 0
-        while i < config.BUF_SIZE:
-            hi = src_buf[i]
-            lo = src_buf[i + 1]
-            color = (hi << 8) | lo
-            if color != config.TRANSPARENT_KEY:
-                dst_buf[i] = hi
-                dst_buf[i + 1] = lo
-            i += 2
+        kernels.overlay_colorkey(dst_buf, src_buf, config.BUF_SIZE, config.TRANSPARENT_KEY)
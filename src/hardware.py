@@ -47,6 +47,13 @@ class Hardware:
             height=config.HEIGHT
         )
         self.display.clear(config.BLACK)
+        
+        if config.USE_SPI_DMA:
+            try:
+                from spi_dma import SpiDma
+                self.display.attach_dma(SpiDma(config.SPI_ID))
+            except Exception as e:
+                print(f"SPI DMA unavailable ({e}), using blocking pushes")
     
     def _init_buttons(self):
         """Initialize buttons with internal pull-ups."""
@@ -1,16 +1,36 @@
 # input.py
 # Interrupt-driven input handling with debouncing and screen sleep management
+#
+# Debounced button edges are appended as (button, edge, ticks_us) events to a
+# preallocated ring buffer, so nothing is allocated in interrupt context and
+# no press is lost between two update() calls. The edges come from one of the
+# debounce engines (config.DEBOUNCE_MODE):
+#   "edge"  - pin IRQs on both edges with a DEBOUNCE_MS lockout
+#   "timer" - one machine.Timer samples all pins every DEBOUNCE_SAMPLE_MS
+#   "pio"   - a PIO state machine samples and debounces (pio_buttons.py);
+#             update() reads its FIFO instead of the ring
+#
+# update() replays the events in order and decodes them into presses, chords
+# (buttons pressed within CHORD_WINDOW_MS of each other), long presses and
+# auto-repeats. Each event
+# keeps its edge time, so the delay from edge to handled action is measured.
 
 import time
-from machine import Pin, disable_irq, enable_irq
+from array import array
+from machine import Pin, Timer, disable_irq, enable_irq
 import config
+from debounce import EdgeDebouncer, ShiftDebouncer
+from scheduler import earliest
+
+EDGE_RELEASE = 0
+EDGE_PRESS = 1
 
 
 class Input:
     """Interrupt-driven button input with debouncing and screen sleep.
     
-    Uses hardware interrupts for instant button response. ISRs set flags
-    that are consumed by the main loop via update().
+    A sampling timer or pin interrupts queue debounced edge events that
+    are decoded by the main loop in update().
     """
     
     # Button indices
@@ -18,53 +38,182 @@ class Input:
     BTN_B = 1  # Confirm
     BTN_C = 2  # Back/Cancel
     
-    def __init__(self, display, buttons):
+    # Chord bitmask that starts a new game
+    CHORD_START = (1 << BTN_A) | (1 << BTN_C)
+    
+    def __init__(self, display, buttons, on_press=None):
         """Initialize interrupt-driven input handler.
         
         Args:
             display: Display object (for sleep on/off)
             buttons: Tuple of (btn_a, btn_b, btn_c) Pin objects
+            on_press: Optional ISR-safe function called after a press is
+                recorded (e.g. Scheduler.wake)
         """
         self.display = display
         self.btn_a, self.btn_b, self.btn_c = buttons
+        self._pins = (self.btn_a, self.btn_b, self.btn_c)
+        self.on_press = on_press
+        
+        # Event ring: written by the ISRs (tail), read by update() (head).
+        # Code = (button << 1) | edge, time = ticks_us of the edge.
+        size = config.INPUT_QUEUE_SIZE
+        self._ev_code = bytearray(size)
+        self._ev_time = array('i', [0] * size)
+        self._ev_head = 0
+        self._ev_tail = 0
+        self.dropped = 0            # Events lost to a full ring
         
-        # Flags set by ISR, read/cleared by main loop
-        # Using list because ISR closures can't reassign outer variables
-        self._pressed = [False, False, False]
+        # Decoder state per button
+        self._down = bytearray(3)                   # Down as decoded so far
+        self._down_since = array('i', [0, 0, 0])    # ticks_us of the press
+        self._next_repeat = array('i', [0, 0, 0])   # ticks_us of next repeat
+        self._long_sent = bytearray(3)              # Long press reported
+        self._ignore = bytearray(3)                 # Held since a screen wake
+        self._repeat_mask = 0
+        for idx in config.REPEAT_BUTTONS:
+            self._repeat_mask |= 1 << idx
+        self._counts = [0, 0, 0]
         
-        # Debounce: last press time per button (in ms)
-        self._last_press = [0, 0, 0]
+        # Decoded by the last update(); valid until the next one
+        self.chord = 0              # Bitmask of buttons pressed together
+        self.long_pressed = 0       # Bitmask of buttons held LONG_PRESS_MS
+        
+        # Edge-to-handled latency (see handled())
+        self._pending_edge = 0
+        self._has_pending = False
+        self.latency_count = 0
+        self.latency_total_us = 0
+        self.latency_max_us = 0
         
         # Screen sleep state
         self.screen_on = True
         self.last_activity = time.ticks_ms()
         
-        # Attach interrupt handlers (falling edge = button pressed)
-        self.btn_a.irq(trigger=Pin.IRQ_FALLING, handler=self._make_isr(0))
-        self.btn_b.irq(trigger=Pin.IRQ_FALLING, handler=self._make_isr(1))
-        self.btn_c.irq(trigger=Pin.IRQ_FALLING, handler=self._make_isr(2))
+        # Debounce engine (its level array is the debounced state, 1 = down)
+        self._mode = config.DEBOUNCE_MODE
+        self._timer = None
+        self._pio = None
+        if self._mode == "pio":
+            from pio_buttons import PioButtons
+            self._debouncer = PioButtons(self.btn_a, on_report=on_press)
+            self._pio = self._debouncer
+        elif self._mode == "timer":
+            self._debouncer = ShiftDebouncer(
+                3, config.DEBOUNCE_SAMPLES, config.DEBOUNCE_SAMPLE_MS * 1000, self._push)
+            self._timer = Timer(period=config.DEBOUNCE_SAMPLE_MS, mode=Timer.PERIODIC,
+                                callback=self._sample)
+        else:
+            self._debouncer = EdgeDebouncer(3, config.DEBOUNCE_MS, self._push, time.ticks_ms())
+            # Attach interrupt handlers (falling edge = pressed, rising = released)
+            trigger = Pin.IRQ_FALLING | Pin.IRQ_RISING
+            self.btn_a.irq(trigger=trigger, handler=self._make_isr(0))
+            self.btn_b.irq(trigger=trigger, handler=self._make_isr(1))
+            self.btn_c.irq(trigger=trigger, handler=self._make_isr(2))
     
     def _make_isr(self, btn_idx):
-        """Create an ISR closure for a specific button index.
+        """Create an ISR closure for a specific button index ("edge" mode).
         
         Returns a function suitable for pin.irq(handler=...).
         """
         # Capture the pin object for state checking
-        pins = [self.btn_a, self.btn_b, self.btn_c]
-        pin_obj = pins[btn_idx]
+        pin_obj = self._pins[btn_idx]
+        debouncer = self._debouncer
         
         def isr(pin):
-            # ISR must be fast - only set flag with debounce check
-            # Also verify pin is actually LOW (pressed) to filter release bounce
-            if pin_obj.value() == 0:  # Still pressed (active-low)
-                now = time.ticks_ms()
-                if time.ticks_diff(now, self._last_press[btn_idx]) > config.DEBOUNCE_MS:
-                    self._pressed[btn_idx] = True
-                    self._last_press[btn_idx] = now
+            # ISR must be fast and allocation-free
+            level = 1 if pin_obj.value() == 0 else 0  # Active-low
+            if (debouncer.edge(btn_idx, level, time.ticks_ms(), time.ticks_us())
+                    and self.on_press is not None):
+                self.on_press()
         return isr
     
+    def _sample(self, timer):
+        """Timer callback ("timer" mode): feed every pin to the debouncer."""
+        t = time.ticks_us()
+        pins = self._pins
+        debouncer = self._debouncer
+        pressed = False
+        for idx in range(3):
+            if debouncer.sample(idx, 1 if pins[idx].value() == 0 else 0, t):
+                pressed = True
+        if pressed and self.on_press is not None:
+            self.on_press()
+    
+    def _push(self, btn_idx, edge, t):
+        """Append an event to the ring (ISR context or IRQs disabled).
+        
+        Returns False if the ring is full; the debouncer then leaves its
+        level as it was and offers the edge again later.
+        """
+        tail = self._ev_tail
+        nxt = tail + 1
+        if nxt == len(self._ev_code):
+            nxt = 0
+        if nxt == self._ev_head:
+            self.dropped += 1
+            return False
+        self._ev_code[tail] = (btn_idx << 1) | edge
+        self._ev_time[tail] = t
+        self._ev_tail = nxt
+        return True
+    
+    def _resync(self, now):
+        """Queue an edge the ISR filtered out as bounce ("edge" mode).
+        
+        A tap shorter than DEBOUNCE_MS has its release edge rejected (as does
+        any edge while the ring is full), which would leave the button down;
+        once the level has been stable for DEBOUNCE_MS the real pin state wins.
+        """
+        debouncer = self._debouncer
+        for idx in range(3):
+            level = 1 if self._pins[idx].value() == 0 else 0
+            if level != debouncer.level[idx]:
+                irq_state = disable_irq()
+                debouncer.edge(idx, level, now, time.ticks_us())
+                enable_irq(irq_state)
+    
+    def _advance_held(self, t):
+        """Emit long presses and auto-repeats for buttons held up to t."""
+        for idx in range(3):
+            if not self._down[idx] or self._ignore[idx]:
+                continue
+            if (not self._long_sent[idx]
+                    and time.ticks_diff(t, self._down_since[idx]) >= config.LONG_PRESS_MS * 1000):
+                self._long_sent[idx] = 1
+                self.long_pressed |= 1 << idx
+            if self._repeat_mask & (1 << idx):
+                while time.ticks_diff(t, self._next_repeat[idx]) >= 0:
+                    self._counts[idx] += 1
+                    self._next_repeat[idx] = time.ticks_add(
+                        self._next_repeat[idx], config.REPEAT_INTERVAL_MS * 1000)
+    
+    def _decode(self, idx, edge, t):
+        """Apply one queued edge to the decoder state."""
+        self._advance_held(t)
+        if edge == EDGE_RELEASE:
+            self._down[idx] = 0
+            self._ignore[idx] = 0
+            return
+        
+        # Chord: other buttons still down and pressed within CHORD_WINDOW_MS
+        window = config.CHORD_WINDOW_MS * 1000
+        for other in range(3):
+            if (other != idx and self._down[other]
+                    and time.ticks_diff(t, self._down_since[other]) <= window):
+                self.chord |= (1 << idx) | (1 << other)
+        
+        self._down[idx] = 1
+        self._down_since[idx] = t
+        self._next_repeat[idx] = time.ticks_add(t, config.REPEAT_DELAY_MS * 1000)
+        self._long_sent[idx] = 0
+        self._counts[idx] += 1
+        if not self._has_pending:
+            self._pending_edge = t
+            self._has_pending = True
+    
     def update(self):
-        """Consume pending button presses and manage screen sleep.
+        """Decode queued button events and manage screen sleep.
         
         Call once per game loop iteration.
         
@@ -72,22 +221,41 @@ class Input:
             tuple: (screen_on, just_woke, pressed)
                 - screen_on: bool, is screen currently on
                 - just_woke: bool, did screen just wake up
-                - pressed: tuple of (btn_a, btn_b, btn_c) pressed states
+                - pressed: tuple of (btn_a, btn_b, btn_c) press counts
+                  (presses plus auto-repeats) since the last update
+        
+        Chords and long presses decoded in the same pass are left in
+        self.chord and self.long_pressed.
         """
-        # Atomically read and clear flags to prevent race conditions
-        # Disable interrupts during read-modify-write
-        irq_state = disable_irq()
-        pressed = (self._pressed[0], self._pressed[1], self._pressed[2])
-        self._pressed[0] = False
-        self._pressed[1] = False
-        self._pressed[2] = False
-        enable_irq(irq_state)
-        
-        any_pressed = any(pressed)
-        just_woke = False
         now = time.ticks_ms()
+        if self._mode == "edge":
+            self._resync(now)
+        
+        self.chord = 0
+        self.long_pressed = 0
+        counts = self._counts
+        counts[0] = counts[1] = counts[2] = 0
+        
+        if self._pio is not None:
+            self._pio.drain(self._decode)
+        
+        # Single producer (ISR) / single consumer: the ISR only moves the
+        # tail, so the ring can be drained without disabling interrupts
+        head = self._ev_head
+        size = len(self._ev_code)
+        while head != self._ev_tail:
+            code = self._ev_code[head]
+            self._decode(code >> 1, code & 1, self._ev_time[head])
+            head += 1
+            if head == size:
+                head = 0
+            self._ev_head = head
+        self._advance_held(time.ticks_us())
+        
+        pressed = (counts[0], counts[1], counts[2])
+        just_woke = False
         
-        if any_pressed:
+        if pressed[0] or pressed[1] or pressed[2] or self.long_pressed:
             self.last_activity = now
             
             if not self.screen_on:
@@ -95,23 +263,114 @@ class Input:
                 self.display.display_on()
                 self.screen_on = True
                 just_woke = True
-                # Clear presses so wake doesn't trigger action
-                pressed = (False, False, False)
+                # Clear presses so wake doesn't trigger action, and keep the
+                # buttons still held from repeating or long-pressing
+                pressed = (0, 0, 0)
+                self.chord = 0
+                self.long_pressed = 0
+                self._has_pending = False
+                for idx in range(3):
+                    self._ignore[idx] = self._down[idx]
+        
+        self.check_timeout(now)
+        
+        return self.screen_on, just_woke, pressed
+    
+    def handled(self):
+        """Record edge-to-action latency once update()'s presses are handled."""
+        if self._has_pending:
+            self._has_pending = False
+            latency = time.ticks_diff(time.ticks_us(), self._pending_edge)
+            self.latency_count += 1
+            self.latency_total_us += latency
+            if latency > self.latency_max_us:
+                self.latency_max_us = latency
+    
+    def pending_edge(self):
+        """Return ticks_us of the oldest press not yet handled(), or None."""
+        return self._pending_edge if self._has_pending else None
+    
+    def latency_stats(self):
+        """Summarize edge-to-handled latency since the last reset.
+        
+        Returns:
+            tuple: (handled presses, mean us, max us)
+        """
+        n = self.latency_count
+        return n, (self.latency_total_us // n if n else 0), self.latency_max_us
+    
+    def reset_latency(self):
+        """Zero the latency counters."""
+        self.latency_count = 0
+        self.latency_total_us = 0
+        self.latency_max_us = 0
+    
+    def check_timeout(self, now=None):
+        """Turn the screen off if it has been idle for SCREEN_TIMEOUT_MS.
         
-        # Check for timeout
+        Returns:
+            bool: screen_on
+        """
         if self.screen_on:
+            if now is None:
+                now = time.ticks_ms()
             if time.ticks_diff(now, self.last_activity) >= config.SCREEN_TIMEOUT_MS:
                 self.display.display_off()
                 self.screen_on = False
+        return self.screen_on
+    
+    def next_deadline(self):
+        """Return the ticks_ms time update() next has work without an edge.
         
-        return self.screen_on, just_woke, pressed
+        That is the next auto-repeat or long press of a held button, or the
+        end of the debounce lockout of a button whose last edge was
+        filtered. None if nothing is pending.
+        """
+        deadline = None
+        now = time.ticks_ms()
+        now_us = time.ticks_us()
+        debouncer = self._debouncer
+        for idx in range(3):
+            if (self._mode == "edge"
+                    and (1 if self._pins[idx].value() == 0 else 0) != debouncer.level[idx]):
+                due = time.ticks_add(debouncer.last_edge[idx], config.DEBOUNCE_MS + 1)
+            elif not self._down[idx] or self._ignore[idx]:
+                continue
+            elif not self._long_sent[idx]:
+                due = self._due_ms(time.ticks_add(
+                    self._down_since[idx], config.LONG_PRESS_MS * 1000), now, now_us)
+                if self._repeat_mask & (1 << idx):
+                    due = earliest(due, self._due_ms(self._next_repeat[idx], now, now_us))
+            elif self._repeat_mask & (1 << idx):
+                due = self._due_ms(self._next_repeat[idx], now, now_us)
+            else:
+                continue
+            deadline = earliest(deadline, due)
+        return deadline
+    
+    @staticmethod
+    def _due_ms(t_us, now, now_us):
+        """Convert a future ticks_us time to ticks_ms (rounded up)."""
+        wait_us = time.ticks_diff(t_us, now_us)
+        return time.ticks_add(now, max(0, (wait_us + 999) // 1000))
+    
+    def timeout_deadline(self):
+        """Return the ticks_ms time the screen will turn off (None if off)."""
+        if not self.screen_on:
+            return None
+        return time.ticks_add(self.last_activity, config.SCREEN_TIMEOUT_MS)
     
     def reset_timeout(self):
         """Reset the screen timeout timer."""
         self.last_activity = time.ticks_ms()
     
     def cleanup(self):
-        """Disable interrupts. Call on shutdown."""
+        """Disable interrupts and the sampling timer or PIO. Call on shutdown."""
+        if self._timer is not None:
+            self._timer.deinit()
+        if self._pio is not None:
+            self._pio.close()
         self.btn_a.irq(handler=None)
         self.btn_b.irq(handler=None)
         self.btn_c.irq(handler=None)
+
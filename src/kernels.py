@@ -0,0 +1,426 @@
+# kernels.py
+# RGB565 pixel kernels used by graphics.py
+#
+# All buffers are big-endian RGB565 bytearrays (same layout as the .raw assets).
+# On MicroPython the viper versions from kernels_viper.py are selected at
+# import; everywhere else (and if the native emitter is unavailable) the pure
+# Python loops below are used. Both produce byte-identical output.
+#
+# Geometry is passed to the inner kernels through a preallocated int array so
+# the viper functions stay within the emitter's argument limit and no call
+# allocates. The pure row-slice copies create a memoryview per slice, which is
+# fine on CPython; on the device the viper versions keep rendering off the heap.
+
+import sys
+from array import array
+import config
+
+
+def _overlay_colorkey_py(dst, src, geo):
+    """Copy every src pixel that is not the colorkey onto dst."""
+    nbytes = geo[0]
+    key = geo[1]
+    i = 0
+    while i < nbytes:
+        hi = src[i]
+        lo = src[i + 1]
+        color = (hi << 8) | lo
+        if color != key:
+            dst[i] = hi
+            dst[i + 1] = lo
+        i += 2
+
+
+def _blit_scaled_py(dst, sheet, geo):
+    """Blit a sheet cell onto dst, each pixel as a scale x scale block."""
+    dst_w, sheet_w, sx0, sy0 = geo[0], geo[1], geo[2], geo[3]
+    w, h, scale, key = geo[4], geo[5], geo[6], geo[7]
+
+    for sy in range(h):
+        sheet_row_start = ((sy0 + sy) * sheet_w + sx0) * 2
+
+        for sx in range(w):
+            si = sheet_row_start + sx * 2
+            hi = sheet[si]
+            lo = sheet[si + 1]
+            color = (hi << 8) | lo
+            if color == key:
+                continue
+
+            # Write scale x scale block of pixels
+            dst_x = sx * scale
+            dst_y = sy * scale
+            for by in range(scale):
+                row_start = (dst_y + by) * dst_w * 2
+                for bx in range(scale):
+                    di = row_start + (dst_x + bx) * 2
+                    dst[di] = hi
+                    dst[di + 1] = lo
+
+
+def _copy_rect_py(dst, src, geo):
+    """Copy a rectangle out of a src image into a packed dst buffer.
+
+    Copies whole rows with slice assignment (a memcpy per row).
+    """
+    src_w, x0, y0, w, h = geo[0], geo[1], geo[2], geo[3], geo[4]
+    row_bytes = w * 2
+    stride = src_w * 2
+    si = (y0 * src_w + x0) * 2
+    di = 0
+    for _ in range(h):
+        dst[di:di + row_bytes] = src[si:si + row_bytes]
+        si += stride
+        di += row_bytes
+
+
+def _paste_rect_py(dst, src, geo):
+    """Copy a packed src rect into the rectangle at (x0, y0) of a dst image."""
+    dst_w, x0, y0, w, h = geo[0], geo[1], geo[2], geo[3], geo[4]
+    row_bytes = w * 2
+    stride = dst_w * 2
+    di = (y0 * dst_w + x0) * 2
+    si = 0
+    for _ in range(h):
+        dst[di:di + row_bytes] = src[si:si + row_bytes]
+        di += stride
+        si += row_bytes
+
+
+def _blit_spans_py(dst, src, spans, geo):
+    """Copy the opaque spans of a src rect onto dst, clipped to the rect.
+
+    spans are flat (start, end) byte offsets into src, in row order, each
+    within one row.
+    """
+    n, dst_w, dx, dy = geo[0], geo[1], geo[2], geo[3]
+    src_w, sx, sy, w, h = geo[4], geo[5], geo[6], geo[7], geo[8]
+    stride = src_w * 2
+
+    for i in range(0, n, 2):
+        start = spans[i]
+        row = start // stride
+        if row < sy:
+            continue
+        if row >= sy + h:
+            break
+        row_start = row * stride
+        x_start = max((start - row_start) >> 1, sx)
+        x_end = min((spans[i + 1] - row_start) >> 1, sx + w)
+        if x_start >= x_end:
+            continue
+        nbytes = (x_end - x_start) * 2
+        si = row_start + x_start * 2
+        di = ((dy + row - sy) * dst_w + dx + x_start - sx) * 2
+        dst[di:di + nbytes] = src[si:si + nbytes]
+
+
+def _blit_keyed_py(dst, src, geo):
+    """Copy a src rect onto dst at (dx, dy), skipping colorkey pixels."""
+    dst_w, dx, dy, src_w = geo[0], geo[1], geo[2], geo[3]
+    sx, sy, w, h, key = geo[4], geo[5], geo[6], geo[7], geo[8]
+
+    for y in range(h):
+        si = ((sy + y) * src_w + sx) * 2
+        di = ((dy + y) * dst_w + dx) * 2
+        for _ in range(w):
+            hi = src[si]
+            lo = src[si + 1]
+            if ((hi << 8) | lo) != key:
+                dst[di] = hi
+                dst[di + 1] = lo
+            si += 2
+            di += 2
+
+
+def _fill_py(dst, geo):
+    """Fill the first nbytes of dst with one color."""
+    hi = (geo[1] >> 8) & 0xFF
+    lo = geo[1] & 0xFF
+    for i in range(0, geo[0], 2):
+        dst[i] = hi
+        dst[i + 1] = lo
+
+
+def _rle_blit_py(dst, src, geo):
+    """Blit one RLE frame (see utils/raw2rle.py) onto dst at scale.
+
+    Each opaque span is copied with one slice assignment at scale 1. When
+    scaled, the span is widened pixel by pixel into its first output row and
+    that row is then slice-copied to the remaining scale - 1 rows.
+    """
+    dst_w, si, h, scale = geo[0], geo[1], geo[2], geo[3]
+    stride = dst_w * 2
+
+    for y in range(h):
+        row_start = y * scale * stride
+        x = 0
+        spans = src[si]
+        si += 1
+        for _ in range(spans):
+            x += src[si]
+            length = src[si + 1]
+            si += 2
+            nbytes = length * 2
+            start = row_start + x * scale * 2
+            if scale == 1:
+                dst[start:start + nbytes] = src[si:si + nbytes]
+                end = start + nbytes
+            else:
+                end = start
+                for i in range(si, si + nbytes, 2):
+                    hi = src[i]
+                    lo = src[i + 1]
+                    for _ in range(scale):
+                        dst[end] = hi
+                        dst[end + 1] = lo
+                        end += 2
+                for by in range(1, scale):
+                    offset = by * stride
+                    dst[start + offset:end + offset] = dst[start:end]
+            si += nbytes
+            x += length
+
+
+def _idx_blit_py(dst, src, geo):
+    """Blit a palette-indexed sheet cell onto dst at scale; index 0 is skipped."""
+    dst_w, sheet_w, sx0, sy0 = geo[0], geo[1], geo[2], geo[3]
+    w, h, scale, bpp = geo[4], geo[5], geo[6], geo[7]
+    pal, pix = geo[8], geo[9]
+    row_bytes = sheet_w * bpp // 8
+
+    for sy in range(h):
+        sheet_row_start = pix + (sy0 + sy) * row_bytes
+
+        for sx in range(w):
+            x = sx0 + sx
+            if bpp == 4:
+                packed = src[sheet_row_start + (x >> 1)]
+                idx = packed & 0x0F if x & 1 else packed >> 4
+            else:
+                idx = src[sheet_row_start + x]
+            if idx == 0:
+                continue
+            hi = src[pal + idx * 2]
+            lo = src[pal + idx * 2 + 1]
+
+            # Write scale x scale block of pixels
+            dst_x = sx * scale
+            dst_y = sy * scale
+            for by in range(scale):
+                row_start = (dst_y + by) * dst_w * 2
+                for bx in range(scale):
+                    di = row_start + (dst_x + bx) * 2
+                    dst[di] = hi
+                    dst[di + 1] = lo
+
+
+def _invert_rect_py(dst, geo):
+    """Invert every pixel (XOR 0xFFFF) of a rect of dst in place."""
+    dst_w, x0, y0, w, h = geo[0], geo[1], geo[2], geo[3], geo[4]
+
+    for y in range(y0, y0 + h):
+        start = (y * dst_w + x0) * 2
+        for i in range(start, start + w * 2):
+            dst[i] ^= 0xFF
+
+
+_overlay_colorkey = _overlay_colorkey_py
+_blit_scaled = _blit_scaled_py
+_copy_rect = _copy_rect_py
+_paste_rect = _paste_rect_py
+_blit_spans = _blit_spans_py
+_blit_keyed = _blit_keyed_py
+_fill = _fill_py
+_invert_rect = _invert_rect_py
+_rle_blit = _rle_blit_py
+_idx_blit = _idx_blit_py
+
+# True when the viper kernels are active
+NATIVE = False
+
+if config.USE_NATIVE_KERNELS and sys.implementation.name == "micropython":
+    try:
+        import kernels_viper
+        _overlay_colorkey = kernels_viper.overlay_colorkey
+        _blit_scaled = kernels_viper.blit_scaled
+        _copy_rect = kernels_viper.copy_rect
+        _paste_rect = kernels_viper.paste_rect
+        _blit_spans = kernels_viper.blit_spans
+        _blit_keyed = kernels_viper.blit_keyed
+        _fill = kernels_viper.fill
+        _invert_rect = kernels_viper.invert_rect
+        _rle_blit = kernels_viper.rle_blit
+        _idx_blit = kernels_viper.idx_blit
+        NATIVE = True
+    except (ImportError, SyntaxError, ValueError) as e:
+        print("Native kernels unavailable, using pure Python:", e)
+
+# Shared geometry scratch (kernels are not re-entrant)
+_geo = array('i', [0] * 10)
+
+
+def overlay_colorkey(dst, src, nbytes, key):
+    """Apply src onto dst with colorkey transparency.
+
+    Args:
+        dst: Destination buffer (modified in place)
+        src: Source buffer of at least nbytes
+        nbytes: Number of bytes to process
+        key: RGB565 transparent color
+    """
+    geo = _geo
+    geo[0] = nbytes
+    geo[1] = key
+    _overlay_colorkey(dst, src, geo)
+
+
+def blit_scaled(dst, dst_w, sheet, sheet_w, sx0, sy0, w, h, scale, key):
+    """Blit a w x h sheet cell at (sx0, sy0) onto dst at scale.
+
+    Pixels equal to key are skipped (left as-is in dst).
+    """
+    geo = _geo
+    geo[0] = dst_w
+    geo[1] = sheet_w
+    geo[2] = sx0
+    geo[3] = sy0
+    geo[4] = w
+    geo[5] = h
+    geo[6] = scale
+    geo[7] = key
+    _blit_scaled(dst, sheet, geo)
+
+
+def copy_rect(dst, src, src_w, x0, y0, w, h):
+    """Copy the w x h rectangle at (x0, y0) of a src_w wide image into dst.
+
+    Pass src as a memoryview, otherwise every row slice is copied twice.
+    """
+    geo = _geo
+    geo[0] = src_w
+    geo[1] = x0
+    geo[2] = y0
+    geo[3] = w
+    geo[4] = h
+    _copy_rect(dst, src, geo)
+
+
+def paste_rect(dst, dst_w, x0, y0, w, h, src):
+    """Copy a packed w x h src buffer into the rectangle at (x0, y0) of dst.
+
+    The inverse of copy_rect. Pass src as a memoryview, otherwise every row
+    slice is copied twice.
+    """
+    geo = _geo
+    geo[0] = dst_w
+    geo[1] = x0
+    geo[2] = y0
+    geo[3] = w
+    geo[4] = h
+    _paste_rect(dst, src, geo)
+
+
+def blit_spans(dst, dst_w, dx, dy, src, src_w, spans, sx, sy, w, h):
+    """Copy the opaque spans inside the w x h rect at (sx, sy) of src onto dst.
+
+    Args:
+        dst: Destination buffer, dst_w pixels wide; the rect lands at (dx, dy)
+        src: Source image, src_w pixels wide (memoryview preferred)
+        spans: array('H') of flat (start, end) byte offsets into src, in row
+            order, all even
+    """
+    geo = _geo
+    geo[0] = len(spans)
+    geo[1] = dst_w
+    geo[2] = dx
+    geo[3] = dy
+    geo[4] = src_w
+    geo[5] = sx
+    geo[6] = sy
+    geo[7] = w
+    geo[8] = h
+    _blit_spans(dst, src, spans, geo)
+
+
+def blit_keyed(dst, dst_w, dx, dy, src, src_w, sx, sy, w, h, key):
+    """Copy the w x h rect at (sx, sy) of src onto dst at (dx, dy).
+
+    Pixels equal to key are skipped (left as-is in dst).
+    """
+    geo = _geo
+    geo[0] = dst_w
+    geo[1] = dx
+    geo[2] = dy
+    geo[3] = src_w
+    geo[4] = sx
+    geo[5] = sy
+    geo[6] = w
+    geo[7] = h
+    geo[8] = key
+    _blit_keyed(dst, src, geo)
+
+
+def fill(dst, nbytes, color):
+    """Fill the first nbytes of dst with an RGB565 color."""
+    geo = _geo
+    geo[0] = nbytes
+    geo[1] = color
+    _fill(dst, geo)
+
+
+def invert_rect(dst, dst_w, x0, y0, w, h):
+    """Invert (XOR 0xFFFF) the w x h rect at (x0, y0) of dst in place."""
+    geo = _geo
+    geo[0] = dst_w
+    geo[1] = x0
+    geo[2] = y0
+    geo[3] = w
+    geo[4] = h
+    _invert_rect(dst, geo)
+
+
+def rle_blit(dst, dst_w, data, offset, h, scale):
+    """Blit the RLE frame starting at data[offset] onto dst at scale.
+
+    Only opaque spans are stored, so no transparency test is needed.
+
+    Args:
+        dst: Destination buffer, dst_w pixels wide
+        data: RLE sheet contents (memoryview preferred)
+        offset: Byte offset of the frame in data
+        h: Frame height in source pixels
+        scale: Output pixels per source pixel (each way)
+    """
+    geo = _geo
+    geo[0] = dst_w
+    geo[1] = offset
+    geo[2] = h
+    geo[3] = scale
+    _rle_blit(dst, data, geo)
+
+
+def idx_blit(dst, dst_w, data, sheet_w, sx0, sy0, w, h, scale, bpp, pal_offset, pix_offset):
+    """Blit a w x h cell at (sx0, sy0) of a palette-indexed sheet onto dst.
+
+    Args:
+        dst: Destination buffer, dst_w pixels wide
+        data: Indexed sheet contents (see utils/raw2idx.py)
+        sheet_w: Sheet width in pixels
+        scale: Output pixels per source pixel (each way)
+        bpp: Bits per index (4 or 8)
+        pal_offset: Byte offset of the RGB565 palette bank in data
+        pix_offset: Byte offset of the first index row in data
+    """
+    geo = _geo
+    geo[0] = dst_w
+    geo[1] = sheet_w
+    geo[2] = sx0
+    geo[3] = sy0
+    geo[4] = w
+    geo[5] = h
+    geo[6] = scale
+    geo[7] = bpp
+    geo[8] = pal_offset
+    geo[9] = pix_offset
+    _idx_blit(dst, data, geo)
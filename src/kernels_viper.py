@@ -0,0 +1,278 @@
+# kernels_viper.py
+# Viper-compiled versions of the pixel kernels in kernels.py (MicroPython only)
+#
+# Each function mirrors its pure Python twin in kernels.py, but indexes the
+# buffers through raw ptr8/ptr16/ptr32 pointers and never allocates. The copy
+# kernels move whole RGB565 pixels through ptr16 (buffers and offsets are
+# always 2-byte aligned). Import this module via
+# kernels.py, never directly: it does not compile under CPython.
+
+import micropython
+
+
+@micropython.viper
+def overlay_colorkey(dst: ptr8, src: ptr8, geo: ptr32):
+    nbytes = geo[0]
+    key = geo[1]
+    i = 0
+    while i < nbytes:
+        hi = src[i]
+        lo = src[i + 1]
+        if ((hi << 8) | lo) != key:
+            dst[i] = hi
+            dst[i + 1] = lo
+        i += 2
+
+
+@micropython.viper
+def blit_scaled(dst: ptr8, sheet: ptr8, geo: ptr32):
+    dst_w = geo[0]
+    sheet_w = geo[1]
+    sx0 = geo[2]
+    sy0 = geo[3]
+    w = geo[4]
+    h = geo[5]
+    scale = geo[6]
+    key = geo[7]
+    dst_stride = dst_w * 2
+
+    sy = 0
+    while sy < h:
+        si = ((sy0 + sy) * sheet_w + sx0) * 2
+        sx = 0
+        while sx < w:
+            hi = sheet[si]
+            lo = sheet[si + 1]
+            if ((hi << 8) | lo) != key:
+                by = 0
+                while by < scale:
+                    di = (sy * scale + by) * dst_stride + sx * scale * 2
+                    bx = 0
+                    while bx < scale:
+                        dst[di] = hi
+                        dst[di + 1] = lo
+                        di += 2
+                        bx += 1
+                    by += 1
+            si += 2
+            sx += 1
+        sy += 1
+
+
+@micropython.viper
+def copy_rect(dst: ptr16, src: ptr16, geo: ptr32):
+    src_w = geo[0]
+    x0 = geo[1]
+    y0 = geo[2]
+    w = geo[3]
+    h = geo[4]
+
+    di = 0
+    dy = 0
+    while dy < h:
+        si = (y0 + dy) * src_w + x0
+        end = si + w
+        while si < end:
+            dst[di] = src[si]
+            si += 1
+            di += 1
+        dy += 1
+
+
+@micropython.viper
+def paste_rect(dst: ptr16, src: ptr16, geo: ptr32):
+    dst_w = geo[0]
+    x0 = geo[1]
+    y0 = geo[2]
+    w = geo[3]
+    h = geo[4]
+
+    si = 0
+    y = 0
+    while y < h:
+        di = (y0 + y) * dst_w + x0
+        end = di + w
+        while di < end:
+            dst[di] = src[si]
+            si += 1
+            di += 1
+        y += 1
+
+
+@micropython.viper
+def blit_spans(dst: ptr16, src: ptr16, spans: ptr16, geo: ptr32):
+    n = geo[0]
+    dst_w = geo[1]
+    dx = geo[2]
+    dy = geo[3]
+    src_w = geo[4]
+    sx = geo[5]
+    sy = geo[6]
+    w = geo[7]
+    h = geo[8]
+
+    # Spans are in row order, so the row is tracked instead of divided out
+    row = 0
+    row_start = 0
+    i = 0
+    while i < n:
+        start = spans[i] >> 1
+        while start >= row_start + src_w:
+            row += 1
+            row_start += src_w
+        if row >= sy + h:
+            break
+        if row >= sy:
+            x = start - row_start
+            end = (spans[i + 1] >> 1) - row_start
+            if x < sx:
+                x = sx
+            if end > sx + w:
+                end = sx + w
+            di = (dy + row - sy) * dst_w + dx - sx
+            while x < end:
+                dst[di + x] = src[row_start + x]
+                x += 1
+        i += 2
+
+
+@micropython.viper
+def blit_keyed(dst: ptr16, src: ptr16, geo: ptr32):
+    dst_w = geo[0]
+    dx = geo[1]
+    dy = geo[2]
+    src_w = geo[3]
+    sx = geo[4]
+    sy = geo[5]
+    w = geo[6]
+    h = geo[7]
+    key = geo[8]
+
+    # ptr16 loads are little-endian; swap the key to match the raw bytes
+    key = ((key & 0xFF) << 8) | ((key >> 8) & 0xFF)
+
+    y = 0
+    while y < h:
+        si = (sy + y) * src_w + sx
+        di = (dy + y) * dst_w + dx
+        end = si + w
+        while si < end:
+            c = src[si]
+            if c != key:
+                dst[di] = c
+            si += 1
+            di += 1
+        y += 1
+
+
+@micropython.viper
+def fill(dst: ptr16, geo: ptr32):
+    n = geo[0] >> 1
+    color = geo[1]
+    color = ((color & 0xFF) << 8) | ((color >> 8) & 0xFF)
+    i = 0
+    while i < n:
+        dst[i] = color
+        i += 1
+
+
+@micropython.viper
+def invert_rect(dst: ptr16, geo: ptr32):
+    dst_w = geo[0]
+    x0 = geo[1]
+    y0 = geo[2]
+    w = geo[3]
+    h = geo[4]
+
+    y = 0
+    while y < h:
+        i = (y0 + y) * dst_w + x0
+        end = i + w
+        while i < end:
+            dst[i] = dst[i] ^ 0xFFFF
+            i += 1
+        y += 1
+
+
+@micropython.viper
+def rle_blit(dst: ptr8, src: ptr8, geo: ptr32):
+    dst_w = geo[0]
+    si = geo[1]
+    h = geo[2]
+    scale = geo[3]
+    stride = dst_w * 2
+
+    y = 0
+    while y < h:
+        row_start = y * scale * stride
+        x = 0
+        spans = src[si]
+        si += 1
+        while spans > 0:
+            x += src[si]
+            end = x + src[si + 1]
+            si += 2
+            while x < end:
+                hi = src[si]
+                lo = src[si + 1]
+                si += 2
+                di = row_start + x * scale * 2
+                by = 0
+                while by < scale:
+                    d = di + by * stride
+                    bx = 0
+                    while bx < scale:
+                        dst[d] = hi
+                        dst[d + 1] = lo
+                        d += 2
+                        bx += 1
+                    by += 1
+                x += 1
+            spans -= 1
+        y += 1
+
+
+@micropython.viper
+def idx_blit(dst: ptr8, src: ptr8, geo: ptr32):
+    dst_w = geo[0]
+    sheet_w = geo[1]
+    sx0 = geo[2]
+    sy0 = geo[3]
+    w = geo[4]
+    h = geo[5]
+    scale = geo[6]
+    bpp = geo[7]
+    pal = geo[8]
+    pix = geo[9]
+    row_bytes = (sheet_w * bpp) >> 3
+    dst_stride = dst_w * 2
+
+    sy = 0
+    while sy < h:
+        row = pix + (sy0 + sy) * row_bytes
+        sx = 0
+        while sx < w:
+            x = sx0 + sx
+            if bpp == 4:
+                packed = src[row + (x >> 1)]
+                if x & 1:
+                    idx = packed & 0x0F
+                else:
+                    idx = packed >> 4
+            else:
+                idx = src[row + x]
+            if idx != 0:
+                hi = src[pal + idx * 2]
+                lo = src[pal + idx * 2 + 1]
+                by = 0
+                while by < scale:
+                    di = (sy * scale + by) * dst_stride + sx * scale * 2
+                    bx = 0
+                    while bx < scale:
+                        dst[di] = hi
+                        dst[di + 1] = lo
+                        di += 2
+                        bx += 1
+                    by += 1
+            sx += 1
+        sy += 1
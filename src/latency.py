@@ -0,0 +1,159 @@
+# latency.py
+# Input-to-photon latency histograms (config.LATENCY_TRACE)
+#
+# Each handled input event is timestamped at four points:
+#   edge    - debounced button edge (Input's event time)
+#   wake    - main loop / input task starts processing it
+#   handled - Game._handle_input done (menu state and graphics updated)
+#   pushed  - the frame showing it has been pushed to the display
+# and the stage times land in fixed-size log-scale histograms:
+#   wake   = edge -> wake      (ISR, sleep/idle wake-up, other work)
+#   handle = wake -> handled   (Input.update decode + game logic + drawing)
+#   render = handled -> pushed (compositing + SPI push)
+#   total  = edge -> pushed
+# One event is followed at a time (the oldest press of a loop pass); presses
+# handled before its frame is pushed belong to that same frame.
+#
+# With RENDER_ON_CORE1 "pushed" is when the frame is queued for core 1, and
+# with USE_SPI_DMA when its last DMA transfer has started.
+#
+# Print with report() from the REPL, or type 'l' on the serial console while
+# the game runs ('r' resets). Disabled, Game holds no tracker and none of
+# this runs.
+
+import sys
+import time
+from array import array
+
+STAGES = ("wake", "handle", "render", "total")
+
+# Buckets: 4 per power of two (values < 8 us are exact), up to ~67 s
+_SUB = 4
+BUCKETS = _SUB * 25
+
+# The tracker Game is using (for report() from the REPL)
+tracker = None
+
+
+def _bucket(us):
+    """Histogram bucket for a latency in us."""
+    if us < 2 * _SUB:
+        return us if us > 0 else 0
+    octave = 0
+    while us >= 2 * _SUB:
+        us >>= 1
+        octave += 1
+    bucket = octave * _SUB + us
+    return bucket if bucket < BUCKETS else BUCKETS - 1
+
+
+def _bucket_top(bucket):
+    """Largest latency (us) that falls in a bucket."""
+    if bucket < 2 * _SUB:
+        return bucket
+    octave = bucket // _SUB - 1
+    return ((bucket - octave * _SUB + 1) << octave) - 1
+
+
+class LatencyTracker:
+    """Per-stage latency histograms for input events."""
+
+    def __init__(self):
+        n = len(STAGES)
+        self.counts = [array('I', [0] * BUCKETS) for _ in range(n)]
+        self.max_us = array('I', [0] * n)
+        self.events = 0
+        self._edge = 0
+        self._wake = 0
+        self._handled = 0
+        self._in_flight = False
+        self._poll = None
+
+    def wake(self):
+        """Timestamp the start of an input pass."""
+        if not self._in_flight:
+            self._wake = time.ticks_us()
+
+    def handled(self, edge):
+        """Timestamp the end of input handling.
+
+        Args:
+            edge: ticks_us of the oldest press just handled
+                (Input.pending_edge(); None = no press)
+        """
+        if edge is None or self._in_flight:
+            return
+        self._edge = edge
+        self._handled = time.ticks_us()
+        self._in_flight = True
+
+    def pushed(self):
+        """Timestamp the end of a render; completes the event in flight."""
+        if not self._in_flight:
+            return
+        self._in_flight = False
+        now = time.ticks_us()
+        # The edge may land after the wake stamp (pressed during the pass)
+        wake = max(0, time.ticks_diff(self._wake, self._edge))
+        self._add(0, wake)
+        self._add(1, time.ticks_diff(self._handled, self._edge) - wake)
+        self._add(2, time.ticks_diff(now, self._handled))
+        self._add(3, time.ticks_diff(now, self._edge))
+        self.events += 1
+
+    def _add(self, stage, us):
+        self.counts[stage][_bucket(us)] += 1
+        if us > self.max_us[stage]:
+            self.max_us[stage] = us
+
+    def percentile(self, stage, p):
+        """Return the latency (us) at percentile p of a stage (bucket top)."""
+        counts = self.counts[stage]
+        rank = (self.events * p + 99) // 100
+        seen = 0
+        for bucket in range(BUCKETS):
+            seen += counts[bucket]
+            if seen >= rank and seen:
+                return min(_bucket_top(bucket), self.max_us[stage])
+        return 0
+
+    def report(self):
+        """Print p50/p95/max per stage."""
+        print(f"Latency: {self.events} input events (us)")
+        print(f"  {'stage':<8}{'p50':>9}{'p95':>9}{'max':>9}")
+        for stage, name in enumerate(STAGES):
+            print(f"  {name:<8}{self.percentile(stage, 50):>9}"
+                  f"{self.percentile(stage, 95):>9}{self.max_us[stage]:>9}")
+
+    def reset(self):
+        """Clear the histograms."""
+        for stage in range(len(STAGES)):
+            counts = self.counts[stage]
+            for bucket in range(BUCKETS):
+                counts[bucket] = 0
+            self.max_us[stage] = 0
+        self.events = 0
+        self._in_flight = False
+
+    def poll_serial(self):
+        """Handle a pending serial command: 'l' = report, 'r' = reset."""
+        if self._poll is None:
+            import select
+            self._poll = select.poll()
+            self._poll.register(sys.stdin, select.POLLIN)
+        if not self._poll.poll(0):
+            return
+        command = sys.stdin.read(1)
+        if command == "l":
+            self.report()
+        elif command == "r":
+            self.reset()
+            print("Latency: reset")
+
+
+def report():
+    """Print the running game's latency histograms (REPL helper)."""
+    if tracker is None:
+        print("Latency: not tracking (set config.LATENCY_TRACE)")
+    else:
+        tracker.report()
@@ -0,0 +1,153 @@
+# pio_buttons.py
+# Button sampling and debouncing on an RP2 PIO state machine
+#
+# The state machine samples the three button pins (consecutive GPIOs from
+# PIN_BTN_A) and only reports a new pin state once it has read the same
+# value DEBOUNCE_SAMPLES times in a row, DEBOUNCE_SAMPLE_MS apart. Reports
+# go into the RX FIFO (joined, 8 deep), each followed by a PIO IRQ whose
+# handler only timestamps it and wakes the main loop. Bounce costs no CPU:
+# Input.update() drains the FIFO and turns the changed bits into events.
+#
+# debounce_program is plain Python calling the PIO assembler's names, so it
+# is assembled by rp2.asm_pio on the device and by the interpreter in
+# utils/bounce_sim.py on the host (tests/test_bounce_sim.py).
+
+from array import array
+import time
+import config
+
+# Cycles per sample in the settle loop below (32 + 5 instructions); the
+# waiting loop is 2 cycles shorter
+SAMPLE_CYCLES = 37
+
+# clk_sys assumed when the real one is not given (RP2350 default)
+CLK_SYS_HZ = 150_000_000
+
+
+def timing(clk_sys=CLK_SYS_HZ):
+    """Return (state machine freq, pull_thresh, report lag in us).
+
+    The reading that differs from the last report is the first of the
+    DEBOUNCE_SAMPLES agreeing ones, so the settle loop counts the rest.
+
+    Raises:
+        ValueError: DEBOUNCE_SAMPLES is not 2-16, or DEBOUNCE_SAMPLE_MS
+            needs a state machine clock below clk_sys / 65536 (the largest
+            divider), i.e. more than 16 ms at 150 MHz
+    """
+    sample_ms = config.DEBOUNCE_SAMPLE_MS
+    if not 2 <= config.DEBOUNCE_SAMPLES <= 16:
+        raise ValueError(f"DEBOUNCE_SAMPLES must be 2-16 for the PIO debouncer, "
+                         f"not {config.DEBOUNCE_SAMPLES}")
+    freq = SAMPLE_CYCLES * 1000 // sample_ms if sample_ms > 0 else 0
+    if freq * 65536 < clk_sys:
+        max_ms = SAMPLE_CYCLES * 1000 * 65536 // clk_sys
+        raise ValueError(f"DEBOUNCE_SAMPLE_MS must be 1-{max_ms} for the PIO debouncer "
+                         f"at {clk_sys // 1_000_000} MHz, not {sample_ms}")
+    samples = config.DEBOUNCE_SAMPLES - 1
+    return freq, samples, samples * sample_ms * 1000
+
+
+def debounce_program():
+    # Y = last reported pin state, OSR shift count = agreeing samples after
+    # the change (the OSR counts as empty after pull_thresh outs)
+    label("wait")
+    wrap_target()
+    mov(isr, null)          [31]
+    in_(pins, 3)
+    mov(x, isr)
+    jmp(x_not_y, "changed")
+    wrap()
+    label("changed")
+    mov(y, x)               # New candidate state
+    mov(osr, null)          # Restart the count
+    label("settle")
+    mov(isr, null)          [31]
+    in_(pins, 3)
+    mov(x, isr)
+    jmp(x_not_y, "changed") # Bounced: count again from this reading
+    out(null, 1)
+    jmp(not_osre, "settle")
+    mov(isr, y)             # Stable long enough: report it
+    push(block)
+    irq(rel(0))
+    jmp("wait")
+
+
+class PioButtons:
+    """Debounced button states from a PIO state machine."""
+
+    def __init__(self, pin_base, on_report=None):
+        """Start the state machine.
+
+        Args:
+            pin_base: Pin object of the first button (PIN_BTN_A); the other
+                two must be the next GPIOs
+            on_report: Optional ISR-safe function called after each report
+                (e.g. Scheduler.wake)
+        """
+        import rp2
+        from machine import freq as clk_sys
+
+        self.on_report = on_report
+        self.level = bytearray(3)   # Reported level per button, 1 = down
+        # Reports are dated back to the first of the agreeing samples
+        freq, pull_thresh, self.lag_us = timing(clk_sys())
+
+        # Report timestamps, written by the IRQ handler in FIFO order
+        self._stamps = array('i', [0] * 16)
+        self._stamp_in = 0
+        self._stamp_out = 0
+
+        program = rp2.asm_pio(
+            in_shiftdir=rp2.PIO.SHIFT_LEFT,
+            out_shiftdir=rp2.PIO.SHIFT_RIGHT,
+            pull_thresh=pull_thresh,
+            fifo_join=rp2.PIO.JOIN_RX,
+        )(debounce_program)
+        self._sm = rp2.StateMachine(
+            config.PIO_BUTTONS_SM, program,
+            freq=freq,
+            in_base=pin_base,
+        )
+        self._sm.irq(self._irq, hard=True)
+        self._sm.active(1)
+
+    def _irq(self, sm):
+        # Hard IRQ: timestamp the report just pushed and wake the loop
+        self._stamps[self._stamp_in & 15] = time.ticks_us()
+        self._stamp_in += 1
+        if self.on_report is not None:
+            self.on_report()
+
+    def drain(self, sink):
+        """Turn queued reports into sink(button, edge, ticks_us) calls.
+
+        Only reports the IRQ has already timestamped are taken; a report
+        pushed a moment ago is picked up by the next drain.
+        """
+        sm = self._sm
+        while self._stamp_out != self._stamp_in and sm.rx_fifo():
+            state = sm.get()
+            t = time.ticks_add(self._stamps[self._stamp_out & 15], -self.lag_us)
+            self._stamp_out += 1
+            report(self.level, state, t, sink)
+
+    def close(self):
+        """Stop the state machine."""
+        self._sm.active(0)
+        self._sm.irq(None)
+
+
+def report(level, state, t, sink):
+    """Compare a reported pin state with level and emit the changes.
+
+    Pins are active-low, so a 0 bit is a pressed button. A report can
+    repeat the previous state (a glitch that settled back): nothing is
+    emitted then.
+    """
+    for idx in range(3):
+        down = 0 if state & (1 << idx) else 1
+        if down != level[idx]:
+            level[idx] = down
+            sink(idx, down, t)
@@ -0,0 +1,216 @@
+# render_worker.py
+# Dual-core rendering: game logic on core 0, compositing and SPI on core 1
+#
+# With RENDER_ON_CORE1, Graphics and the display belong to a worker thread
+# started with _thread (which runs on core 1 on the RP2040/RP2350). Game and
+# Input keep running on core 0 and talk to it through a RenderClient, which
+# has the Graphics methods the game calls but only queues a command for each.
+# Commands are (op, a, b) triples of small ints in a preallocated ring buffer
+# guarded by a lock, so queueing never allocates.
+
+import time
+from array import array
+import _thread
+
+# Commands (op, a, b); menu index None is sent as -1
+OP_STOP = 0
+OP_PRESENT = 1              # Push everything that changed
+OP_MENU = 2                 # a = selected menu index
+OP_SET_EGG = 3              # a = color, b = size
+OP_ADVANCE_EGG = 4
+OP_ADVANCE_SPRITE = 5
+OP_UPDATE_EGG = 6
+OP_UPDATE_SPRITE = 7
+OP_RESET_PET = 8            # Phase change: egg hatched
+OP_CLEAR_SPRITE = 9         # Phase change: back to waiting
+OP_BACKGROUND = 10          # Next animated background frame
+OP_DISPLAY = 11             # a = 1 (on) or 0 (off)
+OP_SPI_BYTES = 12           # Print and reset the display's SPI byte counters
+
+
+class CommandQueue:
+    """Fixed-capacity, lock-protected FIFO of (op, a, b) commands."""
+
+    def __init__(self, capacity):
+        self._buf = array('h', [0] * (capacity * 3))
+        self._lock = _thread.allocate_lock()
+        self.capacity = capacity
+        self._head = 0          # Next slot to read
+        self._count = 0
+        self.closed = False     # Set when the consumer has exited
+        self.max_depth = 0      # Deepest the queue has been
+
+    def put(self, op, a=0, b=0):
+        """Append a command, waiting while the queue is full."""
+        while True:
+            if self.closed:
+                raise RuntimeError("Render worker has stopped")
+            self._lock.acquire()
+            count = self._count
+            if count < self.capacity:
+                i = (self._head + count) % self.capacity * 3
+                buf = self._buf
+                buf[i] = op
+                buf[i + 1] = a
+                buf[i + 2] = b
+                self._count = count + 1
+                if count >= self.max_depth:
+                    self.max_depth = count + 1
+                self._lock.release()
+                return
+            self._lock.release()
+            # Full: the worker is behind; let it drain
+            time.sleep_ms(1)
+
+    def get(self, out):
+        """Pop the oldest command into out (array of 3).
+
+        Returns:
+            bool: False if the queue was empty
+        """
+        self._lock.acquire()
+        if self._count == 0:
+            self._lock.release()
+            return False
+        i = self._head * 3
+        buf = self._buf
+        out[0] = buf[i]
+        out[1] = buf[i + 1]
+        out[2] = buf[i + 2]
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+        self._lock.release()
+        return True
+
+    def __len__(self):
+        return self._count
+
+
+class RenderWorker:
+    """Executes queued render commands on a second thread (core 1)."""
+
+    def __init__(self, graphics, display, capacity):
+        self.graphics = graphics
+        self.display = display
+        self.queue = CommandQueue(capacity)
+        self.commands = 0       # Commands executed
+        self.running = False
+
+    def start(self):
+        """Start the worker thread."""
+        self.running = True
+        _thread.start_new_thread(self._run, ())
+
+    def stop(self):
+        """Finish the queued commands and wait for the thread to exit."""
+        if not self.running:
+            return
+        self.queue.put(OP_STOP)
+        while self.running:
+            time.sleep_ms(1)
+
+    def _run(self):
+        cmd = array('h', [0, 0, 0])
+        queue = self.queue
+        try:
+            while True:
+                if not queue.get(cmd):
+                    time.sleep_ms(1)
+                    continue
+                if cmd[0] == OP_STOP:
+                    break
+                self._execute(cmd[0], cmd[1], cmd[2])
+                self.commands += 1
+        except Exception as e:
+            print(f"Render worker failed: {e}")
+        finally:
+            queue.closed = True
+            self.running = False
+
+    def _execute(self, op, a, b):
+        graphics = self.graphics
+        if op == OP_PRESENT:
+            graphics.present()
+        elif op == OP_MENU:
+            graphics.update_menu_selection(None, None if a < 0 else a)
+        elif op == OP_SET_EGG:
+            graphics.set_egg(a, b)
+        elif op == OP_ADVANCE_EGG:
+            graphics.advance_egg_frame()
+        elif op == OP_ADVANCE_SPRITE:
+            graphics.advance_sprite_frame()
+        elif op == OP_UPDATE_EGG:
+            graphics.update_egg()
+        elif op == OP_UPDATE_SPRITE:
+            graphics.update_sprite()
+        elif op == OP_RESET_PET:
+            graphics.reset_pet_sprite()
+        elif op == OP_CLEAR_SPRITE:
+            graphics.clear_sprite_region()
+        elif op == OP_BACKGROUND:
+            graphics.advance_background()
+        elif op == OP_DISPLAY:
+            if a:
+                self.display.display_on()
+            else:
+                self.display.display_off()
+        elif op == OP_SPI_BYTES:
+            # The counters are only touched here, on the thread that sends
+            display = self.display
+            if display.cmd_bytes or display.pixel_bytes:
+                print(f"SPI frame: {display.cmd_bytes} cmd bytes, {display.pixel_bytes} pixel bytes")
+                display.reset_counters()
+
+
+class RenderClient:
+    """Core 0 side: stands in for Graphics (and the display for Input).
+
+    Only the calls the game makes during play are provided. background and
+    pool are the worker's objects, for the game's None checks and debug
+    stats; reading them from core 0 is racy but harmless.
+    """
+
+    def __init__(self, worker):
+        self.worker = worker
+        self._put = worker.queue.put
+        self.background = worker.graphics.background
+        self.pool = worker.graphics.pool
+
+    def present(self):
+        self._put(OP_PRESENT)
+
+    def update_menu_selection(self, old_selection, new_selection):
+        self._put(OP_MENU, -1 if new_selection is None else new_selection)
+
+    def set_egg(self, color, size):
+        self._put(OP_SET_EGG, color, size)
+
+    def advance_egg_frame(self):
+        self._put(OP_ADVANCE_EGG)
+
+    def advance_sprite_frame(self):
+        self._put(OP_ADVANCE_SPRITE)
+
+    def update_egg(self):
+        self._put(OP_UPDATE_EGG)
+
+    def update_sprite(self):
+        self._put(OP_UPDATE_SPRITE)
+
+    def reset_pet_sprite(self):
+        self._put(OP_RESET_PET)
+
+    def clear_sprite_region(self):
+        self._put(OP_CLEAR_SPRITE)
+
+    def advance_background(self):
+        self._put(OP_BACKGROUND)
+
+    def display_on(self):
+        self._put(OP_DISPLAY, 1)
+
+    def display_off(self):
+        self._put(OP_DISPLAY, 0)
+
+    def report_spi_bytes(self):
+        self._put(OP_SPI_BYTES)
@@ -0,0 +1,95 @@
+# scheduler.py
+# Deadline-driven sleep for the main loop
+#
+# Instead of waking on a fixed poll interval, the game computes the earliest
+# moment anything can change (game tick, sprite frame, background frame,
+# screen timeout) and idles until then. Button ISRs call wake() so a press is
+# handled immediately. machine.idle() returns on any interrupt, so a wake()
+# that lands just before idle() is seen within one system tick (1 ms).
+#
+# With the screen off the game can ask for a light sleep instead:
+# machine.lightsleep() stops the CPU clocks until the deadline or a button
+# GPIO interrupt, and the game ticks missed meanwhile are applied in bulk on
+# wake. Time asleep vs awake is tracked to quantify the saving.
+
+import time
+from machine import idle, lightsleep
+import config
+
+
+def earliest(a, b):
+    """Return the earlier of two ticks_ms deadlines (None = no deadline)."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if time.ticks_diff(a, b) <= 0 else b
+
+
+class Scheduler:
+    """Sleeps until a deadline or a wake() from an interrupt."""
+
+    def __init__(self):
+        self._woken = False
+
+        # Counters since the last reset_stats()
+        self.wakeups = 0        # Loop passes (deadline reached or woken)
+        self.isr_wakeups = 0    # Passes started by wake()
+        self.busy_us = 0        # Time spent outside sleep_until
+        self.light_sleeps = 0   # machine.lightsleep() calls
+        self.asleep_us = 0      # Time spent in machine.lightsleep()
+        self._stats_start = time.ticks_us()
+        self._busy_start = self._stats_start
+
+    def wake(self):
+        """Cut the current sleep short (ISR-safe: sets a flag only)."""
+        self._woken = True
+
+    def sleep_until(self, deadline, light=False):
+        """Idle until deadline (ticks_ms) or wake(), whichever comes first.
+
+        Returns immediately if wake() was called since the last sleep.
+
+        Args:
+            deadline: ticks_ms time to wake up
+            light: Use machine.lightsleep (at most LIGHTSLEEP_MAX_MS per
+                call) instead of idling; only while nothing is on screen
+        """
+        self.busy_us += time.ticks_diff(time.ticks_us(), self._busy_start)
+        while not self._woken:
+            remaining = time.ticks_diff(deadline, time.ticks_ms())
+            if remaining <= 0:
+                break
+            if light:
+                start = time.ticks_us()
+                lightsleep(min(remaining, config.LIGHTSLEEP_MAX_MS))
+                self.asleep_us += time.ticks_diff(time.ticks_us(), start)
+                self.light_sleeps += 1
+            else:
+                idle()
+        if self._woken:
+            self._woken = False
+            self.isr_wakeups += 1
+        self.wakeups += 1
+        self._busy_start = time.ticks_us()
+
+    def stats(self):
+        """Summarize wakeups since the last reset_stats().
+
+        Returns:
+            tuple: (seconds, wakeups per second, ISR wakeups, CPU load %,
+                lightsleep %)
+        """
+        elapsed_us = max(1, time.ticks_diff(time.ticks_us(), self._stats_start))
+        seconds = elapsed_us / 1_000_000
+        return (seconds, self.wakeups / seconds, self.isr_wakeups,
+                100 * self.busy_us / elapsed_us, 100 * self.asleep_us / elapsed_us)
+
+    def reset_stats(self):
+        """Zero the counters."""
+        self.wakeups = 0
+        self.isr_wakeups = 0
+        self.busy_us = 0
+        self.light_sleeps = 0
+        self.asleep_us = 0
+        self._stats_start = time.ticks_us()
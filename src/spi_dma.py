@@ -0,0 +1,192 @@
+# spi_dma.py
+# DMA-driven SPI pixel transfers (RP2040 / RP2350)
+#
+# A DMA channel paced by the SPI TX DREQ feeds a pixel buffer into the SPI
+# data register while the CPU goes on compositing. Buffer ownership passes to
+# the DMA for the duration of a transfer: the caller must not touch the buffer
+# until the completion callback has run or wait() has returned.
+#
+# On the device, completion is signalled by the DMA interrupt: the hard IRQ
+# handler waits for the SPI FIFO to drain, raises CS and schedules the
+# callback. HostDMA stands in for rp2.DMA off-device so the ordering and
+# ownership rules can be exercised without hardware.
+
+import sys
+
+try:
+    from micropython import schedule
+except ImportError:
+    schedule = None
+
+try:
+    from machine import mem32
+except ImportError:
+    mem32 = None
+
+# PL022 SPI registers: base per (chip, SPI id), offsets and status bits
+_SPI_BASE = {
+    "RP2040": (0x4003C000, 0x40040000),
+    "RP2350": (0x40080000, 0x40088000),
+}
+_DREQ_SPI_TX = {
+    "RP2040": (16, 18),
+    "RP2350": (24, 26),
+}
+_SSPDR = 0x08
+_SSPSR = 0x0C
+_SSPICR = 0x20
+_SR_RNE = 0x04      # Receive FIFO not empty
+_SR_BSY = 0x10      # Shifting out a frame or TX FIFO not empty
+_ICR_RORIC = 0x01   # Clear receive overrun
+
+
+def _chip():
+    """Return "RP2040" or "RP2350" from the firmware's machine string."""
+    machine = getattr(sys.implementation, "_machine", "")
+    return "RP2350" if "RP2350" in machine else "RP2040"
+
+
+class HostDMA:
+    """Off-device stand-in for rp2.DMA.
+
+    A transfer stays active until complete() is called, at which point the
+    bytes are copied from the source buffer (so any write to the buffer while
+    the DMA owns it shows up in sent) and the IRQ handler runs. With
+    auto_complete, polling active() completes the transfer instead.
+    """
+
+    def __init__(self, auto_complete=True):
+        self.auto_complete = auto_complete
+        self.sent = []          # One bytes object per completed transfer
+        self._read = None
+        self._count = 0
+        self._active = False
+        self._handler = None
+
+    def pack_ctrl(self, **kwargs):
+        return 0
+
+    def config(self, read=None, write=None, count=0, ctrl=0, trigger=False):
+        if self._active:
+            raise RuntimeError("DMA reconfigured while a transfer is active")
+        self._read = read
+        self._count = count
+        self._active = trigger
+
+    def irq(self, handler=None, hard=False):
+        self._handler = handler
+
+    def active(self):
+        if self._active and self.auto_complete:
+            self.complete()
+        return self._active
+
+    def complete(self):
+        """Finish the active transfer and raise the completion IRQ."""
+        if not self._active:
+            return
+        self.sent.append(bytes(self._read[:self._count]))
+        self._active = False
+        if self._handler is not None:
+            self._handler(self)
+
+    def close(self):
+        self._handler = None
+
+
+class SpiDma:
+    """Streams pixel buffers to an SPI peripheral's TX FIFO by DMA."""
+
+    def __init__(self, spi_id, dma=None):
+        """
+        Args:
+            spi_id: SPI peripheral number (0 or 1)
+            dma: rp2.DMA-like channel; None claims a real one (device only)
+        """
+        if dma is None:
+            import rp2
+            dma = rp2.DMA()
+            chip = _chip()
+            base = _SPI_BASE[chip][spi_id]
+            treq = _DREQ_SPI_TX[chip][spi_id]
+        else:
+            base = None         # No registers to poll off-device
+            treq = 0
+        self.dma = dma
+        self._ctrl = dma.pack_ctrl(
+            size=0,             # Byte transfers
+            inc_read=True,
+            inc_write=False,    # Always the SPI data register
+            treq_sel=treq,
+            irq_quiet=False,
+        )
+        # Register addresses are above the small-int range: compute them once
+        # here, since adding them up in the hard IRQ would allocate
+        if base is not None:
+            self._dr = base + _SSPDR
+            self._sr = base + _SSPSR
+            self._icr = base + _SSPICR
+        else:
+            self._dr = self._sr = self._icr = None
+
+        # In-flight transfer state
+        self._pending = False
+        self._cs = None
+        self._buf = None
+        self._callback = None
+        self.transfers = 0
+
+        dma.irq(handler=self._irq, hard=True)
+
+    def busy(self):
+        """True while a transfer is in flight (CS not yet raised)."""
+        return self._pending
+
+    def start(self, buf, cs, callback=None):
+        """Start sending buf; CS (already low) is raised when it completes.
+
+        Waits for any previous transfer first. buf belongs to the DMA until
+        callback(buf) runs or wait() returns.
+        """
+        self.wait()
+        self._pending = True
+        self._cs = cs
+        self._buf = buf
+        self._callback = callback
+        self.transfers += 1
+        self.dma.config(read=buf, write=self._dr, count=len(buf), ctrl=self._ctrl, trigger=True)
+
+    def wait(self):
+        """Block until the in-flight transfer (if any) has completed."""
+        while self._pending:
+            # Host stand-in completes from here; on the device the IRQ does
+            self.dma.active()
+
+    def close(self):
+        """Finish any transfer and release the DMA channel."""
+        self.wait()
+        self.dma.irq(handler=None)
+        self.dma.close()
+
+    def _irq(self, dma):
+        """DMA completion (hard IRQ on the device): no allocation allowed."""
+        sr = self._sr
+        if sr is not None:
+            # The DMA is done once the FIFO has the last byte, not the wire
+            while mem32[sr] & _SR_BSY:
+                pass
+            # Discard what was clocked in while transmitting
+            dr = self._dr
+            while mem32[sr] & _SR_RNE:
+                mem32[dr]
+            mem32[self._icr] = _ICR_RORIC
+        self._cs(1)
+        self._pending = False
+
+        callback = self._callback
+        if callback is not None:
+            self._callback = None
+            if schedule is not None and sr is not None:
+                schedule(callback, self._buf)
+            else:
+                callback(self._buf)
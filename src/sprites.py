@@ -0,0 +1,105 @@
+# sprites.py
+# Sprite sheet formats: a grid of equally sized frames addressed by (col, row)
+#
+# Every sheet exposes the same blit() so Graphics does not care how the pixels
+# are stored:
+#   RawSheet     - plain RGB565 (.raw), transparency tested per pixel
+#   RleSheet     - opaque spans only (.rle, see utils/raw2rle.py)
+#   IndexedSheet - 4/8-bit palette indices (.idx, see utils/raw2idx.py)
+
+from struct import unpack_from
+import config
+import kernels
+
+
+class RawSheet:
+    """Uncompressed RGB565 sheet; TRANSPARENT_KEY pixels are skipped."""
+
+    def __init__(self, data, sheet_w, sheet_h, frame_w, frame_h):
+        self.data = data
+        self.sheet_w = sheet_w
+        self.frame_w = frame_w
+        self.frame_h = frame_h
+        self.cols = sheet_w // frame_w
+        self.rows = sheet_h // frame_h
+
+    def blit(self, dst, dst_w, col, row, scale):
+        """Blit frame (col, row) onto dst, each pixel as a scale x scale block."""
+        kernels.blit_scaled(
+            dst, dst_w,
+            self.data, self.sheet_w,
+            col * self.frame_w, row * self.frame_h, self.frame_w, self.frame_h,
+            scale, config.TRANSPARENT_KEY
+        )
+
+
+class RleSheet:
+    """Run-length encoded sheet storing only the opaque spans of each row."""
+
+    def __init__(self, data):
+        if data[:4] != b'RLE1':
+            raise ValueError("Not an RLE sprite sheet")
+        self.data = memoryview(data)
+        self.frame_w, self.frame_h, self.cols, self.rows = unpack_from('>4H', data, 4)
+
+        # Frame start offsets, row-major
+        count = self.cols * self.rows
+        self.offsets = unpack_from('>%dI' % count, data, 12)
+
+    def blit(self, dst, dst_w, col, row, scale):
+        """Blit frame (col, row) onto dst, each pixel as a scale x scale block."""
+        kernels.rle_blit(
+            dst, dst_w,
+            self.data, self.offsets[row * self.cols + col], self.frame_h,
+            scale
+        )
+
+
+class IndexedSheet:
+    """Palette-indexed sheet; palette index 0 is transparent.
+
+    A sheet has either one palette or one bank per frame row.
+    """
+
+    def __init__(self, data):
+        if data[:4] != b'IDX1':
+            raise ValueError("Not an indexed sprite sheet")
+        self.data = data
+        self.sheet_w, sheet_h, self.frame_w, self.frame_h, self.bpp, self.banks = (
+            unpack_from('>4H2B', data, 4)
+        )
+        self.cols = self.sheet_w // self.frame_w
+        self.rows = sheet_h // self.frame_h
+
+        # Palette banks follow the 14-byte header, then the index rows
+        self.bank_bytes = (1 << self.bpp) * 2
+        self.pal_offset = 14
+        self.pix_offset = self.pal_offset + self.banks * self.bank_bytes
+
+    def blit(self, dst, dst_w, col, row, scale):
+        """Blit frame (col, row) onto dst, each pixel as a scale x scale block."""
+        bank = row if self.banks > 1 else 0
+        kernels.idx_blit(
+            dst, dst_w,
+            self.data, self.sheet_w,
+            col * self.frame_w, row * self.frame_h, self.frame_w, self.frame_h,
+            scale, self.bpp,
+            self.pal_offset + bank * self.bank_bytes, self.pix_offset
+        )
+
+
+def load_sheet(raw_path, rle_path, idx_path, sheet_w, sheet_h, frame_w, frame_h):
+    """Load a sprite sheet in the format selected by config.SPRITE_FORMAT."""
+    if config.SPRITE_FORMAT == "rle":
+        with open(rle_path, "rb") as f:
+            return RleSheet(bytearray(f.read()))
+    if config.SPRITE_FORMAT == "idx":
+        with open(idx_path, "rb") as f:
+            return IndexedSheet(bytearray(f.read()))
+
+    expected_size = sheet_w * sheet_h * config.BPP
+    with open(raw_path, "rb") as f:
+        data = f.read()
+    if len(data) != expected_size:
+        raise ValueError(f"Unexpected size for {raw_path}: {len(data)}")
+    return RawSheet(bytearray(data), sheet_w, sheet_h, frame_w, frame_h)
@@ -0,0 +1,9 @@
+# Host tests: the device code runs under CPython with the stand-ins in
+# utils/host (see hostenv.py).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils", "host"))
+
+import hostenv  # noqa: F401,E402
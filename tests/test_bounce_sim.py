@@ -0,0 +1,110 @@
+# The debounce engines as modelled by utils/bounce_sim.py (the timer engine's
+# ShiftDebouncer and the PIO program, run instruction by instruction), on
+# generated and recorded bounce traces: each real press and release must be
+# reported exactly once.
+
+import os
+import sys
+
+import pytest
+
+from hostenv import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "utils"))
+
+import bounce_sim  # noqa: E402
+import config  # noqa: E402
+import pio_buttons  # noqa: E402
+
+
+def assert_exact(events, trace, max_delay_us):
+    presses, releases = bounce_sim.real_presses(trace)
+    assert presses and len(presses) == len(releases)
+    for edge, starts in ((1, presses), (0, releases)):
+        missed, extra, delays = bounce_sim.score([t for e, t in events if e == edge], starts)
+        assert (missed, extra) == (0, 0)
+        assert max(delays) <= max_delay_us
+
+
+@pytest.mark.parametrize("seed, bounce_ms", [(1, 5), (2, 1), (3, 10)])
+def test_timer_engine(seed, bounce_ms):
+    trace = bounce_sim.generate(200, seed, bounce_ms)
+    events, calls = bounce_sim.run_timer(trace)
+    # Settled after the bounce, plus DEBOUNCE_SAMPLES agreeing samples
+    period = config.DEBOUNCE_SAMPLE_MS
+    assert_exact(events, trace, (bounce_ms + (config.DEBOUNCE_SAMPLES + 1) * period) * 1000)
+
+
+# A logic-analyser style export: a 30 ms tap with contact bounce on both
+# edges (the tap the PIO settle count once missed by one sample), a clean
+# 30 ms tap, a long hold, and a quick double tap
+RECORDED = """t_us,pin
+100000,0
+100300,1
+100700,0
+130700,1
+130900,0
+131200,1
+400000,0
+430000,1
+800000,0
+800150,1
+800400,0
+1200400,1
+1201000,0
+1201300,1
+1500000,0
+1540000,1
+1600000,0
+1640000,1
+"""
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = tmp_path / "taps.csv"
+    path.write_text(RECORDED)
+    return bounce_sim.load(str(path))
+
+
+@pytest.mark.parametrize("engine", ["timer", "pio"])
+def test_recorded_trace(recorded, engine):
+    assert len(bounce_sim.real_presses(recorded)[0]) == 5
+    events, calls = bounce_sim.ENGINES[engine](recorded)
+    assert_exact(events, recorded, 2 * config.DEBOUNCE_SAMPLES * config.DEBOUNCE_SAMPLE_MS * 1000)
+
+
+def test_pio_engine():
+    trace = bounce_sim.generate(40, 5, 5)
+    events, calls = bounce_sim.run_pio(trace)
+    period = config.DEBOUNCE_SAMPLE_MS
+    assert_exact(events, trace, (5 + (config.DEBOUNCE_SAMPLES + 1) * period) * 1000)
+    # One PIO IRQ per report: the initial pin state, then a press and a
+    # release each; bounce costs none
+    assert calls == 1 + 2 * 40
+
+
+def test_pio_program_assembles():
+    prog = bounce_sim.PioProgram(pio_buttons.debounce_program)
+    assert len(prog.code) <= 32
+    assert {"wait", "changed", "settle"} <= set(prog.labels)
+    # The settle loop must take SAMPLE_CYCLES per sample
+    start, end = prog.labels["settle"], prog.code.index(["jmp", ("not_osre", "settle"), 0])
+    assert sum(1 + delay for _, _, delay in prog.code[start:end + 1]) == pio_buttons.SAMPLE_CYCLES
+
+
+@pytest.mark.parametrize("sample_ms, samples", [(17, 6), (0, 6), (5, 1), (5, 17)])
+def test_pio_timing_rejects_out_of_range(monkeypatch, sample_ms, samples):
+    monkeypatch.setattr(config, "DEBOUNCE_SAMPLE_MS", sample_ms)
+    monkeypatch.setattr(config, "DEBOUNCE_SAMPLES", samples)
+    with pytest.raises(ValueError):
+        pio_buttons.timing()
+
+
+def test_pio_timing_range_follows_clk_sys(monkeypatch):
+    monkeypatch.setattr(config, "DEBOUNCE_SAMPLE_MS", 19)
+    freq, pull_thresh, lag_us = pio_buttons.timing(125_000_000)
+    assert freq * 65536 >= 125_000_000
+    assert pull_thresh == config.DEBOUNCE_SAMPLES - 1
+    with pytest.raises(ValueError):
+        pio_buttons.timing(150_000_000)
@@ -0,0 +1,97 @@
+# Golden-frame check of the incremental render path: after every present(),
+# the screen built from the dirty-rect pushes (merged rects, frame diffs,
+# sprite cache) must equal a full redraw of every layer.
+
+import random
+
+import pytest
+
+import config
+from graphics import Graphics
+from hostenv import ROOT
+
+STEPS = 300
+
+
+class ScreenDisplay:
+    """Display stand-in that applies block() pushes to an RGB565 screen."""
+
+    def __init__(self):
+        self.screen = bytearray(config.WIDTH * config.HEIGHT * config.BPP)
+        self.pushes = 0
+
+    def block(self, x0, y0, x1, y1, data):
+        row = (x1 - x0 + 1) * config.BPP
+        i = 0
+        for y in range(y0, y1 + 1):
+            start = (y * config.WIDTH + x0) * config.BPP
+            self.screen[start:start + row] = data[i:i + row]
+            i += row
+        self.pushes += 1
+
+
+def invalidate_random(compositor, rng, min_size, max_size):
+    x, y = rng.randrange(config.WIDTH), rng.randrange(config.HEIGHT)
+    compositor.invalidate(x, y, x + rng.randint(min_size, max_size) - 1,
+                          y + rng.randint(min_size, max_size) - 1)
+
+
+def full_redraw(graphics):
+    """Composite every layer over the whole screen into a fresh display."""
+    compositor = graphics.compositor
+    display = compositor.display
+    reference = ScreenDisplay()
+    compositor.display = reference
+    try:
+        compositor.invalidate_all()
+        compositor.flush()
+    finally:
+        compositor.display = display
+    return reference.screen
+
+
+@pytest.mark.parametrize("cache_frames", [0, 3, 10])
+@pytest.mark.parametrize("sprite_format", ["raw", "rle", "idx"])
+def test_incremental_matches_full_redraw(monkeypatch, sprite_format, cache_frames):
+    monkeypatch.chdir(ROOT + "/assets")
+    monkeypatch.setattr(config, "SPRITE_FORMAT", sprite_format)
+    monkeypatch.setattr(config, "SPRITE_CACHE_FRAMES", cache_frames)
+    monkeypatch.setattr(config, "BG_ANIMATED", False)
+    display = ScreenDisplay()
+    graphics = Graphics(display)
+    graphics.load_assets()
+    graphics.render_initial(show_sprite=False)
+    assert display.screen == full_redraw(graphics)
+
+    rng = random.Random(f"{sprite_format}/{cache_frames}")
+    rows = list(config.ANIM_FRAME_COUNTS)
+    for step in range(STEPS):
+        for _ in range(rng.randint(1, 3)):
+            r = rng.random()
+            if r < 0.25:
+                graphics.update_menu_selection(None, rng.choice([None, 0, 1, 2, 3, 4, 5]))
+            elif r < 0.5:
+                graphics.advance_sprite_frame()
+                graphics.update_sprite()
+            elif r < 0.6:
+                graphics.set_sprite_row(rng.choice(rows))
+                graphics.update_sprite()
+            elif r < 0.7:
+                graphics.set_egg(rng.randrange(5), rng.randrange(2))
+                graphics.update_egg()
+            elif r < 0.8:
+                graphics.advance_egg_frame()
+                graphics.update_egg()
+            elif r < 0.85:
+                graphics.reset_pet_sprite()
+                graphics.update_sprite()
+            elif r < 0.9:
+                graphics.clear_sprite_region()
+            elif r < 0.97:
+                invalidate_random(graphics.compositor, rng, 1, 40)
+            else:
+                # More small rects than there are slots: the overflow path
+                for _ in range(config.MAX_DIRTY_RECTS + 20):
+                    invalidate_random(graphics.compositor, rng, 1, 4)
+        graphics.present()
+        assert display.screen == full_redraw(graphics), f"step {step}"
@@ -0,0 +1,97 @@
+# GameState tick accounting on a clock.VirtualClock: long runs with irregular
+# update gaps across the ticks_ms wraparound.
+
+import random
+
+import pytest
+
+import config
+from clock import TICKS_PERIOD, VirtualClock
+from game_state import GameState
+
+TICKS = 100_000
+# Near the top of the ticks_ms range, so the run wraps early on
+START = TICKS_PERIOD - 1_000_003
+
+
+@pytest.fixture(autouse=True)
+def tick_config(monkeypatch):
+    monkeypatch.setattr(config, "TICK_GAP_POLICY", "fast_forward")
+    monkeypatch.setattr(config, "TICK_CATCHUP_MAX", 10)
+
+
+def gaps(seed):
+    """Irregular update gaps in ms: mostly under a tick or two, some long."""
+    rng = random.Random(seed)
+    tick = config.GAME_TICK_MS
+    while True:
+        r = rng.random()
+        if r < 0.6:
+            yield rng.randint(1, tick - 1)
+        elif r < 0.95:
+            yield rng.randint(tick, 3 * tick)
+        else:
+            yield rng.randint(11 * tick, 400 * tick)
+
+
+def snapshot(state):
+    pet = {k: v for k, v in vars(state.pet).items() if k != "rng"}
+    return (state.phase, state.phase_ticks, state.tick_count, state.last_tick_time,
+            state.egg_color, state.egg_size, state.menu.selected, pet)
+
+
+def test_tick_count_matches_elapsed_time():
+    clock = VirtualClock(START)
+    state = GameState(clock, random.Random(1))
+    elapsed = 0
+    wrapped = False
+    for gap in gaps(2):
+        clock.advance(gap)
+        elapsed += gap
+        wrapped = wrapped or clock.now < START
+        if state.phase == config.PHASE_WAITING:
+            state.start_game()
+        state.update()
+        assert state.tick_count == elapsed // config.GAME_TICK_MS
+        if state.tick_count >= TICKS:
+            break
+    assert wrapped
+    # The leftover part of a tick is still owed
+    assert clock.ticks_diff(clock.now, state.last_tick_time) == elapsed % config.GAME_TICK_MS
+
+
+@pytest.mark.parametrize("sick_chance", [0.0, 1.0])
+def test_bulk_catch_up_matches_single_ticks(monkeypatch, sick_chance):
+    # Random sickness odds match but draw differently, so only 0 and 1 give
+    # the same state both ways
+    monkeypatch.setattr(config, "SICK_CHANCE", sick_chance)
+    bulk_clock = VirtualClock(START)
+    step_clock = VirtualClock(START)
+    bulk = GameState(bulk_clock, random.Random(3))
+    step = GameState(step_clock, random.Random(3))
+    tick = config.GAME_TICK_MS
+    updates = 0
+    lives = 0
+
+    for gap in gaps(4):
+        bulk_clock.advance(gap)
+        bulk.update(catch_up=True)
+        # Reach the same time one tick (one update) at a time
+        while step_clock.ticks_diff(bulk_clock.now, step_clock.now) >= tick:
+            step_clock.advance(tick)
+            assert step.update()
+            updates += 1
+        step_clock.set(bulk_clock.now)
+        step.update()
+
+        assert snapshot(bulk) == snapshot(step)
+        if bulk.phase == config.PHASE_WAITING:
+            bulk.start_game()
+            step.start_game()
+            lives += 1
+        if bulk.tick_count >= TICKS:
+            break
+
+    assert updates >= TICKS - TICKS // 10
+    assert lives > 100
+    assert step_clock.now < START
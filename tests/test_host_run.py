@@ -0,0 +1,17 @@
+# The asyncio runtime end to end on the host stand-ins (utils/host_run.py).
+
+import os
+import sys
+
+import pytest
+
+from hostenv import ROOT
+
+sys.path.insert(0, os.path.join(ROOT, "utils"))
+
+import host_run  # noqa: E402
+
+
+@pytest.mark.parametrize("mode", ["edge", "timer"])
+def test_async_runtime(mode):
+    assert host_run.run(2.5, tick_ms=50, overrides={"DEBOUNCE_MODE": mode}) == []
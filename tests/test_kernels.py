@@ -0,0 +1,198 @@
+# The viper kernels (run through utils/host/micropython.py) must produce the
+# same bytes as the pure Python ones on random buffers and geometries.
+
+import os
+import random
+from array import array
+
+import pytest
+
+import kernels
+import kernels_viper
+import sprites
+from hostenv import ROOT
+
+NAMES = ("overlay_colorkey", "blit_scaled", "copy_rect", "paste_rect", "blit_spans",
+         "blit_keyed", "fill", "invert_rect", "rle_blit", "idx_blit")
+ROUNDS = 50
+
+
+def run_both(name, dst, call):
+    """Run call(dst) with the pure and the viper kernel; return both results."""
+    attr = "_" + name
+    pure = getattr(kernels, attr + "_py")
+    assert getattr(kernels, attr) is pure
+    expected = bytearray(dst)
+    call(expected)
+    setattr(kernels, attr, getattr(kernels_viper, name))
+    try:
+        actual = bytearray(dst)
+        call(actual)
+    finally:
+        setattr(kernels, attr, pure)
+    return expected, actual
+
+
+def image(rng, w, h, key=None):
+    """Random big-endian RGB565 image; about a third of the pixels are key."""
+    buf = bytearray(rng.randbytes(w * h * 2))
+    if key is not None:
+        for i in range(0, len(buf), 2):
+            if rng.random() < 0.3:
+                buf[i] = key >> 8
+                buf[i + 1] = key & 0xFF
+    return buf
+
+
+def load(name):
+    with open(os.path.join(ROOT, "assets", name), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def rng(request):
+    return random.Random(request.node.name)
+
+
+def test_all_kernels_covered():
+    for name in NAMES:
+        assert callable(getattr(kernels_viper, name))
+
+
+def test_overlay_colorkey(rng):
+    for _ in range(ROUNDS):
+        key = rng.randrange(0x10000)
+        n = rng.randint(1, 64)
+        src = image(rng, n, 1, key)
+        nbytes = rng.randint(0, n) * 2
+        expected, actual = run_both("overlay_colorkey", image(rng, n, 1),
+                                    lambda dst: kernels.overlay_colorkey(dst, src, nbytes, key))
+        assert expected == actual
+
+
+def test_blit_scaled(rng):
+    for _ in range(ROUNDS):
+        key = rng.randrange(0x10000)
+        sheet_w, sheet_h = rng.randint(1, 24), rng.randint(1, 24)
+        sheet = image(rng, sheet_w, sheet_h, key)
+        w, h = rng.randint(1, sheet_w), rng.randint(1, sheet_h)
+        sx0, sy0 = rng.randint(0, sheet_w - w), rng.randint(0, sheet_h - h)
+        scale = rng.randint(1, 4)
+        dst_w = w * scale + rng.randint(0, 5)
+        expected, actual = run_both(
+            "blit_scaled", image(rng, dst_w, h * scale),
+            lambda dst: kernels.blit_scaled(dst, dst_w, sheet, sheet_w, sx0, sy0, w, h, scale, key))
+        assert expected == actual
+
+
+def test_copy_rect(rng):
+    for _ in range(ROUNDS):
+        src_w, src_h = rng.randint(1, 40), rng.randint(1, 40)
+        src = memoryview(image(rng, src_w, src_h))
+        w, h = rng.randint(1, src_w), rng.randint(1, src_h)
+        x0, y0 = rng.randint(0, src_w - w), rng.randint(0, src_h - h)
+        expected, actual = run_both("copy_rect", image(rng, w, h),
+                                    lambda dst: kernels.copy_rect(dst, src, src_w, x0, y0, w, h))
+        assert expected == actual
+        assert expected == bytes(b for y in range(h)
+                                 for b in src[((y0 + y) * src_w + x0) * 2:((y0 + y) * src_w + x0 + w) * 2])
+
+
+def test_paste_rect(rng):
+    for _ in range(ROUNDS):
+        dst_w, dst_h = rng.randint(1, 40), rng.randint(1, 40)
+        w, h = rng.randint(1, dst_w), rng.randint(1, dst_h)
+        x0, y0 = rng.randint(0, dst_w - w), rng.randint(0, dst_h - h)
+        src = memoryview(image(rng, w, h))
+        expected, actual = run_both("paste_rect", image(rng, dst_w, dst_h),
+                                    lambda dst: kernels.paste_rect(dst, dst_w, x0, y0, w, h, src))
+        assert expected == actual
+
+
+def test_blit_spans(rng):
+    for _ in range(ROUNDS):
+        src_w, src_h = rng.randint(1, 40), rng.randint(1, 40)
+        src = memoryview(image(rng, src_w, src_h))
+        spans = array('H')
+        for row in range(src_h):
+            x = rng.randint(0, src_w)
+            while x < src_w:
+                end = rng.randint(x + 1, src_w)
+                spans.append((row * src_w + x) * 2)
+                spans.append((row * src_w + end) * 2)
+                x = end + rng.randint(1, 6)
+        w, h = rng.randint(1, src_w), rng.randint(1, src_h)
+        sx, sy = rng.randint(0, src_w - w), rng.randint(0, src_h - h)
+        dst_w, dst_h = w + rng.randint(0, 8), h + rng.randint(0, 8)
+        dx, dy = rng.randint(0, dst_w - w), rng.randint(0, dst_h - h)
+        expected, actual = run_both(
+            "blit_spans", image(rng, dst_w, dst_h),
+            lambda dst: kernels.blit_spans(dst, dst_w, dx, dy, src, src_w, spans, sx, sy, w, h))
+        assert expected == actual
+
+
+def test_blit_keyed(rng):
+    for _ in range(ROUNDS):
+        key = rng.randrange(0x10000)
+        src_w, src_h = rng.randint(1, 40), rng.randint(1, 40)
+        src = image(rng, src_w, src_h, key)
+        w, h = rng.randint(1, src_w), rng.randint(1, src_h)
+        sx, sy = rng.randint(0, src_w - w), rng.randint(0, src_h - h)
+        dst_w, dst_h = w + rng.randint(0, 8), h + rng.randint(0, 8)
+        dx, dy = rng.randint(0, dst_w - w), rng.randint(0, dst_h - h)
+        expected, actual = run_both(
+            "blit_keyed", image(rng, dst_w, dst_h),
+            lambda dst: kernels.blit_keyed(dst, dst_w, dx, dy, src, src_w, sx, sy, w, h, key))
+        assert expected == actual
+
+
+def test_fill(rng):
+    for _ in range(ROUNDS):
+        n = rng.randint(1, 300)
+        nbytes = rng.randint(0, n) * 2
+        color = rng.randrange(0x10000)
+        expected, actual = run_both("fill", image(rng, n, 1),
+                                    lambda dst: kernels.fill(dst, nbytes, color))
+        assert expected == actual
+
+
+def test_invert_rect(rng):
+    for _ in range(ROUNDS):
+        dst_w, dst_h = rng.randint(1, 40), rng.randint(1, 40)
+        w, h = rng.randint(0, dst_w), rng.randint(0, dst_h)
+        x0, y0 = rng.randint(0, dst_w - w), rng.randint(0, dst_h - h)
+        expected, actual = run_both("invert_rect", image(rng, dst_w, dst_h),
+                                    lambda dst: kernels.invert_rect(dst, dst_w, x0, y0, w, h))
+        assert expected == actual
+
+
+@pytest.mark.parametrize("asset", ["yoshisprite.rle", "yoshieggs.rle"])
+def test_rle_blit(rng, asset):
+    sheet = sprites.RleSheet(bytearray(load(asset)))
+    for _ in range(ROUNDS):
+        cell = rng.randrange(len(sheet.offsets))
+        scale = rng.randint(1, 3)
+        dst_w = sheet.frame_w * scale + rng.randint(0, 5)
+        expected, actual = run_both(
+            "rle_blit", image(rng, dst_w, sheet.frame_h * scale),
+            lambda dst: kernels.rle_blit(dst, dst_w, sheet.data, sheet.offsets[cell],
+                                         sheet.frame_h, scale))
+        assert expected == actual
+
+
+@pytest.mark.parametrize("asset", ["yoshisprite.idx", "yoshieggs.idx"])
+def test_idx_blit(rng, asset):
+    sheet = sprites.IndexedSheet(load(asset))
+    for _ in range(ROUNDS):
+        col, row = rng.randrange(sheet.cols), rng.randrange(sheet.rows)
+        bank = rng.randrange(sheet.banks)
+        scale = rng.randint(1, 3)
+        w, h = sheet.frame_w, sheet.frame_h
+        dst_w = w * scale + rng.randint(0, 5)
+        expected, actual = run_both(
+            "idx_blit", image(rng, dst_w, h * scale),
+            lambda dst: kernels.idx_blit(dst, dst_w, sheet.data, sheet.sheet_w, col * w, row * h,
+                                         w, h, scale, sheet.bpp,
+                                         sheet.pal_offset + bank * sheet.bank_bytes,
+                                         sheet.pix_offset))
+        assert expected == actual
@@ -0,0 +1,168 @@
+# The default "loop" runtime (Game._run_loop) on the host stand-ins, on a
+# virtual clock: machine.idle and machine.lightsleep advance time instead of
+# waiting, and return early when a scripted button edge fires its pin IRQ.
+# With RENDER_ON_CORE1 the render worker is a real thread.
+
+import time
+
+import pytest
+
+import clock
+import config
+import scheduler
+import ssd1351
+from hostenv import ROOT
+
+_MASK = clock.TICKS_PERIOD - 1
+
+STOP_MS = 150_000
+# (ms, button, level): 0 = pressed (pins are active-low)
+EDGES = (
+    (500, 0, 0), (520, 2, 0), (700, 0, 1), (700, 2, 1),     # A + C: start an egg
+    (90_000, 1, 0), (90_100, 1, 1),                         # B: wake the screen
+)
+
+
+class VirtualMachine:
+    """Virtual time plus machine.idle / machine.lightsleep for Scheduler."""
+
+    def __init__(self, stop_ms=STOP_MS):
+        self.us = 0
+        self.stop_ms = stop_ms
+        self.edges = list(EDGES)
+        self.pins = None
+        self.game = None
+
+    def ticks_ms(self):
+        return (self.us // 1000) & _MASK
+
+    def ticks_us(self):
+        return self.us & _MASK
+
+    def _step(self):
+        """Advance 1 ms; True if a button edge fired."""
+        self.us += 1000
+        ms = self.us // 1000
+        fired = False
+        while self.edges and self.edges[0][0] <= ms:
+            _, button, level = self.edges.pop(0)
+            self.pins[button].drive(level)
+            fired = True
+        if ms >= self.stop_ms:
+            self.game.stop()
+        return fired
+
+    def idle(self):
+        self._step()
+
+    def lightsleep(self, ms):
+        for _ in range(ms):
+            if self._step():
+                return
+
+
+@pytest.fixture
+def machine_time(monkeypatch):
+    vm = VirtualMachine()
+    monkeypatch.setattr(time, "ticks_ms", vm.ticks_ms)
+    monkeypatch.setattr(time, "ticks_us", vm.ticks_us)
+    monkeypatch.setattr(clock.SystemClock, "ticks_ms", staticmethod(vm.ticks_ms))
+    monkeypatch.setattr(scheduler, "idle", vm.idle)
+    monkeypatch.setattr(scheduler, "lightsleep", vm.lightsleep)
+    monkeypatch.setattr(ssd1351, "sleep", lambda s: None)
+    monkeypatch.chdir(ROOT + "/assets")
+    for name, value in (("RUNTIME", "loop"), ("DEBOUNCE_MODE", "edge"),
+                        ("RENDER_ON_CORE1", False), ("SCREEN_OFF_LIGHTSLEEP", True),
+                        ("SCREEN_TIMEOUT_MS", 3000), ("EGG_HATCH_TICKS", 30),
+                        ("DEATH_TICKS", 100), ("SCHED_STATS_MS", 0),
+                        # Only the screen-off catch-up may fast-forward a gap
+                        ("TICK_GAP_POLICY", "drop"), ("TICK_CATCHUP_MAX", 10)):
+        monkeypatch.setattr(config, name, value)
+    return vm
+
+
+def test_loop_lightsleeps_with_screen_off(machine_time):
+    import game as game_module
+
+    vm = machine_time
+    game = game_module.Game()
+    game.init()
+    vm.game = game
+    vm.pins = game.hardware.get_buttons()
+    state = game.state
+    start = state.last_tick_time
+
+    passes = []     # (ms, tick_count, phase, screen_on) per loop pass
+    render = game._render
+
+    def checked_render():
+        # Every pass has applied exactly the ticks owed so far, including
+        # the ones slept through
+        assert state.tick_count == time.ticks_diff(vm.ticks_ms(), start) // config.GAME_TICK_MS
+        passes.append((vm.ticks_ms(), state.tick_count, state.phase, game.input.screen_on))
+        render()
+
+    game._render = checked_render
+    try:
+        game.run()
+    finally:
+        game.cleanup()
+
+    assert vm.ticks_ms() >= STOP_MS
+    sched = game.scheduler
+    phases = [p for _, _, p, _ in passes]
+    dark = [p for p in passes if not p[3]]
+    assert config.PHASE_EGG in phases and config.PHASE_ALIVE in phases
+    assert phases[-1] == config.PHASE_WAITING           # Lived and died while dark
+    assert dark and dark[0][0] < 5000                   # Screen timed out
+    woken = [ms for ms, _, _, on in passes if on and ms >= 90_000]
+    assert woken and woken[0] == 90_000                 # B woke it at once
+    assert sched.light_sleeps > 0
+    assert sched.asleep_us > 60_000_000
+    # Dark, the loop only woke for phase changes and LIGHTSLEEP_MAX_MS
+    # timeouts, not for every game tick in between
+    assert len(dark) < 10
+    assert sched.light_sleeps <= len(dark) + 2
+    assert state.tick_count > len(dark) * 10
+
+
+def run_game(vm):
+    """Run the loop runtime to vm.stop_ms; returns the stopped Game."""
+    import game as game_module
+
+    game = game_module.Game()
+    game.init()
+    vm.game = game
+    vm.pins = game.hardware.get_buttons()
+    try:
+        game.run()
+    finally:
+        game.cleanup()
+    return game
+
+
+def test_render_on_core1_matches_single_core(machine_time, monkeypatch):
+    # Screen on throughout, so every tick, sprite frame and menu move is drawn
+    monkeypatch.setattr(config, "SCREEN_OFF_LIGHTSLEEP", False)
+    monkeypatch.setattr(config, "SCREEN_TIMEOUT_MS", STOP_MS)
+    monkeypatch.setattr(config, "SPRITE_CACHE_FRAMES", 3)
+    runs = {}
+    for core1 in (False, True):
+        vm = VirtualMachine(stop_ms=20_000)
+        monkeypatch.setattr(time, "ticks_ms", vm.ticks_ms)
+        monkeypatch.setattr(time, "ticks_us", vm.ticks_us)
+        monkeypatch.setattr(clock.SystemClock, "ticks_ms", staticmethod(vm.ticks_ms))
+        monkeypatch.setattr(scheduler, "idle", vm.idle)
+        monkeypatch.setattr(config, "RENDER_ON_CORE1", core1)
+        game = run_game(vm)
+        runs[core1] = game
+        assert game.state.tick_count == vm.ticks_ms() // config.GAME_TICK_MS
+        assert game.state.phase == config.PHASE_ALIVE
+
+    single, dual = runs[False], runs[True]
+    worker = dual.render_worker
+    assert not worker.running and worker.commands > 0
+    assert worker.queue.max_depth <= worker.queue.capacity
+    # Core 1 drew the same frames: the same pixels went over SPI
+    assert dual.hardware.spi.bytes == single.hardware.spi.bytes
+    assert dual.state.tick_count == single.state.tick_count
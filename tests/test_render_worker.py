@@ -0,0 +1,157 @@
+# CommandQueue under real threads: the producers stand in for core 0, the
+# consumer for the render worker on core 1.
+
+import threading
+import time
+from array import array
+
+import pytest
+
+from render_worker import CommandQueue, RenderClient, RenderWorker, OP_MENU, OP_PRESENT
+
+
+def drain(queue):
+    out = array('h', [0, 0, 0])
+    items = []
+    while queue.get(out):
+        items.append(tuple(out))
+    return items
+
+
+def test_fifo_across_wraparound():
+    queue = CommandQueue(5)
+    out = array('h', [0, 0, 0])
+    expected = []
+    got = []
+
+    def put(n):
+        queue.put(n % 12, n, -n)
+        expected.append((n % 12, n, -n))
+
+    # One command always stays queued, so bursts of up to 4 fill the ring
+    # and the head and tail keep moving round it
+    put(0)
+    n = 1
+    for burst in (3, 4, 1, 4, 2, 4, 4, 3):
+        for _ in range(burst):
+            put(n)
+            n += 1
+        for _ in range(burst):
+            assert queue.get(out)
+            got.append(tuple(out))
+    got += drain(queue)
+    assert got == expected
+    assert queue.max_depth == 5
+    assert len(queue) == 0
+
+
+def test_producers_and_consumer_threads():
+    queue = CommandQueue(8)
+    per_producer = 5000
+    producers = 2
+    got = []
+
+    def produce(op):
+        for i in range(per_producer):
+            queue.put(op, i & 0x7FFF, i >> 15)
+
+    def consume():
+        out = array('h', [0, 0, 0])
+        while len(got) < per_producer * producers:
+            if queue.get(out):
+                got.append(tuple(out))
+            else:
+                time.sleep(0)
+
+    threads = [threading.Thread(target=consume)]
+    threads += [threading.Thread(target=produce, args=(op,)) for op in range(1, producers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(60)
+        assert not thread.is_alive()
+
+    # Each producer's commands arrive complete and in order
+    for op in range(1, producers + 1):
+        sequence = [a | (b << 15) for o, a, b in got if o == op]
+        assert sequence == list(range(per_producer))
+    assert len(got) == per_producer * producers
+    assert 1 <= queue.max_depth <= queue.capacity
+    assert len(queue) == 0
+
+
+def test_put_blocks_while_full():
+    queue = CommandQueue(4)
+    for i in range(4):
+        queue.put(OP_MENU, i)
+    blocked = threading.Thread(target=queue.put, args=(OP_PRESENT, 99))
+    blocked.start()
+    blocked.join(0.05)
+    assert blocked.is_alive()
+    assert len(queue) == 4
+
+    out = array('h', [0, 0, 0])
+    assert queue.get(out)
+    assert tuple(out) == (OP_MENU, 0, 0)
+    blocked.join(1)
+    assert not blocked.is_alive()
+    assert drain(queue) == [(OP_MENU, 1, 0), (OP_MENU, 2, 0), (OP_MENU, 3, 0), (OP_PRESENT, 99, 0)]
+
+
+def test_put_after_close_raises():
+    queue = CommandQueue(2)
+    queue.put(OP_PRESENT)
+    queue.put(OP_PRESENT)
+    errors = []
+
+    def put():
+        try:
+            queue.put(OP_PRESENT)
+        except RuntimeError as e:
+            errors.append(e)
+
+    # A put waiting on a full queue gives up once the consumer has exited
+    blocked = threading.Thread(target=put)
+    blocked.start()
+    blocked.join(0.05)
+    assert blocked.is_alive()
+    queue.closed = True
+    blocked.join(1)
+    assert not blocked.is_alive()
+    assert len(errors) == 1
+
+    with pytest.raises(RuntimeError):
+        queue.put(OP_PRESENT)
+
+
+class RecordingGraphics:
+    background = None
+    pool = None
+
+    def __init__(self):
+        self.calls = []
+
+    def present(self):
+        self.calls.append("present")
+
+    def update_menu_selection(self, old_selection, new_selection):
+        self.calls.append(("menu", new_selection))
+
+
+def test_worker_runs_commands_then_rejects_after_stop():
+    graphics = RecordingGraphics()
+    worker = RenderWorker(graphics, None, 4)
+    client = RenderClient(worker)
+    worker.start()
+    for i in range(50):
+        client.update_menu_selection(None, i % 3 if i % 5 else None)
+        client.present()
+    worker.stop()
+
+    expected = []
+    for i in range(50):
+        expected += [("menu", i % 3 if i % 5 else None), "present"]
+    assert graphics.calls == expected
+    assert worker.commands == 100
+    with pytest.raises(RuntimeError):
+        client.present()
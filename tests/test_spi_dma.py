@@ -0,0 +1,215 @@
+# DMA pushes with HostDMA(auto_complete=False): transfers only finish when
+# the test (or a helper thread standing in for the DMA engine) completes
+# them, so ownership and ordering rules are observable.
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+import config
+import kernels
+import spi_dma
+import ssd1351
+from compositor import BufferPool, Compositor, Layer
+from spi_dma import HostDMA, SpiDma
+
+
+class FakePin:
+    OUT = 1
+
+    def __init__(self):
+        self.v = 1
+
+    def init(self, mode, value=0):
+        self.v = value
+
+    def __call__(self, value):
+        self.v = value
+
+
+class FakeSPI:
+    """Records (dc, bytes) per write; CS must be low and no DMA in flight."""
+
+    def __init__(self, cs, dc):
+        self.cs = cs
+        self.dc = dc
+        self.dma = None
+        self.writes = []
+
+    def write(self, buf):
+        assert self.cs.v == 0
+        assert self.dma is None or not self.dma._active
+        self.writes.append((self.dc.v, bytes(buf)))
+
+
+@pytest.fixture
+def display(monkeypatch):
+    monkeypatch.setattr(ssd1351, "sleep", lambda s: None)
+    cs, dc = FakePin(), FakePin()
+    spi = FakeSPI(cs, dc)
+    d = ssd1351.Display(spi, cs, dc, FakePin())
+    host = HostDMA(auto_complete=False)
+    spi.dma = host
+    d.attach_dma(SpiDma(0, dma=host))
+    spi.writes.clear()
+    yield d
+    host.complete()
+    d.dma.close()
+
+
+def completer(host, stop, delay=0.002):
+    """Stand-in DMA engine: finish each transfer a little after it starts."""
+    def run():
+        while not stop.is_set():
+            if host._active:
+                time.sleep(delay)
+                host.complete()
+            else:
+                time.sleep(0)
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_cs_raised_on_completion(display):
+    host = display.dma.dma
+    data = bytearray(b"\x12\x34" * 8)
+    done = []
+    display.block_async(0, 0, 7, 0, data, callback=done.append)
+
+    assert display.dma.busy()
+    assert display.cs.v == 0
+    assert done == []
+    assert host.sent == []
+
+    host.complete()
+    assert display.cs.v == 1
+    assert not display.dma.busy()
+    assert done == [data]
+    assert host.sent == [bytes(data)]
+
+
+def test_sync_writes_wait_for_transfer(display):
+    host = display.dma.dma
+    spi = display.spi
+    display.block_async(0, 0, 3, 0, bytearray(8))
+    before = len(spi.writes)
+
+    for write in (lambda: display.write_cmd(display.DISPLAY_ON),
+                  lambda: display.block(0, 0, 3, 0, bytearray(8))):
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join(0.05)
+        # Still spinning in dma.wait(): nothing sent, CS still owned by the DMA
+        assert thread.is_alive()
+        assert len(spi.writes) == before
+        assert display.cs.v == 0
+
+        host.complete()
+        thread.join(1)
+        assert not thread.is_alive()
+        assert len(spi.writes) > before
+        assert display.cs.v == 1
+
+        display.block_async(0, 0, 3, 0, bytearray(8))
+        before = len(spi.writes)
+
+
+class BandLayer(Layer):
+    """Fills each band it is asked to draw with the next color."""
+
+    def __init__(self):
+        super().__init__()
+        self.colors = []
+
+    def draw(self, buf, x0, y0, w, h):
+        color = 0x1000 + len(self.colors)
+        self.colors.append(color)
+        kernels.fill(buf, w * h * config.BPP, color)
+
+
+def test_owned_bank_not_rewritten(display):
+    host = display.dma.dma
+    rows = 4
+    pool = BufferPool(config.WIDTH * rows * config.BPP, banks=2)
+    comp = Compositor(display, pool, async_push=True)
+    layer = comp.add_layer(BandLayer())
+
+    stop = threading.Event()
+    thread = completer(host, stop)
+    try:
+        comp.invalidate(0, 0, config.WIDTH - 1, rows * 5 - 1)
+        comp.flush()
+        display.wait()
+    finally:
+        stop.set()
+        thread.join()
+
+    # Each band went out as it was composited, even though the next band
+    # reused the other bank and the one after that this bank again
+    assert len(layer.colors) == 5
+    assert len(host.sent) == 5
+    for color, sent in zip(layer.colors, host.sent):
+        assert sent == bytes([color >> 8, color & 0xFF]) * (len(sent) // 2)
+
+
+class FakeMem32:
+    """SPI status/data registers of one PL022; only the stored addresses of
+    the SpiDma under test may be used (a fresh sum would be a new int,
+    which allocates in the device's hard IRQ)."""
+
+    def __init__(self, sr, dr, icr, busy_reads, rx_bytes):
+        self.addresses = (sr, dr, icr)
+        self.busy_reads = busy_reads
+        self.rx = rx_bytes
+        self.cleared = 0
+
+    def _check(self, addr):
+        assert any(addr is a for a in self.addresses)
+        return self.addresses.index(addr)
+
+    def __getitem__(self, addr):
+        reg = self._check(addr)
+        if reg == 0:
+            if self.busy_reads:
+                self.busy_reads -= 1
+                return spi_dma._SR_BSY | spi_dma._SR_RNE
+            return spi_dma._SR_RNE if self.rx else 0
+        assert reg == 1
+        self.rx -= 1
+        return 0xA5
+
+    def __setitem__(self, addr, value):
+        assert self._check(addr) == 2
+        assert value == spi_dma._ICR_RORIC
+        self.cleared += 1
+
+
+def test_irq_drains_spi_with_precomputed_addresses(monkeypatch):
+    host = HostDMA(auto_complete=False)
+    monkeypatch.setitem(sys.modules, "rp2", types.SimpleNamespace(DMA=lambda: host))
+    scheduled = []
+    monkeypatch.setattr(spi_dma, "schedule", lambda func, arg: scheduled.append((func, arg)))
+    sender = SpiDma(1)
+
+    base = spi_dma._SPI_BASE["RP2040"][1]
+    assert (sender._sr, sender._dr, sender._icr) == (
+        base + spi_dma._SSPSR, base + spi_dma._SSPDR, base + spi_dma._SSPICR)
+    mem = FakeMem32(sender._sr, sender._dr, sender._icr, busy_reads=3, rx_bytes=5)
+    monkeypatch.setattr(spi_dma, "mem32", mem)
+
+    cs = FakePin()
+    cs(0)
+    buf = bytearray(16)
+    sender.start(buf, cs, callback=len)
+    assert host._count == 16
+    host.complete()
+
+    assert mem.busy_reads == 0 and mem.rx == 0 and mem.cleared == 1
+    assert cs.v == 1
+    assert not sender.busy()
+    # On the device the callback is scheduled out of the hard IRQ
+    assert scheduled == [(len, buf)]
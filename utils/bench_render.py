@@ -0,0 +1,94 @@
+# bench_render.py
+# Host benchmark for the sprite render path (runs under CPython, no hardware).
+#
+# Usage: python utils/bench_render.py [loops]
+#
+# Times one animation step of config.CURRENT_ANIM (fetching the scaled frame,
+# then compositing and pushing the sprite region) with the pre-scaled frame
+# cache disabled and enabled. Absolute numbers are CPython timings; the ratio
+# is what carries over to the Pico.
+#
+# Also reports the SPI pixel bytes pushed per animation step with and without
+# frame diff rendering.
+
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import config
+from graphics import Graphics
+
+
+class NullDisplay:
+    """Display stand-in that discards pixel pushes."""
+
+    def block(self, x0, y0, x1, y1, data):
+        pass
+
+
+def bench(cache_frames, loops):
+    """Return (frame_ms, present_ms) per animation step."""
+    config.SPRITE_CACHE_FRAMES = cache_frames
+    graphics = Graphics(NullDisplay())
+    graphics.load_assets()
+    graphics.render_initial(show_sprite=False)
+
+    row = config.CURRENT_ANIM
+    frames = config.ANIM_FRAME_COUNTS[row]
+
+    start = time.perf_counter()
+    for _ in range(loops):
+        for frame in range(frames):
+            graphics._scaled_frame(0, row, frame)
+    frame_ms = (time.perf_counter() - start) * 1000 / (loops * frames)
+
+    # Whole sprite region composited and pushed every step
+    diff_render = config.SPRITE_DIFF_RENDER
+    config.SPRITE_DIFF_RENDER = False
+    start = time.perf_counter()
+    for _ in range(loops):
+        for frame in range(frames):
+            graphics.sprite_layer.show(0, row, frame)
+            graphics.present()
+    present_ms = (time.perf_counter() - start) * 1000 / (loops * frames)
+    config.SPRITE_DIFF_RENDER = diff_render
+
+    return frame_ms, present_ms
+
+
+def diff_bytes():
+    """Return {animation: (full bytes, avg diff bytes, avg pushes)} per step."""
+    config.SPRITE_DIFF_RENDER = True
+    graphics = Graphics(NullDisplay())
+    graphics.load_assets()
+    full = config.SPRITE_DISPLAY_W * config.SPRITE_DISPLAY_H * config.BPP
+
+    totals = {}
+    for key, rects in graphics._diffs.items():
+        name = "egg" if key >> 12 else "anim %d" % ((key >> 8) & 0xF)
+        pushed = 0
+        for i in range(0, len(rects), 4):
+            pushed += (rects[i + 2] - rects[i] + 1) * (rects[i + 3] - rects[i + 1] + 1) * config.BPP
+        steps, nbytes, pushes = totals.get(name, (0, 0, 0))
+        totals[name] = (steps + 1, nbytes + pushed, pushes + len(rects) // 4)
+
+    return {name: (full, nbytes / steps, pushes / steps)
+            for name, (steps, nbytes, pushes) in sorted(totals.items())}
+
+
+if __name__ == "__main__":
+    loops = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    os.chdir(os.path.join(ROOT, "assets"))
+
+    print("%-22s %10s %12s" % ("mode", "frame ms", "present ms"))
+    for label, frames in (("cache off", 0), ("cache on", config.SPRITE_CACHE_FRAMES)):
+        frame_ms, present_ms = bench(frames, loops)
+        print("%-22s %10.3f %12.3f" % (label, frame_ms, present_ms))
+
+    print()
+    print("%-22s %10s %12s %8s" % ("SPI bytes/step", "full", "diff", "pushes"))
+    for name, (full, nbytes, pushes) in diff_bytes().items():
+        print("%-22s %10d %12.0f %8.1f" % (name, full, nbytes, pushes))
@@ -0,0 +1,343 @@
+# bounce_sim.py
+# Host model of the button debounce engines (runs under CPython).
+#
+# Usage: python utils/bounce_sim.py [--presses 1000] [--seed 1] [--bounce-ms 5]
+#            [--debounce-ms DEBOUNCE_MS] [--check timer,pio] [--trace file.csv ...]
+#
+# Replays button bounce traces through src/debounce.py unchanged, once per
+# engine, the way src/input.py drives it:
+#   edge  - EdgeDebouncer called at every transition (the pin IRQ), reading
+#           the pin ISR_LATENCY_US later, plus Input's resync once the
+#           DEBOUNCE_MS lockout of a mismatched level is over
+#   timer - ShiftDebouncer fed every DEBOUNCE_SAMPLE_MS (the machine.Timer)
+#   pio   - src/pio_buttons.py's PIO program, assembled from the same source
+#           and run cycle by cycle by a small interpreter of the instructions
+#           it uses, at the state machine frequency PioButtons picks; its
+#           reports go through pio_buttons.report as on the device
+#
+# A trace is one active-low pin's transitions as (t_us, pin) pairs; a
+# recorded one (e.g. a logic analyser export) is a CSV of "t_us,pin" lines,
+# starting and ending released. Without --trace, --presses presses are
+# generated: every edge chatters for up to --bounce-ms before settling, and
+# holds and gaps are random between 40 and 400 ms.
+#
+# The real presses are the levels that stay put for SETTLE_MS. Each engine
+# must report exactly one press and one release per real press; the script
+# prints misses, extras, detection delay from the first edge, and how many
+# times the engine's interrupt handler ran.
+#
+# The edge engine cannot see a press that starts within DEBOUNCE_MS of the
+# previous accepted edge, so with the default 100 ms lockout it misses the
+# fastest generated taps; --debounce-ms tries a shorter lockout. Every
+# engine is reported, but only those listed in --check (timer and pio by
+# default) make the script exit non-zero when they fail.
+
+import os
+import sys
+import random
+from types import FunctionType
+from bisect import bisect_right
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import config
+from clock import TICKS_PERIOD
+from debounce import EdgeDebouncer, ShiftDebouncer
+import pio_buttons
+
+SETTLE_MS = 10          # A level held this long is a real press/release
+ISR_LATENCY_US = 10     # Edge to pin read in the IRQ handler
+_MASK = TICKS_PERIOD - 1
+
+
+def generate(presses, seed, bounce_ms):
+    """Random trace of presses with contact bounce on both edges."""
+    rng = random.Random(seed)
+    trace = []
+    t = 100_000
+    for _ in range(presses):
+        for settled in (0, 1):  # Press (pin low), then release
+            end = t + rng.randint(0, bounce_ms * 1000)
+            level = settled
+            while t < end:
+                level ^= 1
+                trace.append((t, level))
+                t += rng.randint(20, 1000)
+            if level != settled:
+                trace.append((t, settled))
+            t += rng.randint(40, 400) * 1000
+    return trace
+
+
+def load(path):
+    """Read a recorded trace: CSV lines of t_us,pin (a header is skipped)."""
+    trace = []
+    with open(path) as f:
+        for line in f:
+            fields = line.split(",")
+            if len(fields) < 2 or not fields[0].strip().isdigit():
+                continue
+            trace.append((int(fields[0]), int(fields[1])))
+    return trace
+
+
+def real_presses(trace):
+    """Return (press starts, release starts) in us from settled levels.
+
+    A press starts at the first edge after a settled release that leads to
+    a settled low level, and the other way round for a release.
+    """
+    settle_us = SETTLE_MS * 1000
+    starts = ([], [])   # [0] = releases, [1] = presses
+    settled = 1         # Released (pin high)
+    first = None        # First edge since the settled level
+    for i, (t, pin) in enumerate(trace):
+        if first is None and pin != settled:
+            first = t
+        nxt = trace[i + 1][0] if i + 1 < len(trace) else t + settle_us
+        if pin != settled and nxt - t >= settle_us:
+            starts[1 if pin == 0 else 0].append(first)
+            settled = pin
+            first = None
+        elif pin == settled and nxt - t >= settle_us:
+            first = None
+    return starts[1], starts[0]
+
+
+def pin_at(trace, times, t):
+    """Pin level at time t."""
+    i = bisect_right(times, t) - 1
+    return trace[i][1] if i >= 0 else 1
+
+
+class Recorder:
+    """Event sink for a debouncer: keeps (edge, decision time)."""
+
+    def __init__(self):
+        self.events = []
+        self.now = 0
+
+    def push(self, idx, edge, t):
+        self.events.append((edge, self.now))
+        return True
+
+
+def run_edge(trace):
+    """Edge engine: returns (events, handler calls)."""
+    rec = Recorder()
+    deb = EdgeDebouncer(1, config.DEBOUNCE_MS, rec.push)
+    times = [t for t, _ in trace]
+    end = trace[-1][0] + 1_000_000
+    calls = 0
+    i = 0
+    # 1 ms steps for the resync; each transition is handled at its own time
+    for ms in range(0, end // 1000):
+        while i < len(trace) and trace[i][0] < (ms + 1) * 1000:
+            t = trace[i][0] + ISR_LATENCY_US
+            rec.now = t
+            level = 1 if pin_at(trace, times, t) == 0 else 0
+            deb.edge(0, level, (t // 1000) & _MASK, t & _MASK)
+            calls += 1
+            i += 1
+        t = (ms + 1) * 1000
+        level = 1 if pin_at(trace, times, t) == 0 else 0
+        if level != deb.level[0] and ms + 1 - deb.last_edge[0] > config.DEBOUNCE_MS:
+            rec.now = t
+            deb.edge(0, level, (ms + 1) & _MASK, t & _MASK)
+    return rec.events, calls
+
+
+def run_timer(trace):
+    """Timer engine: returns (events, handler calls)."""
+    rec = Recorder()
+    period_us = config.DEBOUNCE_SAMPLE_MS * 1000
+    deb = ShiftDebouncer(1, config.DEBOUNCE_SAMPLES, period_us, rec.push)
+    times = [t for t, _ in trace]
+    end = trace[-1][0] + 1_000_000
+    calls = 0
+    for t in range(0, end, period_us):
+        rec.now = t
+        deb.sample(0, 1 if pin_at(trace, times, t) == 0 else 0, t & _MASK)
+        calls += 1
+    return rec.events, calls
+
+
+class PioProgram:
+    """A PIO program assembled from its rp2.asm_pio source function.
+
+    The function is run with the assembler's names bound to recorders, the
+    way rp2.asm_pio runs it, giving a list of [op, args, delay].
+    """
+
+    def __init__(self, source):
+        self.code = []
+        self.labels = {}
+        self.wrap_target = 0
+        self.wrap = None
+        names = {name: name for name in (
+            "x", "y", "isr", "osr", "null", "pins", "x_not_y", "not_osre", "block")}
+        names.update(
+            label=lambda name: self.labels.__setitem__(name, len(self.code)),
+            wrap_target=lambda: setattr(self, "wrap_target", len(self.code)),
+            wrap=lambda: setattr(self, "wrap", len(self.code) - 1),
+            rel=lambda n: n,
+        )
+        for op in ("mov", "in_", "out", "jmp", "push", "irq"):
+            names[op] = self._emitter(op)
+        FunctionType(source.__code__, names)()
+        if self.wrap is None:
+            self.wrap = len(self.code) - 1
+
+    def _emitter(self, op):
+        program = self
+
+        class Instr(list):
+            def __getitem__(self, delay):
+                self[2] = delay     # instr() [delay]
+                return self
+
+        def emit(*args):
+            instr = Instr([op, args, 0])
+            program.code.append(instr)
+            return instr
+        return emit
+
+
+def run_pio(trace):
+    """PIO engine: returns (events, handler calls)."""
+    prog = PioProgram(pio_buttons.debounce_program)
+    rec = Recorder()
+    level = bytearray(3)
+    freq, pull_thresh, lag_us = pio_buttons.timing()
+    cycle_us = 1e6 / freq
+    times = [t for t, _ in trace]
+    end = trace[-1][0] + 1_000_000
+
+    reg = {"x": 0, "y": 0, "isr": 0, "osr": 0, "null": 0}
+    osr_count = 0
+    fifo = []
+    calls = 0
+    pc = 0
+    cycles = 0
+    while cycles * cycle_us < end:
+        t = int(cycles * cycle_us)
+        op, args, delay = prog.code[pc]
+        cycles += 1 + delay
+        nxt = prog.wrap_target if pc == prog.wrap else pc + 1
+        if op == "mov":
+            reg[args[0]] = reg[args[1]]
+            if args[0] == "osr":
+                osr_count = 0       # Refilled: shift count back to 0
+        elif op == "in_":
+            # Button A on the first pin, B and C released
+            pins = 0b110 | pin_at(trace, times, t)
+            reg["isr"] = ((reg["isr"] << args[1]) | (pins & ((1 << args[1]) - 1))) & 0xFFFFFFFF
+        elif op == "out":
+            reg["osr"] >>= args[1]
+            osr_count = min(32, osr_count + args[1])
+        elif op == "jmp":
+            if len(args) == 1:
+                nxt = prog.labels[args[0]]
+            elif args[0] == "x_not_y" and reg["x"] != reg["y"]:
+                nxt = prog.labels[args[1]]
+            elif args[0] == "not_osre" and osr_count < pull_thresh:
+                nxt = prog.labels[args[1]]
+        elif op == "push":
+            fifo.append(reg["isr"])
+            reg["isr"] = 0
+        elif op == "irq":
+            # PioButtons._irq timestamps, drain() reports
+            calls += 1
+            rec.now = t
+            pio_buttons.report(level, fifo.pop(0), t - lag_us, rec.push)
+        pc = nxt
+    return rec.events, calls
+
+
+def score(events, starts):
+    """Match detected edges to real ones.
+
+    Returns:
+        tuple: (missed, extra, delays in us)
+    """
+    detected = [0] * len(starts)
+    delays = []
+    extra = 0
+    for t in events:
+        i = bisect_right(starts, t) - 1
+        if i < 0:
+            extra += 1
+            continue
+        detected[i] += 1
+        if detected[i] == 1:
+            delays.append(t - starts[i])
+        else:
+            extra += 1
+    return detected.count(0), extra, delays
+
+
+def report(name, events, calls, presses, releases):
+    missed_p, extra_p, delay_p = score([t for e, t in events if e == 1], presses)
+    missed_r, extra_r, delay_r = score([t for e, t in events if e == 0], releases)
+    ok = not (missed_p or extra_p or missed_r or extra_r)
+
+    def fmt(delays):
+        if not delays:
+            return "-"
+        return "%.1f/%.1f" % (sum(delays) / len(delays) / 1000, max(delays) / 1000)
+
+    print("%-6s %s  presses %d missed %d extra %d, releases missed %d extra %d, "
+          "delay ms mean/max press %s release %s, %d handler calls (%.1f per press)" % (
+              name, "OK  " if ok else "FAIL", len(presses), missed_p, extra_p, missed_r, extra_r,
+              fmt(delay_p), fmt(delay_r), calls, calls / max(1, len(presses))))
+    return ok
+
+
+ENGINES = {"edge": run_edge, "timer": run_timer, "pio": run_pio}
+
+
+def main(args):
+    opts = {"--presses": 1000, "--seed": 1, "--bounce-ms": 5, "--debounce-ms": config.DEBOUNCE_MS}
+    paths = []
+    check = ("timer", "pio")
+    while args:
+        if len(args) < 2:
+            raise SystemExit("Missing value for " + args[0])
+        if args[0] == "--trace":
+            paths.append(args[1])
+        elif args[0] == "--check":
+            check = tuple(name for name in args[1].split(",") if name)
+            for name in check:
+                if name not in ENGINES:
+                    raise SystemExit("Unknown engine " + name)
+        elif args[0] in opts:
+            opts[args[0]] = int(args[1])
+        else:
+            raise SystemExit("Unknown option " + args[0])
+        args = args[2:]
+    config.DEBOUNCE_MS = opts["--debounce-ms"]
+
+    if paths:
+        traces = [(path, load(path)) for path in paths]
+    else:
+        label = "%d generated presses (seed %d, bounce up to %d ms)" % (
+            opts["--presses"], opts["--seed"], opts["--bounce-ms"])
+        traces = [(label, generate(opts["--presses"], opts["--seed"], opts["--bounce-ms"]))]
+
+    print("edge: DEBOUNCE_MS %d; timer, pio: %d samples every %d ms" % (
+        config.DEBOUNCE_MS, config.DEBOUNCE_SAMPLES, config.DEBOUNCE_SAMPLE_MS))
+    ok = True
+    for label, trace in traces:
+        presses, releases = real_presses(trace)
+        print("%s: %d transitions, %.1f s" % (label, len(trace), trace[-1][0] / 1e6))
+        for name, run in ENGINES.items():
+            events, calls = run(trace)
+            passed = report(name, events, calls, presses, releases)
+            ok = ok and (passed or name not in check)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,11 @@
+# framebuf.py
+# Host stand-in for MicroPython's framebuf module (imported by ssd1351)
+
+RGB565 = 1
+
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, fmt, stride=None):
+        self.buf = buf
+        self.width = width
+        self.height = height
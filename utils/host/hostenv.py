@@ -0,0 +1,29 @@
+# hostenv.py
+# Run the device code under CPython (host tools and tests)
+#
+# Importing this module puts src/, lib/ and this directory on sys.path and
+# adds MicroPython's wrapping time.ticks_* and sleep_ms functions to time.
+# This directory holds stand-ins for the MicroPython-only modules the code
+# imports: machine (pins, SPI, timers, sleep), micropython (const, and
+# viper/native with pointer arguments) and framebuf.
+
+import os
+import sys
+import time
+
+HOST = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HOST))
+
+for _path in (os.path.join(ROOT, "lib"), os.path.join(ROOT, "src"), HOST):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+if not hasattr(time, "ticks_ms"):
+    from clock import SystemClock, TICKS_PERIOD
+
+    _TICKS_MAX = TICKS_PERIOD - 1
+    time.ticks_ms = SystemClock.ticks_ms
+    time.ticks_us = lambda: int(time.monotonic() * 1_000_000) & _TICKS_MAX
+    time.ticks_diff = SystemClock.ticks_diff
+    time.ticks_add = SystemClock.ticks_add
+    time.sleep_ms = lambda ms: time.sleep(ms / 1000)
@@ -0,0 +1,92 @@
+# machine.py
+# Host stand-in for MicroPython's machine module
+#
+# Nothing here runs on its own: a host harness presses buttons with
+# Pin.drive() and fires due timers by calling their callbacks from its own
+# clock (Timer.active lists the running ones). SPI writes are only counted.
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    PULL_UP = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, id=None, mode=None, pull=None, value=1):
+        self.id = id
+        self._value = value
+        self._handler = None
+        self._trigger = 0
+
+    def init(self, mode=None, pull=None, value=None):
+        if value is not None:
+            self._value = value
+
+    def value(self, value=None):
+        if value is None:
+            return self._value
+        self._value = value
+
+    __call__ = value
+
+    def irq(self, handler=None, trigger=IRQ_FALLING | IRQ_RISING, hard=False):
+        self._handler = handler
+        self._trigger = trigger
+
+    def drive(self, value):
+        """Set the input level from outside, running the IRQ handler on a
+        matching edge (host only)."""
+        if value == self._value:
+            return
+        self._value = value
+        edge = Pin.IRQ_RISING if value else Pin.IRQ_FALLING
+        if self._handler is not None and self._trigger & edge:
+            self._handler(self)
+
+
+class SPI:
+    def __init__(self, id=0, **kwargs):
+        self.id = id
+        self.writes = 0
+        self.bytes = 0
+
+    def write(self, buf):
+        self.writes += 1
+        self.bytes += len(buf)
+
+    def deinit(self):
+        pass
+
+
+class Timer:
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    active = []     # Timers started and not yet deinit()ed
+
+    def __init__(self, id=-1, mode=PERIODIC, period=-1, callback=None):
+        self.mode = mode
+        self.period = period
+        self.callback = callback
+        Timer.active.append(self)
+
+    def deinit(self):
+        if self in Timer.active:
+            Timer.active.remove(self)
+
+
+def disable_irq():
+    return 0
+
+
+def enable_irq(state):
+    pass
+
+
+def idle():
+    pass
+
+
+def lightsleep(ms=None):
+    pass
@@ -0,0 +1,56 @@
+# micropython.py
+# Host stand-in for MicroPython's micropython module
+#
+# viper and native leave functions as Python. Arguments annotated ptr8,
+# ptr16 or ptr32 are passed as memoryview casts of the buffer, so
+# kernels_viper.py runs unchanged and indexes memory as viper does:
+# native-endian 8/16/32-bit elements, written in place.
+
+import builtins
+
+
+def const(value):
+    return value
+
+
+def _pointer(fmt):
+    def cast(buf):
+        view = memoryview(buf)
+        if view.format != "B":
+            view = view.cast("B")
+        return view.cast(fmt)
+    return cast
+
+
+ptr8 = _pointer("B")
+ptr16 = _pointer("H")
+ptr32 = _pointer("i")
+_POINTERS = (ptr8, ptr16, ptr32)
+
+# Viper annotations are evaluated when the kernels are defined
+builtins.ptr8 = ptr8
+builtins.ptr16 = ptr16
+builtins.ptr32 = ptr32
+
+
+def viper(func):
+    names = func.__code__.co_varnames[:func.__code__.co_argcount]
+    casts = [(i, func.__annotations__[name]) for i, name in enumerate(names)
+             if func.__annotations__.get(name) in _POINTERS]
+
+    def wrapper(*args):
+        args = list(args)
+        for i, cast in casts:
+            args[i] = cast(args[i])
+        return func(*args)
+
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+
+def native(func):
+    return func
+
+
+def schedule(func, arg):
+    func(arg)
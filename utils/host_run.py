@@ -0,0 +1,169 @@
+# host_run.py
+# Headless run of the asyncio runtime on the host stand-ins (runs under CPython).
+#
+# Usage: python utils/host_run.py [--seconds 3] [--tick-ms 50] [--set NAME=VALUE ...]
+#
+# Builds the real Game (src/ unchanged) on the machine, micropython and
+# framebuf stand-ins in utils/host, with config.RUNTIME = "async", and runs
+# AsyncRuntime for --seconds of real time with a short GAME_TICK_MS. The
+# machine.Timers the game starts (button sampling) are fired from the event
+# loop, and a script of button presses goes through the pin IRQ handlers:
+# A + C to start an egg, which hatches after EGG_HATCH_TICKS, then A to move
+# the menu selection.
+#
+# Checks that the tick task kept up with real time and that tick_count
+# matches the ticks consumed, that the input, tick and render tasks all did
+# their part (egg started and hatched, menu moved, frames pushed over SPI),
+# and exits non-zero if any check fails.
+#
+# --set overrides config values for the run (e.g. --set DEBOUNCE_MODE='"edge"').
+
+import os
+import sys
+import time
+from ast import literal_eval
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "utils", "host"))
+
+import hostenv  # noqa: F401,E402 (sys.path, time.ticks_*)
+import asyncio  # noqa: E402
+import machine  # noqa: E402
+import config  # noqa: E402
+
+# (seconds from start, button, level): 0 = pressed (pins are active-low)
+PRESSES = (
+    (0.20, 0, 0), (0.25, 2, 0), (0.45, 0, 1), (0.45, 2, 1),    # A + C: start
+    (1.50, 0, 0), (1.70, 0, 1),                                # A: menu next
+)
+
+
+def drive_timers(loop):
+    """Fire each running machine.Timer every period ms from the event loop."""
+    due = {}
+
+    def step():
+        now = time.ticks_ms()
+        for timer in list(machine.Timer.active):
+            deadline = due.setdefault(timer, time.ticks_add(now, timer.period))
+            if time.ticks_diff(now, deadline) >= 0:
+                due[timer] = time.ticks_add(deadline, timer.period)
+                timer.callback(timer)
+        loop.call_later(0.001, step)
+
+    step()
+
+
+def run(seconds=3.0, tick_ms=50, overrides=None):
+    """Run the game headless and check it.
+
+    Returns:
+        list: Failed checks (empty = all passed)
+    """
+    settings = {
+        "RUNTIME": "async",
+        "GAME_TICK_MS": tick_ms,
+        "EGG_HATCH_TICKS": 5,
+        "SCREEN_TIMEOUT_MS": int(seconds * 1000) + 10_000,
+    }
+    settings.update(overrides or {})
+    saved = {name: getattr(config, name) for name in settings}
+    cwd = os.getcwd()
+    for name, value in settings.items():
+        setattr(config, name, value)
+    os.chdir(os.path.join(ROOT, "assets"))
+    try:
+        return _run(seconds)
+    finally:
+        os.chdir(cwd)
+        for name, value in saved.items():
+            setattr(config, name, value)
+
+
+def _run(seconds):
+    import game as game_module
+
+    game = game_module.Game()
+    game.init()
+    runtime = game.runtime
+    pins = game.hardware.get_buttons()
+    first_tick = game.state.last_tick_time
+    phases = []
+    main = runtime._main
+
+    async def scripted():
+        loop = asyncio.get_running_loop()
+        drive_timers(loop)
+        for at, button, level in PRESSES:
+            loop.call_later(at, pins[button].drive, level)
+        loop.call_later(seconds, game.stop)
+
+        def watch():
+            if not phases or phases[-1] != game.state.phase:
+                phases.append(game.state.phase)
+            if game.running:
+                loop.call_later(0.01, watch)
+        loop.call_later(0.01, watch)
+        await main()
+
+    runtime._main = scripted
+    start = time.ticks_ms()
+    try:
+        game.run()
+    finally:
+        game.cleanup()
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+
+    state = game.state
+    consumed = time.ticks_diff(state.last_tick_time, first_tick) // config.GAME_TICK_MS
+    expected = elapsed // config.GAME_TICK_MS
+    print(f"{elapsed} ms: {state.tick_count} ticks (expected ~{expected}), "
+          f"{runtime.renders} renders, {game.hardware.spi.bytes} SPI bytes, phases {phases}, "
+          f"menu {state.menu.selected}")
+
+    failures = []
+
+    def check(ok, message):
+        if not ok:
+            failures.append(message)
+
+    check(state.tick_count == consumed,
+          f"tick_count {state.tick_count} != {consumed} ticks consumed")
+    check(expected - 2 <= state.tick_count <= expected,
+          f"tick task fell behind: {state.tick_count} ticks in {elapsed} ms")
+    check(config.PHASE_EGG in phases, "A + C did not start an egg")
+    check(state.phase == config.PHASE_ALIVE, f"egg did not hatch (phase {state.phase})")
+    check(state.menu.selected is not None, "A did not move the menu selection")
+    check(runtime.renders >= len(phases), f"only {runtime.renders} renders")
+    check(game.hardware.spi.bytes > 0, "nothing was sent to the display")
+    check(not machine.Timer.active, "a machine.Timer is still running after cleanup")
+    return failures
+
+
+def main(args):
+    opts = {"--seconds": 3.0, "--tick-ms": 50}
+    overrides = {}
+    while args:
+        if len(args) < 2:
+            raise SystemExit("Missing value for " + args[0])
+        if args[0] == "--set":
+            name, _, value = args[1].partition("=")
+            if not hasattr(config, name):
+                raise SystemExit("Unknown config value " + name)
+            overrides[name] = literal_eval(value)
+        elif args[0] in opts:
+            opts[args[0]] = type(opts[args[0]])(args[1])
+        else:
+            raise SystemExit("Unknown option " + args[0])
+        args = args[2:]
+
+    failures = run(opts["--seconds"], opts["--tick-ms"], overrides)
+    for message in failures:
+        print("FAIL:", message)
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""Utility to delta-encode a sequence of full-screen RGB565 frames.
+
+Takes the .raw frames written by gif2rgb565.py (e.g. assets/water_gif) and
+writes one .dlt animation: a keyframe, then for every following frame only
+the rectangles that changed since the previous one, with their pixels. A
+final loop record takes the last frame back to the first. See
+src/delta_anim.py for the device-side decoder.
+
+Changed pixels are found on a grid of tiles; runs of changed tiles in a tile
+row become one rect, and rects with the same columns in consecutive tile rows
+are joined. Rects (and keyframes) are split into row bands of at most
+--max-rect bytes, which is the decoder's only buffer.
+
+File layout (all integers big-endian):
+    b'DLT1'
+    u16 width, u16 height, u16 frame_count, u16 reserved (0)
+    u32 max_rect_bytes
+    u32 index[frame_count + 1]  # record offset from start of file; bit 31 set
+                                # for keyframes. Record frame_count is the loop
+                                # delta (last frame -> frame 0).
+    per record:
+        u16 rect_count
+        per rect: u8 x0, u8 y0, u8 x1, u8 y1 (inclusive), then the rect's
+            pixels row by row
+"""
+
+from struct import pack
+from os import path
+import sys
+
+# SSD1351 window setup per push: SET_COLUMN + 2 args, SET_ROW + 2 args, WRITE_RAM
+BLOCK_CMD_BYTES = 7
+
+KEYFRAME = 0x80000000
+
+
+def error(msg):
+    """Display error and exit."""
+    print(msg)
+    sys.exit(-1)
+
+
+def changed_rects(prev, cur, width, height, tile):
+    """Return inclusive (x0, y0, x1, y1) rects covering every changed pixel."""
+    tiles_x = (width + tile - 1) // tile
+    rects = []
+    open_rects = {}     # (tx0, tx1) -> index in rects, for the previous tile row
+
+    for ty in range(0, height, tile):
+        y1 = min(ty + tile, height) - 1
+        changed = [False] * tiles_x
+        for y in range(ty, y1 + 1):
+            row = y * width * 2
+            for t in range(tiles_x):
+                if changed[t]:
+                    continue
+                a = row + t * tile * 2
+                b = row + min((t + 1) * tile, width) * 2
+                if prev[a:b] != cur[a:b]:
+                    changed[t] = True
+
+        still_open = {}
+        t = 0
+        while t < tiles_x:
+            if not changed[t]:
+                t += 1
+                continue
+            t0 = t
+            while t < tiles_x and changed[t]:
+                t += 1
+            run = (t0, t - 1)
+            if run in open_rects:
+                i = open_rects[run]
+                x0, y0, x1, _ = rects[i]
+                rects[i] = (x0, y0, x1, y1)
+            else:
+                i = len(rects)
+                rects.append((t0 * tile, ty, min(t * tile, width) - 1, y1))
+            still_open[run] = i
+        open_rects = still_open
+    return rects
+
+
+def split_rect(rect, max_bytes):
+    """Split a rect into row bands of at most max_bytes of pixels."""
+    x0, y0, x1, y1 = rect
+    rows = max(1, max_bytes // ((x1 - x0 + 1) * 2))
+    return [(x0, y, x1, min(y + rows, y1 + 1) - 1) for y in range(y0, y1 + 1, rows)]
+
+
+def encode_record(frame, width, rects, max_bytes):
+    """Encode one record; returns (bytes, SPI bytes to push it, pushes)."""
+    out = bytearray()
+    spi = 0
+    count = 0
+    for rect in rects:
+        for x0, y0, x1, y1 in split_rect(rect, max_bytes):
+            out += pack('>4B', x0, y0, x1, y1)
+            for y in range(y0, y1 + 1):
+                out += frame[(y * width + x0) * 2:(y * width + x1 + 1) * 2]
+            spi += (x1 - x0 + 1) * (y1 - y0 + 1) * 2 + BLOCK_CMD_BYTES
+            count += 1
+    return pack('>H', count) + out, spi, count
+
+
+def encode(frames, width, height, tile=4, key_interval=0, max_bytes=4096):
+    """Encode frames; returns (file contents, [(SPI bytes, pushes)] per delta record)."""
+    full = [(0, 0, width - 1, height - 1)]
+    records = []
+    spi = []
+    for i, frame in enumerate(frames + [frames[0]]):
+        is_key = i == 0 or (key_interval and i < len(frames) and i % key_interval == 0)
+        rects = full if is_key else changed_rects(frames[i - 1], frame, width, height, tile)
+        data, nbytes, pushes = encode_record(frame, width, rects, max_bytes)
+        records.append((is_key, data))
+        if i > 0:
+            spi.append((nbytes, pushes))
+
+    header = b'DLT1' + pack('>4HI', width, height, len(frames), 0, max_bytes)
+    offset = len(header) + len(records) * 4
+    index = bytearray()
+    body = bytearray()
+    for is_key, data in records:
+        index += pack('>I', (offset + len(body)) | (KEYFRAME if is_key else 0))
+        body += data
+    return header + index + body, spi
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    opts = {'--tile': 4, '--key': 0, '--max-rect': 4096, '--size': 128}
+    while args and args[0] in opts:
+        if len(args) < 2:
+            error('Missing value for ' + args[0])
+        opts[args[0]] = int(args[1])
+        args = args[2:]
+    if len(args) < 3:
+        error('Usage: ./raw2delta.py [--tile 4] [--key N] [--max-rect 4096] [--size 128] '
+              'out.dlt frame_00.raw frame_01.raw ...')
+
+    size = opts['--size']
+    if size > 256:
+        error('Frames must be at most 256 pixels on a side')
+    if opts['--max-rect'] < size * 2:
+        error('--max-rect must hold at least one full row (%d bytes)' % (size * 2))
+
+    out_path = args[0]
+    frames = []
+    for in_path in args[1:]:
+        if not path.exists(in_path):
+            error('File Not Found: ' + in_path)
+        with open(in_path, 'rb') as f:
+            data = f.read()
+        if len(data) != size * size * 2:
+            error('Unexpected size for %s: %d' % (in_path, len(data)))
+        frames.append(data)
+
+    dlt, spi = encode(frames, size, size, opts['--tile'], opts['--key'], opts['--max-rect'])
+    with open(out_path, 'wb') as f:
+        f.write(dlt)
+
+    raw_bytes = len(frames) * size * size * 2
+    full_spi = size * size * 2 + BLOCK_CMD_BYTES
+    print('Saved: %s (%d frames, %d -> %d bytes, %.1f%%)' % (
+        out_path, len(frames), raw_bytes, len(dlt), 100.0 * len(dlt) / raw_bytes))
+    avg = sum(n for n, _ in spi) / len(spi)
+    print('SPI bytes/frame: avg %d, max %d (full frame %d, %.1f%%), %.1f pushes/frame' % (
+        avg, max(n for n, _ in spi), full_spi, 100.0 * avg / full_spi,
+        sum(p for _, p in spi) / len(spi)))
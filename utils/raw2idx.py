@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Utility to convert a raw RGB565 sprite sheet to a palette-indexed sheet.
+
+Pixels are stored as 4-bit (or 8-bit) indices into an RGB565 palette. Index
+0 is reserved for transparency (the magenta key), so blitters test one small
+integer instead of a 16-bit color. If the whole sheet does not fit in one
+16-entry palette, a separate palette bank per frame row is tried before
+falling back to 8 bits per pixel. See src/sprites.py for the device-side
+reader.
+
+File layout (all integers big-endian):
+    b'IDX1'
+    u16 sheet_w, u16 sheet_h, u16 frame_w, u16 frame_h
+    u8 bpp (4 or 8), u8 banks (1, or one per frame row)
+    banks * (1 << bpp) u16 RGB565 palette entries (entry 0 unused)
+    sheet_h rows of sheet_w * bpp / 8 bytes (4 bpp: high nibble first)
+"""
+
+from struct import pack
+from os import path
+import sys
+
+TRANSPARENT_KEY = 0xF81F
+
+
+def error(msg):
+    """Display error and exit."""
+    print(msg)
+    sys.exit(-1)
+
+
+def read_pixels(data, sheet_w, sheet_h):
+    """Return rows of RGB565 values."""
+    return [[data[(y * sheet_w + x) * 2] << 8 | data[(y * sheet_w + x) * 2 + 1]
+             for x in range(sheet_w)] for y in range(sheet_h)]
+
+
+def build_palette(rows):
+    """Return [TRANSPARENT_KEY] + sorted opaque colors used in rows."""
+    colors = set()
+    for row in rows:
+        colors.update(row)
+    colors.discard(TRANSPARENT_KEY)
+    return [TRANSPARENT_KEY] + sorted(colors)
+
+
+def choose_layout(pixels, frame_h, bpp=None):
+    """Pick (bpp, palettes) for the sheet; one palette per bank."""
+    sheet_pal = build_palette(pixels)
+    if bpp in (None, 4) and len(sheet_pal) <= 16:
+        return 4, [sheet_pal]
+
+    if bpp in (None, 4):
+        banks = [build_palette(pixels[y:y + frame_h])
+                 for y in range(0, len(pixels), frame_h)]
+        if all(len(pal) <= 16 for pal in banks):
+            return 4, banks
+        if bpp == 4:
+            error('Too many colors for 4 bpp, even with a palette per frame row')
+
+    if len(sheet_pal) > 256:
+        error('Too many colors for 8 bpp: %d' % len(sheet_pal))
+    return 8, [sheet_pal]
+
+
+def encode_sheet(data, sheet_w, sheet_h, frame_w, frame_h, bpp=None):
+    """Encode a whole sheet; returns the indexed file contents."""
+    pixels = read_pixels(data, sheet_w, sheet_h)
+    bpp, palettes = choose_layout(pixels, frame_h, bpp)
+    entries = 1 << bpp
+
+    out = bytearray(b'IDX1')
+    out += pack('>4H2B', sheet_w, sheet_h, frame_w, frame_h, bpp, len(palettes))
+    for pal in palettes:
+        out += pack('>%dH' % entries, *(pal + [0] * (entries - len(pal))))
+
+    for y, row in enumerate(pixels):
+        pal = palettes[y // frame_h if len(palettes) > 1 else 0]
+        lookup = {color: i for i, color in enumerate(pal)}
+        indices = [lookup[color] for color in row]
+        if bpp == 4:
+            for x in range(0, sheet_w, 2):
+                out.append(indices[x] << 4 | indices[x + 1])
+        else:
+            out += bytes(indices)
+    return out, bpp, len(palettes)
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) not in (6, 7):
+        error('Usage: ./raw2idx.py sheet.raw sheet_w sheet_h frame_w frame_h [4|8]')
+    in_path = args[1]
+    if not path.exists(in_path):
+        error('File Not Found: ' + in_path)
+    sheet_w, sheet_h, frame_w, frame_h = (int(a) for a in args[2:6])
+    bpp = int(args[6]) if len(args) == 7 else None
+    if bpp not in (None, 4, 8):
+        error('Bits per pixel must be 4 or 8')
+    if sheet_w % 2:
+        error('Sheet width must be even')
+
+    with open(in_path, 'rb') as f:
+        data = f.read()
+    if len(data) != sheet_w * sheet_h * 2:
+        error('Unexpected size for %s: %d' % (in_path, len(data)))
+
+    filename, ext = path.splitext(in_path)
+    out_path = filename + '.idx'
+    idx, bpp, banks = encode_sheet(data, sheet_w, sheet_h, frame_w, frame_h, bpp)
+    with open(out_path, 'wb') as f:
+        f.write(idx)
+    print('Saved: %s (%d bpp, %d palette bank(s), %d -> %d bytes, %.1f%%)' % (
+        out_path, bpp, banks, len(data), len(idx), 100.0 * len(idx) / len(data)))
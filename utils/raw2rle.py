@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Utility to convert a raw RGB565 sprite sheet to the RLE sprite format.
+
+Only opaque pixels are stored: each frame row is a list of spans of
+(skip, length, pixels), where pixels equal to the magenta transparency key
+(0xF81F) are dropped. See src/sprites.py for the device-side reader.
+
+File layout (all integers big-endian):
+    b'RLE1'
+    u16 frame_w, u16 frame_h, u16 cols, u16 rows
+    u32 offset[cols * rows]   # frame start, from start of file, row-major
+    per frame, per row:
+        u8 span_count
+        per span: u8 skip, u8 length, length * u16 RGB565 pixels
+    skip counts pixels from the end of the previous span (or the row start).
+"""
+
+from struct import pack
+from os import path
+import sys
+
+TRANSPARENT_KEY = 0xF81F
+
+
+def error(msg):
+    """Display error and exit."""
+    print(msg)
+    sys.exit(-1)
+
+
+def encode_frame(data, sheet_w, x0, y0, w, h):
+    """Encode one w x h frame at (x0, y0) of a raw sheet."""
+    out = bytearray()
+    for y in range(y0, y0 + h):
+        spans = []
+        x = 0
+        while x < w:
+            i = ((y * sheet_w) + x0 + x) * 2
+            if (data[i] << 8 | data[i + 1]) == TRANSPARENT_KEY:
+                x += 1
+                continue
+            start = x
+            while x < w:
+                i = ((y * sheet_w) + x0 + x) * 2
+                if (data[i] << 8 | data[i + 1]) == TRANSPARENT_KEY:
+                    break
+                x += 1
+            spans.append((start, x))
+
+        out.append(len(spans))
+        prev_end = 0
+        for start, end in spans:
+            out.append(start - prev_end)
+            out.append(end - start)
+            i = ((y * sheet_w) + x0 + start) * 2
+            out += data[i:i + (end - start) * 2]
+            prev_end = end
+    return out
+
+
+def encode_sheet(data, sheet_w, sheet_h, frame_w, frame_h):
+    """Encode a whole sheet; returns the RLE file contents."""
+    cols = sheet_w // frame_w
+    rows = sheet_h // frame_h
+    header = b'RLE1' + pack('>4H', frame_w, frame_h, cols, rows)
+    offset = len(header) + cols * rows * 4
+
+    offsets = []
+    frames = bytearray()
+    for row in range(rows):
+        for col in range(cols):
+            offsets.append(offset + len(frames))
+            frames += encode_frame(data, sheet_w, col * frame_w, row * frame_h,
+                                   frame_w, frame_h)
+    return header + pack('>%dI' % len(offsets), *offsets) + frames
+
+
+if __name__ == '__main__':
+    args = sys.argv
+    if len(args) != 6:
+        error('Usage: ./raw2rle.py sheet.raw sheet_w sheet_h frame_w frame_h')
+    in_path = args[1]
+    if not path.exists(in_path):
+        error('File Not Found: ' + in_path)
+    sheet_w, sheet_h, frame_w, frame_h = (int(a) for a in args[2:])
+    if frame_w > 255:
+        error('Frame width must be at most 255 pixels')
+
+    with open(in_path, 'rb') as f:
+        data = f.read()
+    if len(data) != sheet_w * sheet_h * 2:
+        error('Unexpected size for %s: %d' % (in_path, len(data)))
+
+    filename, ext = path.splitext(in_path)
+    out_path = filename + '.rle'
+    rle = encode_sheet(data, sheet_w, sheet_h, frame_w, frame_h)
+    with open(out_path, 'wb') as f:
+        f.write(rle)
+    print('Saved: %s (%d -> %d bytes, %.1f%%)' % (
+        out_path, len(data), len(rle), 100.0 * len(rle) / len(data)))
@@ -0,0 +1,173 @@
+# simulate.py
+# Headless fast-forward simulation of pet lifecycles (runs under CPython).
+#
+# Usage: python utils/simulate.py [--lifetimes 1000] [--seed 1]
+#            [--policy carer|idle|random] [--every 10] [--set NAME=VALUE ...]
+#
+# Runs src/game_state.py unchanged on a clock.VirtualClock with a seeded RNG.
+# Each lifetime starts an egg, then jumps the clock straight to the next
+# scripted action or phase change; GameState.update(catch_up=True) applies
+# the ticks in between in bulk, so a lifetime costs a handful of updates
+# rather than one per tick. Every --every ticks while the pet is alive, the
+# policy picks menu actions, which go through GameState.handle_menu_action.
+#
+# --set overrides config values for the run (e.g. --set SICK_CHANCE=0.01).
+# Prints lifecycle statistics and the simulated ticks per second.
+
+import os
+import sys
+import time
+import random
+from ast import literal_eval
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import config
+from clock import VirtualClock
+from game_state import GameState
+
+# Menu indices handled by GameState.handle_menu_action
+FEED = 0
+PLAY = 1
+SLEEP = 3
+TRAIN = 6
+HEAL = 7
+
+
+def policy_idle(pet, rng):
+    """Never do anything."""
+    return ()
+
+
+def policy_carer(pet, rng):
+    """Keep hunger and happiness up and heal when sick."""
+    actions = []
+    if pet.is_sick:
+        actions.append(HEAL)
+    if pet.hunger < 50:
+        actions.append(FEED)
+    if pet.happiness < 50:
+        actions.append(PLAY)
+    return actions
+
+
+def policy_random(pet, rng):
+    """Press a random care action half of the time."""
+    if rng.random() < 0.5:
+        return (rng.choice((FEED, PLAY, SLEEP, TRAIN, HEAL)),)
+    return ()
+
+
+POLICIES = {
+    "idle": policy_idle,
+    "carer": policy_carer,
+    "random": policy_random,
+}
+
+
+def run_lifetime(state, clock, policy, every):
+    """Play one egg-to-death lifetime; returns the dead pet's PetStats."""
+    tick_ms = config.GAME_TICK_MS
+    state.start_game()
+    while True:
+        # Next scripted action or phase change, whichever comes first
+        deadline = clock.ticks_add(state.last_tick_time, every * tick_ms)
+        transition = state.next_transition_time()
+        if transition is not None and clock.ticks_diff(transition, deadline) < 0:
+            deadline = transition
+        clock.set(deadline)
+        state.update(catch_up=True)
+
+        if state.phase == config.PHASE_DEAD:
+            pet = state.pet
+            # Let the DEAD -> WAITING tick through so the next egg can start
+            clock.advance(tick_ms)
+            state.update(catch_up=True)
+            return pet
+        if state.phase == config.PHASE_ALIVE:
+            for action in policy(state.pet, state.rng):
+                state.handle_menu_action(action)
+
+
+def simulate(lifetimes, seed=1, policy="carer", every=10):
+    """Run lifetimes in a row on one GameState.
+
+    Returns:
+        tuple: (list of (lifespan ticks, care mistakes, sick ticks) per
+            lifetime, total game ticks simulated)
+    """
+    clock = VirtualClock()
+    state = GameState(clock=clock, rng=random.Random(seed))
+    choose = POLICIES[policy]
+    results = []
+    for _ in range(lifetimes):
+        pet = run_lifetime(state, clock, choose, every)
+        results.append((pet.age_ticks, pet.care_mistakes, pet.sick_ticks))
+    return results, state.tick_count
+
+
+def summarize(results):
+    """Aggregate run_lifetime results into a dict of statistics."""
+    n = len(results)
+    lifespans = sorted(r[0] for r in results)
+    mistakes = sorted(r[1] for r in results)
+    alive_ticks = sum(lifespans)
+    sick_ticks = sum(r[2] for r in results)
+    return {
+        "lifetimes": n,
+        "lifespan_mean": alive_ticks / n,
+        "lifespan_min": lifespans[0],
+        "lifespan_max": lifespans[-1],
+        "care_mistakes_mean": sum(mistakes) / n,
+        "care_mistakes_p50": mistakes[n // 2],
+        "care_mistakes_p90": mistakes[min(n - 1, n * 9 // 10)],
+        "sick_tick_ratio": sick_ticks / alive_ticks if alive_ticks else 0.0,
+        "ever_sick": sum(1 for r in results if r[2]) / n,
+    }
+
+
+def apply_overrides(pairs):
+    """Set config values from NAME=VALUE strings (values are Python literals)."""
+    for pair in pairs:
+        name, _, value = pair.partition("=")
+        if not hasattr(config, name):
+            raise ValueError("Unknown config value: " + name)
+        setattr(config, name, literal_eval(value))
+
+
+def main(args):
+    opts = {"--lifetimes": 1000, "--seed": 1, "--policy": "carer", "--every": 10}
+    overrides = []
+    while args:
+        if len(args) < 2:
+            raise SystemExit("Missing value for " + args[0])
+        if args[0] == "--set":
+            overrides.append(args[1])
+        elif args[0] in opts:
+            opts[args[0]] = args[1] if args[0] == "--policy" else int(args[1])
+        else:
+            raise SystemExit("Unknown option " + args[0])
+        args = args[2:]
+    if opts["--policy"] not in POLICIES:
+        raise SystemExit("Policies: " + ", ".join(POLICIES))
+    apply_overrides(overrides)
+
+    start = time.perf_counter()
+    results, ticks = simulate(opts["--lifetimes"], opts["--seed"], opts["--policy"], opts["--every"])
+    elapsed = time.perf_counter() - start
+
+    stats = summarize(results)
+    print("Policy %s, %d lifetimes (seed %d, action every %d ticks)" % (
+        opts["--policy"], stats["lifetimes"], opts["--seed"], opts["--every"]))
+    print("Lifespan: mean %.1f, min %d, max %d ticks" % (
+        stats["lifespan_mean"], stats["lifespan_min"], stats["lifespan_max"]))
+    print("Care mistakes: mean %.1f, p50 %d, p90 %d" % (
+        stats["care_mistakes_mean"], stats["care_mistakes_p50"], stats["care_mistakes_p90"]))
+    print("Sick: %.1f%% of ticks alive, %.1f%% of pets ever" % (
+        100 * stats["sick_tick_ratio"], 100 * stats["ever_sick"]))
+    print("Simulated %d ticks in %.2f s (%.0f ticks/s)" % (ticks, elapsed, ticks / elapsed))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,143 @@
+# tune.py
+# Parallel Monte Carlo sweep of lifecycle parameters (runs under CPython).
+#
+# Usage: python utils/tune.py [--seeds 32] [--lifetimes 500] [--policy carer]
+#            [--every 10] [--workers N] [--out tune.csv|tune.json]
+#            NAME=v1,v2,... [NAME=...]
+#
+# e.g.   python utils/tune.py SICK_CHANCE=0,0.005,0.01 DEATH_TICKS=100,1000
+#
+# Every NAME must be a config value; the grid is the cross product of the
+# listed values (no NAME = just the current config). Each grid point runs
+# --seeds independent simulate.py runs of --lifetimes lifetimes, one job per
+# (point, seed) spread over a process pool, so the sweep scales with the
+# number of cores. Per point, the lifetimes of all seeds are pooled and
+# summarized (lifespan, care mistakes, sick-tick ratio) with the spread of the
+# per-seed means, and written as one CSV row or JSON object.
+
+import os
+import sys
+import csv
+import json
+import time
+from ast import literal_eval
+from itertools import product
+from multiprocessing import Pool, cpu_count
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import simulate
+import config
+
+
+def parse_grid(args):
+    """Turn NAME=v1,v2 arguments into a list of (name, values)."""
+    grid = []
+    for arg in args:
+        name, sep, values = arg.partition("=")
+        if not sep or not values:
+            raise SystemExit("Expected NAME=v1,v2,...: " + arg)
+        if not hasattr(config, name):
+            raise SystemExit("Unknown config value: " + name)
+        grid.append((name, [literal_eval(v) for v in values.split(",")]))
+    return grid
+
+
+def run_job(job):
+    """Worker: run one seed at one grid point.
+
+    Returns:
+        tuple: (point index, seed, lifetime results, ticks simulated)
+    """
+    index, point, seed, lifetimes, policy, every = job
+    for name, value in point:
+        setattr(config, name, value)
+    results, ticks = simulate.simulate(lifetimes, seed, policy, every)
+    return index, seed, results, ticks
+
+
+def spread(values):
+    """Return (mean, standard deviation) of a list of numbers."""
+    n = len(values)
+    mean = sum(values) / n
+    if n < 2:
+        return mean, 0.0
+    return mean, (sum((v - mean) ** 2 for v in values) / (n - 1)) ** 0.5
+
+
+def aggregate(point, per_seed):
+    """Summarize one grid point from its per-seed results into a flat row."""
+    pooled = [r for results in per_seed for r in results]
+    row = dict(point)
+    row["seeds"] = len(per_seed)
+    row.update(simulate.summarize(pooled))
+
+    # Seed-to-seed spread of the headline numbers (convergence check)
+    seed_stats = [simulate.summarize(results) for results in per_seed]
+    for key in ("lifespan_mean", "care_mistakes_mean", "sick_tick_ratio"):
+        _, sd = spread([s[key] for s in seed_stats])
+        row[key + "_sd"] = sd
+    return row
+
+
+def write_rows(path, rows):
+    """Write rows as JSON (.json) or CSV (anything else)."""
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=1)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({k: ("%.6g" % v if isinstance(v, float) else v) for k, v in row.items()})
+
+
+def main(args):
+    opts = {"--seeds": 32, "--lifetimes": 500, "--policy": "carer", "--every": 10,
+            "--workers": cpu_count(), "--out": "tune.csv"}
+    grid_args = []
+    while args:
+        if args[0] in opts:
+            if len(args) < 2:
+                raise SystemExit("Missing value for " + args[0])
+            text = args[1]
+            opts[args[0]] = text if args[0] in ("--policy", "--out") else int(text)
+            args = args[2:]
+        else:
+            grid_args.append(args[0])
+            args = args[1:]
+    if opts["--policy"] not in simulate.POLICIES:
+        raise SystemExit("Policies: " + ", ".join(simulate.POLICIES))
+
+    grid = parse_grid(grid_args)
+    names = [name for name, _ in grid]
+    points = [list(zip(names, values)) for values in product(*[v for _, v in grid])]
+    jobs = [(i, point, seed, opts["--lifetimes"], opts["--policy"], opts["--every"])
+            for i, point in enumerate(points)
+            for seed in range(1, opts["--seeds"] + 1)]
+
+    print("%d grid points x %d seeds x %d lifetimes on %d workers" % (
+        len(points), opts["--seeds"], opts["--lifetimes"], opts["--workers"]))
+    per_point = [[] for _ in points]
+    total_ticks = 0
+    start = time.perf_counter()
+    with Pool(opts["--workers"]) as pool:
+        for index, seed, results, ticks in pool.imap_unordered(run_job, jobs):
+            per_point[index].append(results)
+            total_ticks += ticks
+    elapsed = time.perf_counter() - start
+
+    rows = [aggregate(point, per_seed) for point, per_seed in zip(points, per_point)]
+    write_rows(opts["--out"], rows)
+
+    for row in rows:
+        label = ", ".join("%s=%s" % (name, row[name]) for name in names) or "config"
+        print("%s: lifespan %.1f, care mistakes %.2f, sick %.1f%%" % (
+            label, row["lifespan_mean"], row["care_mistakes_mean"], 100 * row["sick_tick_ratio"]))
+    print("Saved: %s (%d rows), %d ticks in %.2f s (%.0f ticks/s)" % (
+        opts["--out"], len(rows), total_ticks, elapsed, total_ticks / elapsed))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])